@@ -0,0 +1,48 @@
+import zlib
+from typing import List
+
+import numpy as np
+
+from src.crawler.SourceData import SourceData
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.embedd.EmbeddingInteface import EmbeddingInterface
+from src.utils.vectors import VECTOR_DTYPE
+
+
+class FakeEmbeddingClient(EmbeddingInterface):
+    """
+    Deterministic offline stand-in of an embedding model for benchmarks.
+    A text is embedded as the center of one of `clusters` random clusters plus noise, both seeded by the crc32 of the text,
+    so the same text always gets the same vector and nearest neighbours are not trivial.
+    """
+    
+    def __init__(self, dimension: int = 1536, clusters: int = 64, noise: float = 0.5, seed: int = 42) -> None:
+        self.dimension = dimension
+        self.noise = noise
+        self.centers = np.random.default_rng(seed).standard_normal((clusters, dimension)).astype(VECTOR_DTYPE)
+    
+    def embed(self, data: SourceData) -> EmbeddedModel:
+        return self.embed_batch([data])[0]
+    
+    def embed_simple_text(self, text: str) -> np.ndarray:
+        return self.embed_simple_texts([text])[0]
+    
+    def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        embedded = self.embed_simple_texts([data.text for data in datas])
+        
+        return [EmbeddedModel.from_source_data(data, vector) for data, vector in zip(datas, embedded)]
+    
+    def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        matrix = np.empty((len(texts), self.dimension), dtype=VECTOR_DTYPE)
+        for row, text in enumerate(texts):
+            seed = zlib.crc32(text.encode("utf-8"))
+            rng = np.random.default_rng(seed)
+            matrix[row] = self.centers[seed % len(self.centers)] + self.noise * rng.standard_normal(self.dimension)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix
+    
+    def get_vector_size(self) -> int:
+        return self.dimension
+    
+    def get_model_name(self) -> str:
+        return f"fake-{self.dimension}"
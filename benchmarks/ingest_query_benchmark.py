@@ -0,0 +1,182 @@
+"""
+Ingest throughput, query latency, recall and memory of QdrantClientStorage without network or Docker.
+
+Documents are synthetic and embedded by the deterministic FakeEmbeddingClient, Qdrant runs in process
+(`:memory:` by default or `--qdrant-path`). Run it before and after a change of `src/storage` or `src/embedd`
+and compare the reports:
+
+    python -m benchmarks.ingest_query_benchmark --sizes 1000 10000 --output after.json --baseline before.json
+
+The in-process Qdrant always searches exhaustively, so recall is 1.0 unless the search path loses results.
+Peak RSS is the peak of the whole process so far, sizes are run in ascending order.
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from benchmarks.FakeEmbeddingClient import FakeEmbeddingClient
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.crawler.SourceData import SourceData
+from src.storage.qdrant.CollectionSettings import CollectionSettings
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+CATEGORIES = ["business", "finance", "health", "education", "travel"]
+
+
+class SyntheticCrawler(CrawlerInterface):
+    
+    def __init__(self, size: int) -> None:
+        self.size = size
+    
+    def crawl(self) -> List[SourceData]:
+        return list(self.iter_crawl())
+    
+    def iter_crawl(self) -> Iterator[SourceData]:
+        for index in range(self.size):
+            yield SourceData(
+                text=f"제목: benchmark document {index} 질문: synthetic question body {index}",
+                ref=f"https://benchmark.local/{index}",
+                metadata={"category": CATEGORIES[index % len(CATEGORIES)], "doc_id": str(index), "source": "benchmark"},
+            )
+
+
+def percentile(latencies: List[float], q: float) -> float:
+    return float(np.percentile(np.array(latencies) * 1000, q))
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def exact_refs(storage: QdrantClientStorage, vector: np.ndarray, k: int) -> List[str]:
+    hits = storage.qdrant_client.search(
+        collection_name=storage.collection_name,
+        query_vector=vector,
+        limit=k,
+        search_params=models.SearchParams(exact=True),
+        with_payload=["ref"],
+    )
+    return [hit.payload["ref"] for hit in hits]
+
+
+def run_size(args: argparse.Namespace, qdrant_client: QdrantClient, embedding_client: FakeEmbeddingClient, size: int) -> dict:
+    collection_name = f"{args.prefix}_{size}"
+    qdrant_client.recreate_collection(
+        collection_name=collection_name,
+        **CollectionSettings().to_create_collection_kwargs(embedding_client.get_vector_size()),
+    )
+    storage = QdrantClientStorage(
+        embedding_client=embedding_client,
+        collection_name=collection_name,
+        qdrant_client=qdrant_client,
+    )
+    # Neighbours of random queries are far from the production threshold, keep every hit to measure recall
+    storage.score_threshold = None
+    
+    started = time.perf_counter()
+    saved = storage.ingest(
+        SyntheticCrawler(size),
+        embed_batch_size=args.embed_batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        max_in_flight=args.max_in_flight,
+    )
+    ingest_seconds = time.perf_counter() - started
+    
+    queries = [f"benchmark query {index}" for index in range(args.queries)]
+    query_vectors = embedding_client.embed_simple_texts(queries)
+    
+    latencies = []
+    hits = 0
+    for query, vector in zip(queries, query_vectors):
+        started = time.perf_counter()
+        payloads = storage.query_batch([query], limit=args.k)[0]
+        latencies.append(time.perf_counter() - started)
+        hits += len(set(exact_refs(storage, vector, args.k)).intersection(payload["ref"] for payload in payloads))
+    
+    started = time.perf_counter()
+    storage.query_many(queries, limit=args.k, search_batch_size=args.query_batch_size)
+    batch_seconds = time.perf_counter() - started
+    
+    if not args.keep:
+        qdrant_client.delete_collection(collection_name)
+    
+    return {
+        "size": size,
+        "saved": saved,
+        "ingest_seconds": ingest_seconds,
+        "ingest_docs_per_second": size / ingest_seconds,
+        f"recall@{args.k}": hits / (len(queries) * args.k),
+        "query_p50_ms": percentile(latencies, 50),
+        "query_p95_ms": percentile(latencies, 95),
+        "query_p99_ms": percentile(latencies, 99),
+        "batched_queries_per_second": len(queries) / batch_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(reports: List[dict], baseline: List[dict]) -> None:
+    """
+    Print the relative change of every metric against the report of the same size in the baseline
+    """
+    baseline_of: Dict[int, dict] = {report["size"]: report for report in baseline}
+    for report in reports:
+        previous = baseline_of.get(report["size"])
+        if previous is None:
+            continue
+        changes = {
+            key: f"{(value - previous[key]) / previous[key]:+.1%}"
+            for key, value in report.items()
+            if key not in ("size", "dim", "saved") and isinstance(previous.get(key), (int, float)) and previous[key]
+        }
+        print(f"size={report['size']} vs baseline: {json.dumps(changes)}")
+
+
+def run(args: argparse.Namespace) -> List[dict]:
+    qdrant_client = QdrantClient(path=args.qdrant_path) if args.qdrant_path else QdrantClient(":memory:")
+    embedding_client = FakeEmbeddingClient(dimension=args.dim, clusters=args.clusters)
+    
+    reports = []
+    for size in sorted(args.sizes):
+        report = {"dim": args.dim, **run_size(args, qdrant_client, embedding_client, size)}
+        reports.append(report)
+        print(json.dumps(report))
+    return reports
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Corpus sizes")
+    parser.add_argument("--dim", type=int, default=1536, help="Vector size of the fake embedding model")
+    parser.add_argument("--clusters", type=int, default=64, help="Number of clusters of the fake vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--embed-batch-size", type=int, default=256)
+    parser.add_argument("--upsert-batch-size", type=int, default=512)
+    parser.add_argument("--query-batch-size", type=int, default=64)
+    parser.add_argument("--max-in-flight", type=int, default=0, help="The in-process Qdrant does not support concurrent upserts")
+    parser.add_argument("--qdrant-path", help="Persist the in-process Qdrant in this directory instead of memory")
+    parser.add_argument("--prefix", default="benchmark")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    parser.add_argument("--output", help="Write the reports to this JSON file")
+    parser.add_argument("--baseline", help="Reports of a previous run to compare with")
+    args = parser.parse_args(argv)
+    
+    reports = run(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(reports, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            compare(reports, json.load(baseline))
+
+
+if __name__ == '__main__':
+    main()
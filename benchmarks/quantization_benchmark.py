@@ -0,0 +1,147 @@
+"""
+Recall and latency trade-off of the collection settings (quantization, on-disk storage, HNSW params) on our data.
+
+It needs a running Qdrant server (see docker-compose-local.yaml) since the in-process mode of qdrant-client
+ignores index and quantization settings. Every setting gets its own `<prefix>_<name>` collection, which is dropped afterwards.
+
+    python -m benchmarks.quantization_benchmark --paths naver_kin/data/kinspider --queries 200 --output quantization.json
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client import models
+
+from src.crawler.naver.LocalNaverJsonParser import LocalNaverJsonParser
+from src.embedd.cache.CachedEmbeddingClient import CachedEmbeddingClient
+from src.main import create_embedding_client
+from src.storage.qdrant.CollectionSettings import CollectionSettings
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+SETTINGS: Dict[str, CollectionSettings] = {
+    "float32": CollectionSettings(),
+    "float32-on-disk": CollectionSettings(on_disk_vectors=True, on_disk_payload=True),
+    "scalar-int8": CollectionSettings(quantization="scalar"),
+    "scalar-int8-on-disk": CollectionSettings(quantization="scalar", on_disk_vectors=True, on_disk_payload=True),
+    "product-x16": CollectionSettings(quantization="product"),
+}
+
+
+def percentile(latencies: List[float], q: float) -> float:
+    return float(np.percentile(np.array(latencies) * 1000, q))
+
+
+def wait_until_indexed(storage: QdrantClientStorage, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while storage.qdrant_client.get_collection(storage.collection_name).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{storage.collection_name} is not indexed in {timeout} seconds")
+        time.sleep(1)
+
+
+def search_ids(storage: QdrantClientStorage, vector: List[float], k: int, search_params) -> List:
+    hits = storage.qdrant_client.search(
+        collection_name=storage.collection_name,
+        query_vector=vector,
+        limit=k,
+        search_params=search_params,
+        with_payload=False,
+    )
+    return [hit.id for hit in hits]
+
+
+def run(args: argparse.Namespace) -> List[dict]:
+    embedding_client = CachedEmbeddingClient(create_embedding_client())
+    texts = [data.text for data in LocalNaverJsonParser(args.paths).iter_crawl()][:args.limit]
+    vectors = np.array(embedding_client.embed_simple_texts(texts), dtype=np.float32)
+    query_indexes = random.Random(args.seed).sample(range(len(texts)), min(args.queries, len(texts)))
+    query_vectors = [vectors[index].tolist() for index in query_indexes]
+    print(f"{len(texts)} vectors of {vectors.shape[1]} dimensions, {len(query_vectors)} queries")
+    
+    reports = []
+    ground_truth = None
+    
+    for name in args.settings:
+        settings = SETTINGS[name]
+        storage = QdrantClientStorage(
+            embedding_client=embedding_client,
+            collection_settings=settings,
+            collection_name=f"{args.prefix}_{name}",
+        )
+        storage.qdrant_client.recreate_collection(
+            collection_name=storage.collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=args.indexing_threshold),
+            **settings.to_create_collection_kwargs(vectors.shape[1]),
+        )
+        
+        started = time.perf_counter()
+        storage.qdrant_client.upload_collection(
+            collection_name=storage.collection_name,
+            vectors=vectors,
+            ids=range(len(vectors)),
+            batch_size=args.batch_size,
+        )
+        wait_until_indexed(storage)
+        load_seconds = time.perf_counter() - started
+        
+        if ground_truth is None:
+            exact = models.SearchParams(exact=True, quantization=models.QuantizationSearchParams(ignore=True))
+            ground_truth = [set(search_ids(storage, vector, args.k, exact)) for vector in query_vectors]
+        
+        for hnsw_ef in args.hnsw_ef:
+            for rescore in ([True, False] if settings.quantization != "none" else [None]):
+                search_params = settings.search_params(hnsw_ef=hnsw_ef, rescore=rescore)
+                latencies = []
+                hits = 0
+                for vector, expected in zip(query_vectors, ground_truth):
+                    started = time.perf_counter()
+                    found = search_ids(storage, vector, args.k, search_params)
+                    latencies.append(time.perf_counter() - started)
+                    hits += len(expected.intersection(found))
+                
+                report = {
+                    "settings": name,
+                    "hnsw_ef": hnsw_ef,
+                    "rescore": rescore,
+                    f"recall@{args.k}": hits / (len(query_vectors) * args.k),
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "p99_ms": percentile(latencies, 99),
+                    "load_seconds": load_seconds,
+                }
+                reports.append(report)
+                print(json.dumps(report))
+        
+        if not args.keep:
+            storage.qdrant_client.delete_collection(storage.collection_name)
+    
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", nargs="+", default=None, help="JSONL files, directories or glob patterns of the corpus")
+    parser.add_argument("--limit", type=int, default=100000, help="Maximum number of documents")
+    parser.add_argument("--queries", type=int, default=200, help="Number of documents used as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--settings", nargs="+", choices=list(SETTINGS), default=list(SETTINGS))
+    parser.add_argument("--indexing-threshold", type=int, default=1000, help="Build the HNSW index even for small corpora")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--prefix", default="benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    parser.add_argument("--output", help="Write the reports to this JSON file")
+    args = parser.parse_args()
+    
+    reports = run(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(reports, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,121 @@
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
 
+import time
+
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+from twisted.internet import defer, task, threads
 
 
 class NaverKinPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class QdrantIndexingPipeline:
+    """
+    Embed and upsert crawled questions into Qdrant while the crawl runs.
+
+    Items are buffered and sent in batches of QDRANT_PIPELINE_BATCH_SIZE, or every
+    QDRANT_PIPELINE_FLUSH_INTERVAL seconds. Embedding and upserting run in the reactor
+    thread pool, so the reactor keeps downloading. When QDRANT_PIPELINE_MAX_PENDING_BATCHES
+    batches are in flight, items wait for one of them to finish, which slows the spider
+    down through scrapy's own scraper backpressure.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_pending_batches):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_batches = max_pending_batches
+        self.buffer = []
+        self.pending = set()
+        self.indexed_count = 0
+        self.failed_count = 0
+        self.flush_loop = None
+        self.embedding_client = None
+        self.storage = None
+        self.to_source_data = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("QDRANT_PIPELINE_ENABLED"):
+            raise NotConfigured("QDRANT_PIPELINE_ENABLED is not set")
+        return cls(
+            batch_size=settings.getint("QDRANT_PIPELINE_BATCH_SIZE", 64),
+            flush_interval=settings.getfloat("QDRANT_PIPELINE_FLUSH_INTERVAL", 2.0),
+            max_pending_batches=settings.getint("QDRANT_PIPELINE_MAX_PENDING_BATCHES", 4),
+        )
+
+    def open_spider(self, spider):
+        # Imported here, so the project still runs without `src` on PYTHONPATH when the pipeline is disabled
+        from src.crawler.naver.LocalNaverJsonParser import kin_item_to_source_data
+        from src.embedd.cache.CachedEmbeddingClient import CachedEmbeddingClient
+        from src.main import create_embedding_client
+        from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+        self.to_source_data = kin_item_to_source_data
+        self.embedding_client = CachedEmbeddingClient(create_embedding_client())
+        self.storage = QdrantClientStorage(embedding_client=self.embedding_client)
+        self.flush_loop = task.LoopingCall(self._flush, spider)
+        self.flush_loop.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        if self.flush_loop is not None and self.flush_loop.running:
+            self.flush_loop.stop()
+        self._flush(spider)
+        finished = defer.DeferredList(list(self.pending))
+        # Canonical questions of the dropped near-duplicates are all saved once the pending batches are done
+        finished.addCallback(lambda _: threads.deferToThread(self.storage.write_aliases))
+        finished.addCallbacks(self._closed, self._aliases_failed, callbackArgs=(spider,), errbackArgs=(spider,))
+        return finished
+
+    def process_item(self, item, spider):
+        self.buffer.append(self.to_source_data(ItemAdapter(item).asdict(), int(time.time())))
+        if len(self.buffer) < self.batch_size:
+            return item
+
+        self._flush(spider)
+        if len(self.pending) < self.max_pending_batches:
+            return item
+
+        waiting = defer.DeferredList(list(self.pending), fireOnOneCallback=True, fireOnOneErrback=True, consumeErrors=True)
+        waiting.addBoth(lambda _: item)
+        return waiting
+
+    def _flush(self, spider):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+
+        indexing = threads.deferToThread(self._index, batch)
+        self.pending.add(indexing)
+        indexing.addCallbacks(self._indexed, self._failed, errbackArgs=(batch, spider))
+        indexing.addBoth(self._done, indexing)
+
+    def _index(self, batch):
+        # Same path as `ingest`, so questions are chunked the same way as the ones ingested from the feeds
+        return self.storage.ingest_batch(batch)
+
+    def _indexed(self, count):
+        self.indexed_count += count
+
+    def _failed(self, failure, batch, spider):
+        # The items are still written by FEEDS, so they can be indexed later with `sync`
+        self.failed_count += len(batch)
+        spider.logger.error(f"Failed to index {len(batch)} questions: {failure.getErrorMessage()}")
+
+    def _closed(self, alias_count, spider):
+        spider.logger.info(
+            f"Qdrant indexing finished: {self.indexed_count} indexed, {self.failed_count} failed, "
+            f"aliases of {alias_count} questions written"
+        )
+
+    def _aliases_failed(self, failure, spider):
+        spider.logger.error(f"Failed to write the aliases of near-duplicate questions: {failure.getErrorMessage()}")
+
+    def _done(self, result, indexing):
+        self.pending.discard(indexing)
+        return result
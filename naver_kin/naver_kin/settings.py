@@ -7,6 +7,8 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+
 BOT_NAME = "naver_kin"
 
 SPIDER_MODULES = ["naver_kin.spiders"]
@@ -20,14 +22,14 @@ NEWSPIDER_MODULE = "naver_kin.spiders"
 ROBOTSTXT_OBEY = True
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
-#CONCURRENT_REQUESTS = 32
+CONCURRENT_REQUESTS = 32
 
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
 #DOWNLOAD_DELAY = 3
 # The download delay setting will honor only one of:
-#CONCURRENT_REQUESTS_PER_DOMAIN = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 16
 #CONCURRENT_REQUESTS_PER_IP = 16
 
 # Disable cookies (enabled by default)
@@ -59,9 +61,20 @@ DOWNLOADER_MIDDLEWARES = {
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "naver_kin.pipelines.NaverKinPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "naver_kin.pipelines.QdrantIndexingPipeline": 300,
+}
+# Index crawled questions into Qdrant while crawling, `src` has to be on PYTHONPATH (see .env.example)
+QDRANT_PIPELINE_ENABLED = os.getenv("QDRANT_PIPELINE_ENABLED", "False") == "True"
+QDRANT_PIPELINE_BATCH_SIZE = int(os.getenv("QDRANT_PIPELINE_BATCH_SIZE", "64"))
+QDRANT_PIPELINE_FLUSH_INTERVAL = float(os.getenv("QDRANT_PIPELINE_FLUSH_INTERVAL", "2"))
+QDRANT_PIPELINE_MAX_PENDING_BATCHES = int(os.getenv("QDRANT_PIPELINE_MAX_PENDING_BATCHES", "4"))
+# Categories (dirId) crawled by kinspider, the number of list pages per category
+# and the file of already crawled doc ids skipped by later runs
+KIN_DIR_IDS = os.getenv("KIN_DIR_IDS", "4").split(",")
+KIN_MAX_PAGES = int(os.getenv("KIN_MAX_PAGES", "10"))
+KIN_SEEN_DOC_IDS_PATH = os.getenv("KIN_SEEN_DOC_IDS_PATH", "data/kinspider/seen_doc_ids.txt")
+
 FEEDS = {
     'data/%(name)s/%(name)s_%(time)s.jsonl': {
         'format': 'jsonlines',
@@ -70,14 +83,14 @@ FEEDS = {
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_ENABLED = True
 # The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
+AUTOTHROTTLE_START_DELAY = 1
 # The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_MAX_DELAY = 30
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
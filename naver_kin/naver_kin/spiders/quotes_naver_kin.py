@@ -1,33 +1,115 @@
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
 import scrapy
+from scrapy import signals
 
 class exampleSpider(scrapy.Spider):
+    """
+    Crawl the questions of one or many KiN categories.
+
+    Spider arguments (`scrapy crawl kinspider -a dir_ids=4,208 -a max_pages=10`):
+        dir_ids: comma separated category ids, KIN_DIR_IDS setting by default
+        max_pages: number of list pages followed per category, KIN_MAX_PAGES setting by default
+        base_url: host of the pages, e.g. a local server serving HTML fixtures
+
+    The doc ids of scraped questions are appended to KIN_SEEN_DOC_IDS_PATH once their item went through
+    the pipelines, so later runs skip them before their page is requested.
+    """
     name = 'kinspider'
     category = '4'
-    kin_urls = 'http://kin.naver.com/qna/list.nhn?dirId=' + category
-    start_urls = [kin_urls]
-    
-    def parse(self, response):
+    base_url = 'http://kin.naver.com'
+
+    def __init__(self, dir_ids=None, max_pages=None, base_url=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dir_ids = dir_ids.split(',') if dir_ids else None
+        self.max_pages = int(max_pages) if max_pages else None
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+        self.seen_doc_ids = set()
+        self.seen_file = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.item_scraped, signal=signals.item_scraped)
+        return spider
+
+    def start_requests(self):
+        settings = self.crawler.settings
+        dir_ids = self.dir_ids or settings.getlist('KIN_DIR_IDS') or [self.category]
+        self.max_pages = self.max_pages or settings.getint('KIN_MAX_PAGES', 1)
+        self._open_seen_doc_ids(settings.get('KIN_SEEN_DOC_IDS_PATH'))
+
+        for dir_id in dir_ids:
+            yield scrapy.Request(
+                f'{self.base_url}/qna/list.nhn?dirId={dir_id}',
+                callback=self.parse,
+                cb_kwargs={'page': 1},
+            )
+
+    def parse(self, response, page=1):
         for item in response.css('td.title a'):
+            doc_id = self._query_param(response.urljoin(item.attrib.get('href', '')), 'docId')
+            if doc_id in self.seen_doc_ids:
+                continue
             yield response.follow(item, self.parse_doc)
 
-        # for next_page in response.css('div.paginate > a'):
-        #     yield response.follow(next_page, self.parse)
+        if page < self.max_pages:
+            # Only the link to the following page is followed, the other page links are reached from it
+            for link in response.css('div.paginate > a'):
+                if self._query_param(response.urljoin(link.attrib.get('href', '')), 'page') == str(page + 1):
+                    yield response.follow(link, self.parse, cb_kwargs={'page': page + 1})
+                    break
 
     def parse_doc(self, response):
-        result = []
-        docId = response.request.url.split("docId=")[-1]
-        title = response.css('div.title::text').extract_first().strip().encode('utf8')
-        question_contents = response.css('div.c-heading__content ::text').extract()
-        question = "\n\n".encode('utf8')
-        for q in question_contents:
-            question += q.strip().encode('utf8')
-            question += "\n".encode('utf8')
-            
+        url = response.request.url
+        docId = self._query_param(url, 'docId')
+        dirId = self._query_param(url, 'dirId')
+        title = response.css('div.title::text').get(default='').strip()
+        question_contents = response.css('div.c-heading__content ::text').getall()
+        question = '\n\n' + ''.join(q.strip() + '\n' for q in question_contents)
+
         return {
-            'ref': response.request.url,
-            'title': title.decode('utf8'),
-            'question': question.decode('utf8'),
+            'ref': url,
+            'title': title,
+            'question': question,
+            'category': dirId,
+            'doc_id': docId,
+            'crawled_at': int(time.time()),
         }
 
+    def item_scraped(self, item, response, spider):
+        # Dropped or failed items are crawled again by the next run
+        self._remember(item.get('doc_id'))
+
+    def closed(self, reason):
+        if self.seen_file is not None:
+            self.seen_file.close()
+
+    def _open_seen_doc_ids(self, path):
+        if not path:
+            return
+        if os.path.exists(path):
+            with open(path) as seen_file:
+                self.seen_doc_ids.update(line.strip() for line in seen_file if line.strip())
+            self.logger.info(f'{len(self.seen_doc_ids)} doc ids are already crawled')
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.seen_file = open(path, 'a')
+
+    def _remember(self, doc_id):
+        if doc_id is None or doc_id in self.seen_doc_ids:
+            return
+        self.seen_doc_ids.add(doc_id)
+        if self.seen_file is not None:
+            self.seen_file.write(doc_id + '\n')
+            self.seen_file.flush()
+
+    @staticmethod
+    def _query_param(url, name):
+        return parse_qs(urlparse(url).query).get(name, [None])[0]
+
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    pass
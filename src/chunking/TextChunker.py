@@ -0,0 +1,132 @@
+import os
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from src.crawler.SourceData import SourceData
+from src.embedd.TokenBatchPacker import estimate_tokens, token_counter_for
+from src.storage.qdrant.PointIdentity import content_hash
+
+WORD_PATTERN = re.compile(r"\S+\s*")
+
+# Prefix of the chunks of a section, so an answer chunk is still embedded as an answer
+SECTION_LABELS = {
+    "question": "질문",
+    "answer": "답변",
+}
+
+
+class TextChunker:
+    """
+    Split documents into overlapping chunks of at most `max_tokens` tokens, section by section.
+    Each chunk is a SourceData of the same `ref` with `section`, `chunk_index` and the `content_hash` of the whole document
+    in its metadata, so the chunks of a document get their own points and are synchronized together.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap_tokens: int = 32,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ) -> None:
+        if max_tokens < 1 or not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("max_tokens must be positive and overlap_tokens lower than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens
+    
+    @classmethod
+    def from_env(cls) -> Optional["TextChunker"]:
+        """
+        Create the chunker from CHUNK_* variables
+
+        Returns:
+            Optional[TextChunker]: None when CHUNK_MAX_TOKENS is 0, documents are then stored as one point
+        """
+        max_tokens = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+        if max_tokens <= 0:
+            return None
+        return cls(
+            max_tokens=max_tokens,
+            overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "32")),
+            count_tokens=token_counter_for(os.getenv("OPENAI_EMBEDDING_MODEL")),
+        )
+    
+    def chunk(self, data: SourceData) -> List[SourceData]:
+        """
+        Split a document into chunks
+
+        Args:
+            data (SourceData): Document, its `sections` are chunked separately when it has some
+
+        Returns:
+            List[SourceData]: Chunks in the order of the document
+        """
+        sections = data.sections or {"text": data.text}
+        document_hash = content_hash(data.text)
+        chunks = []
+        for section, text in sections.items():
+            label = SECTION_LABELS.get(section)
+            for chunk_index, chunk_text in enumerate(self.split(text)):
+                chunks.append(SourceData(
+                    text=f"{label}: {chunk_text}" if label else chunk_text,
+                    ref=data.ref,
+                    metadata={
+                        **data.metadata,
+                        "section": section,
+                        "chunk_index": chunk_index,
+                        "content_hash": document_hash,
+                    },
+                ))
+        return chunks
+    
+    def iter_chunks(self, datas: Iterable[SourceData]) -> Iterator[SourceData]:
+        for data in datas:
+            yield from self.chunk(data)
+    
+    def split(self, text: str) -> List[str]:
+        """
+        Split a text on whitespace into chunks of at most `max_tokens` tokens,
+        each chunk starts with the last `overlap_tokens` tokens of the previous one.
+        A word longer than `max_tokens` is cut into pieces.
+
+        Args:
+            text (str): Text to be split
+
+        Returns:
+            List[str]: Chunks, empty for a blank text
+        """
+        pieces = self._pieces(text)
+        chunks = []
+        start = 0
+        while start < len(pieces):
+            end = start
+            tokens = 0
+            while end < len(pieces) and tokens + pieces[end][1] <= self.max_tokens:
+                tokens += pieces[end][1]
+                end += 1
+            end = max(end, start + 1)
+            chunks.append("".join(piece for piece, _ in pieces[start:end]).strip())
+            if end == len(pieces):
+                break
+            
+            # Step back over the overlap, always moving forward by at least one piece
+            overlap = 0
+            next_start = end
+            while next_start > start + 1 and overlap + pieces[next_start - 1][1] <= self.overlap_tokens:
+                next_start -= 1
+                overlap += pieces[next_start][1]
+            start = next_start
+        return chunks
+    
+    def _pieces(self, text: str) -> List[Tuple[str, int]]:
+        pieces = []
+        for word in WORD_PATTERN.findall(text):
+            tokens = self.count_tokens(word)
+            if tokens <= self.max_tokens:
+                pieces.append((word, tokens))
+                continue
+            step = max(1, len(word) * self.max_tokens // tokens)
+            for offset in range(0, len(word), step):
+                piece = word[offset:offset + step]
+                pieces.append((piece, self.count_tokens(piece)))
+        return pieces
@@ -1,5 +1,7 @@
 from .SourceData import SourceData
-from typing import List
+from typing import Iterator, List
+
+from src.utils.batching import chunked
 
 class CrawlerInterface:
     """
@@ -14,4 +16,26 @@ class CrawlerInterface:
         Returns:
             str: data from external sources that are converted by only one line.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    def iter_crawl(self) -> Iterator[SourceData]:
+        """
+        Lazily load data from external source one by one, so downstream stages can consume it with constant memory.
+        Crawlers reading large sources should override it, the default iterates over `crawl`.
+
+        Returns:
+            Iterator[SourceData]: data from external sources
+        """
+        yield from self.crawl()
+    
+    def iter_crawl_chunks(self, chunk_size: int) -> Iterator[List[SourceData]]:
+        """
+        Lazily load data from external source in chunks
+
+        Args:
+            chunk_size (int): Maximum number of data per chunk
+
+        Returns:
+            Iterator[List[SourceData]]: chunks of data from external sources
+        """
+        return chunked(self.iter_crawl(), chunk_size)
\ No newline at end of file
@@ -1,16 +1,31 @@
+from typing import Any, Dict, Optional
+
+from src.utils.vectors import format_text
 
 
 class SourceData:
     """
     This class is a data class for source data.
     """
+    
+    __slots__ = ("text", "ref", "metadata", "sections")
 
-    def __init__(self, text: str, ref: str) -> None:
+    def __init__(
+        self,
+        text: str,
+        ref: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        sections: Optional[Dict[str, str]] = None,
+    ) -> None:
         self.text = text
         self.ref = ref
+        # Extra fields stored along with the data (e.g. category, doc_id, crawled_at, source)
+        self.metadata = metadata or {}
+        # Parts of the text chunked separately (e.g. question and answer), the whole text is one section when None
+        self.sections = sections
     
     def __repr__(self) -> str:
-        return f"SourceData(text={self.text}, ref={self.ref})"
+        return f"SourceData(text={format_text(self.text)}, ref={self.ref}, metadata={self.metadata})"
     
     def __str__(self) -> str:
-        return f"SourceData(text={self.text}, ref={self.ref})"
\ No newline at end of file
+        return f"SourceData(text={format_text(self.text)}, ref={self.ref}, metadata={self.metadata})"
\ No newline at end of file
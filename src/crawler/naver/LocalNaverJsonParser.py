@@ -1,28 +1,120 @@
+import glob
+import json
+import os
+import re
 import jsonlines
 
-from typing import List
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 from src.crawler.CrawlerInterface import CrawlerInterface
 from src.crawler.SourceData import SourceData
 
+# scrapy writes `%(time)s` of the FEEDS setting in UTC, e.g. kinspider_2023-08-03T11-31-44.jsonl
+FEED_TIME_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2})")
+
+
+def kin_item_to_source_data(data: Dict[str, Any], crawled_at: int, source: str = "naver_kin") -> SourceData:
+    """
+    Convert a KiN question item of the `naver_kin` spider into SourceData.
+    Items of older feed files have no category nor doc id, they are read from the `ref` url instead.
+
+    Args:
+        data (Dict[str, Any]): Item of the spider
+        crawled_at (int): Crawl time in unix seconds used when the item has none
+        source (str): Name of the source
+
+    Returns:
+        SourceData: SourceData with category, doc_id, crawled_at and source metadata
+    """
+    params = parse_qs(urlparse(data["ref"]).query)
+    return SourceData(
+        text=f"제목: {data['title']} 질문: {data['question']}",
+        ref=data["ref"],
+        metadata={
+            "category": data.get("category") or params.get("dirId", [None])[0],
+            "doc_id": data.get("doc_id") or params.get("docId", [None])[0],
+            "crawled_at": int(data.get("crawled_at") or crawled_at),
+            "source": source,
+        },
+    )
+
 
 class LocalNaverJsonParser(CrawlerInterface):
+    """
+    Crawler reading Naver KiN questions from JSONL files, such as the feed files written by the `naver_kin` scrapy project.
+    Each path can be a file, a directory containing `*.jsonl` files or a glob pattern.
+    """
     
-    def __init__(self):
-        pass
+    def __init__(self, paths: Optional[List[str]] = None, source: str = "naver_kin"):
+        self.paths = paths or os.getenv("NAVER_KIN_JSONL_PATHS", "data_set/kr/kin.jsonl").split(",")
+        self.source = source
     
     def crawl(self) -> List[SourceData]:
-        result_arr = []
-        with jsonlines.open('data_set/kr/kin.jsonl') as json_file:
-            for data in json_file.iter():
-                result_arr.append(
-                    SourceData(
-                        text=f"제목: {data['title']} 질문: {data['question']}",
-                        ref=data["ref"],
-                    )
-                )
-        return result_arr
+        return list(self.iter_crawl())
+    
+    def iter_crawl(self) -> Iterator[SourceData]:
+        for file_path in self.iter_files():
+            file_crawled_at = self.crawled_at_of(file_path)
+            # The last line of a feed file still being written can be incomplete
+            with jsonlines.open(file_path) as json_file:
+                for data in json_file.iter(type=dict, skip_invalid=True):
+                    yield kin_item_to_source_data(data, file_crawled_at, self.source)
+    
+    def iter_file_range(self, file_path: str, start: int, end: int) -> Iterator[Tuple[int, SourceData]]:
+        """
+        Read the lines of a file starting at a byte offset in [start, end), so a large file can be split between processes.
+        `start` must be the beginning of a line.
+
+        Args:
+            file_path (str): JSONL file
+            start (int): Byte offset of the first line
+            end (int): Byte offset from which lines belong to the next range
+
+        Returns:
+            Iterator[Tuple[int, SourceData]]: Byte offset following the line and its data
+        """
+        file_crawled_at = self.crawled_at_of(file_path)
+        with open(file_path, "rb") as json_file:
+            json_file.seek(start)
+            offset = start
+            while offset < end:
+                line = json_file.readline()
+                if not line:
+                    break
+                offset += len(line)
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(data, dict):
+                    yield offset, kin_item_to_source_data(data, file_crawled_at, self.source)
+    
+    def iter_files(self) -> Iterator[str]:
+        """
+        Expand the paths into JSONL files.
+        Files of a directory or a glob pattern are sorted by name, so timestamped feed files are read in crawl order.
+
+        Returns:
+            Iterator[str]: JSONL file paths
+        """
+        for path in self.paths:
+            if os.path.isdir(path):
+                yield from sorted(glob.glob(os.path.join(path, "*.jsonl")))
+            elif glob.has_magic(path):
+                yield from sorted(glob.glob(path))
+            else:
+                yield path
+    
+    @staticmethod
+    def crawled_at_of(file_path: str) -> int:
+        matched = FEED_TIME_PATTERN.search(os.path.basename(file_path))
+        if matched:
+            crawled_at = datetime.strptime(matched.group(1), "%Y-%m-%dT%H-%M-%S").replace(tzinfo=timezone.utc)
+            return int(crawled_at.timestamp())
+        return int(os.path.getmtime(file_path))
     
     
 if __name__ == '__main__':
     crawl = LocalNaverJsonParser()
-    crawl.crawl()
\ No newline at end of file
+    crawl.crawl()
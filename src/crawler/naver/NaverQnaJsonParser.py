@@ -0,0 +1,44 @@
+import json
+import os
+from typing import Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.crawler.SourceData import SourceData
+from src.crawler.naver.LocalNaverJsonParser import LocalNaverJsonParser
+
+
+class NaverQnaJsonParser(CrawlerInterface):
+    """
+    Crawler reading Naver KiN questions with their answers from JSON array files such as `data_set/kr/naver_qna.json`.
+    The question (`질문`) and the answer (`답변`) are kept as separate sections so they can be chunked separately.
+    """
+    
+    def __init__(self, paths: Optional[List[str]] = None, source: str = "naver_qna"):
+        self.paths = paths or os.getenv("NAVER_QNA_JSON_PATHS", "data_set/kr/naver_qna.json").split(",")
+        self.source = source
+    
+    def crawl(self) -> List[SourceData]:
+        return list(self.iter_crawl())
+    
+    def iter_crawl(self) -> Iterator[SourceData]:
+        for file_path in self.paths:
+            crawled_at = LocalNaverJsonParser.crawled_at_of(file_path)
+            with open(file_path, encoding="utf-8") as json_file:
+                items = json.load(json_file)
+            
+            for item in items:
+                question = item.get("질문") or ""
+                answer = item.get("답변") or ""
+                params = parse_qs(urlparse(item["ref"]).query)
+                yield SourceData(
+                    text=f"질문: {question} 답변: {answer}",
+                    ref=item["ref"],
+                    metadata={
+                        "category": params.get("dirId", [None])[0],
+                        "doc_id": params.get("docId", [None])[0],
+                        "crawled_at": crawled_at,
+                        "source": self.source,
+                    },
+                    sections={"question": question, "answer": answer} if answer else {"question": question},
+                )
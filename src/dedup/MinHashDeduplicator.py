@@ -0,0 +1,268 @@
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from src.crawler.SourceData import SourceData
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.metrics.Instruments import DEDUPLICATED_DOCUMENTS
+
+NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+# Prime larger than any crc32, the permutations `(a * x + b) % HASH_PRIME` with a, b < 2**32 do not overflow uint64
+HASH_PRIME = np.uint64(4294967311)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize the text so questions which only differ in case, punctuation or spacing are equal
+
+    Args:
+        text (str): Text to be normalized
+
+    Returns:
+        str: Normalized text
+    """
+    return NON_WORD_PATTERN.sub(" ", unicodedata.normalize("NFKC", text).lower()).strip()
+
+
+def merge_aliases(*alias_lists: Optional[Iterable[str]]) -> List[str]:
+    """
+    Union of alias lists in their first-seen order
+
+    Args:
+        *alias_lists (Optional[Iterable[str]]): Alias references, e.g. the stored ones and the ones found by this run
+
+    Returns:
+        List[str]: every alias reference once
+    """
+    return list(dict.fromkeys(alias for aliases in alias_lists if aliases for alias in aliases))
+
+
+class MinHashDeduplicator:
+    """
+    Detect near-duplicate documents with MinHash signatures of character shingles and LSH banding.
+
+    The first document of a group of near-duplicates is kept as the canonical one, the later ones are
+    reported as its aliases. Signatures are kept in memory for the lifetime of the deduplicator, so
+    duplicates are detected within one ingestion run (or one process of the sharded ingestion).
+    Documents may also be dropped when their vector is within `vector_score` of a stored point, see
+    `drop_similar`. Both storages apply the same stage, the async one included. Methods are thread-safe.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        vector_score: Optional[float] = None,
+        seed: int = 1,
+    ) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.vector_score = vector_score
+        
+        random = np.random.default_rng(seed)
+        self.a = random.integers(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self.b = random.integers(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+        
+        self.lock = threading.Lock()
+        # Canonical reference of every LSH bucket, keyed by band index and band bytes
+        self.buckets: Dict[tuple, str] = {}
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.aliases: Dict[str, List[str]] = {}
+        self.dirty: Set[str] = set()
+    
+    @classmethod
+    def from_env(cls) -> Optional["MinHashDeduplicator"]:
+        """
+        Create the deduplicator from DEDUP_* variables
+
+        Returns:
+            Optional[MinHashDeduplicator]: None when DEDUP_MINHASH_THRESHOLD is 0, every document is then saved
+        """
+        threshold = float(os.getenv("DEDUP_MINHASH_THRESHOLD") or 0)
+        if threshold <= 0:
+            return None
+        vector_score = os.getenv("DEDUP_VECTOR_SCORE")
+        return cls(
+            threshold=threshold,
+            num_perm=int(os.getenv("DEDUP_MINHASH_PERMUTATIONS", "64")),
+            bands=int(os.getenv("DEDUP_MINHASH_BANDS", "16")),
+            shingle_size=int(os.getenv("DEDUP_SHINGLE_SIZE", "5")),
+            vector_score=float(vector_score) if vector_score else None,
+        )
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of the character shingles of the normalized text
+
+        Args:
+            text (str): Text of the document
+
+        Returns:
+            Optional[np.ndarray]: `num_perm` uint32 values, None when the text is empty
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        size = self.shingle_size
+        shingles = {normalized[start:start + size] for start in range(max(len(normalized) - size + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % HASH_PRIME
+        return (permuted.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    
+    def check(self, data: SourceData) -> Optional[str]:
+        """
+        Find the canonical document of a near-duplicate, or register the document as a canonical one
+
+        Args:
+            data (SourceData): Document to be saved
+
+        Returns:
+            Optional[str]: Reference of the canonical document, None when the document must be saved
+        """
+        signature = self.signature(data.text)
+        if signature is None:
+            return None
+        
+        with self.lock:
+            if data.ref in self.signatures:
+                return None
+            canonical = self._find(signature)
+            if canonical is None:
+                self._add(data.ref, signature)
+            else:
+                self._add_alias(canonical, data.ref)
+            return canonical
+    
+    def register(self, data: SourceData) -> None:
+        """
+        Register a document which is already stored, e.g. unchanged documents of a sync, so its duplicates are detected
+
+        Args:
+            data (SourceData): Stored document
+        """
+        signature = self.signature(data.text)
+        if signature is None:
+            return
+        with self.lock:
+            if data.ref not in self.signatures and self._find(signature) is None:
+                self._add(data.ref, signature)
+    
+    def add_alias(self, canonical: str, alias: str) -> None:
+        with self.lock:
+            self._add_alias(canonical, alias)
+    
+    def aliases_of(self, canonical: str) -> List[str]:
+        with self.lock:
+            return list(self.aliases.get(canonical, ()))
+    
+    def drop_duplicates(self, batch: List[SourceData]) -> List[SourceData]:
+        """
+        Drop the near-duplicates of documents seen before, they are recorded as aliases of their canonical document
+
+        Args:
+            batch (List[SourceData]): Documents to be saved
+
+        Returns:
+            List[SourceData]: Documents which must be saved
+        """
+        documents = []
+        for data in batch:
+            if self.check(data) is None:
+                documents.append(data)
+            else:
+                DEDUPLICATED_DOCUMENTS.inc(method="minhash")
+        return documents
+    
+    def drop_similar(self, embedded: List[EmbeddedModel], neighbour_refs: List[List[Optional[str]]]) -> List[EmbeddedModel]:
+        """
+        Drop the documents which have a stored neighbour within `vector_score`, they are recorded as its aliases
+
+        Args:
+            embedded (List[EmbeddedModel]): Embedded documents to be saved
+            neighbour_refs (List[List[Optional[str]]]): References of the stored points found within `vector_score` of every document
+
+        Returns:
+            List[EmbeddedModel]: Documents which must be saved
+        """
+        kept = []
+        for data, refs in zip(embedded, neighbour_refs):
+            # The closest point may be the previous version of the document itself
+            canonical = next((ref for ref in refs if ref not in (None, data.ref)), None)
+            if canonical is None:
+                kept.append(data)
+            else:
+                self.add_alias(canonical, data.ref)
+                DEDUPLICATED_DOCUMENTS.inc(method="vector")
+        return kept
+    
+    def with_aliases(self, documents: List[SourceData], stored_aliases: Dict[str, List[str]]) -> List[SourceData]:
+        """
+        Carry the aliases of the documents in their metadata, so saving a canonical document again does not lose them
+
+        Args:
+            documents (List[SourceData]): Documents to be saved
+            stored_aliases (Dict[str, List[str]]): Aliases in the payloads of the stored points per reference
+
+        Returns:
+            List[SourceData]: Documents with an `aliases` metadata when they have any, the given ones are not modified
+        """
+        merged = []
+        for data in documents:
+            aliases = merge_aliases(data.metadata.get("aliases"), stored_aliases.get(data.ref), self.aliases_of(data.ref))
+            if aliases:
+                data = SourceData(data.text, data.ref, metadata={**data.metadata, "aliases": aliases}, sections=data.sections)
+            merged.append(data)
+        return merged
+    
+    def pop_dirty_aliases(self) -> Dict[str, List[str]]:
+        """
+        Take the aliases of the canonical documents which got new aliases since the last call
+
+        Returns:
+            Dict[str, List[str]]: every alias reference per canonical reference
+        """
+        with self.lock:
+            aliases = {canonical: list(self.aliases[canonical]) for canonical in self.dirty}
+            self.dirty.clear()
+        return aliases
+    
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+    
+    def _find(self, signature: np.ndarray) -> Optional[str]:
+        best, best_similarity = None, self.threshold
+        for key in self._band_keys(signature):
+            candidate = self.buckets.get(key)
+            if candidate is None:
+                continue
+            # Fraction of equal MinHash values estimates the Jaccard similarity of the shingles
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+    
+    def _add(self, ref: str, signature: np.ndarray) -> None:
+        self.signatures[ref] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, ref)
+    
+    def _add_alias(self, canonical: str, alias: str) -> None:
+        aliases = self.aliases.setdefault(canonical, [])
+        if alias not in aliases:
+            aliases.append(alias)
+            self.dirty.add(canonical)
@@ -0,0 +1,81 @@
+from typing import List
+
+import numpy as np
+
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.crawler.SourceData import SourceData
+
+class AsyncEmbeddingInterface:
+    """
+    Interface for asyncio based embedding class
+    You have to implement this method when you make a new async embedding class.
+    """
+    
+    async def embed(self, data: SourceData) -> EmbeddedModel:
+        """
+        Embedding text data into vector
+
+        Args:
+            data (SourceData): SourceData to be embedded
+        """
+        pass
+    
+    async def embed_simple_text(self, text: str) -> np.ndarray:
+        """
+        Embedding text into vector
+
+        Args:
+            text (str): Text to be embedded
+
+        Returns:
+            np.ndarray: float32 vector
+        """
+        pass
+    
+    async def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        """
+        Embedding many text data into vectors
+
+        Args:
+            datas (List[SourceData]): SourceData to be embedded
+
+        Returns:
+            List[EmbeddedModel]: EmbeddedModel in the same order as `datas`
+        """
+        pass
+    
+    async def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding many texts into vectors
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, in the same order as `texts`
+        """
+        pass
+    
+    def get_vector_size(self) -> int:
+        """
+        Get the vector size of the embedding model
+
+        Returns:
+            int: vector size
+        """
+        pass
+    
+    def get_model_name(self) -> str:
+        """
+        Get the name of the embedding model
+
+        Returns:
+            str: model name
+        """
+        return type(self).__name__
+    
+    async def close(self) -> None:
+        """
+        Release the connections held by the client
+        """
+        pass
@@ -1,18 +1,50 @@
-from typing import List
+from typing import Any, Dict, Optional
+
+from src.crawler.SourceData import SourceData
+from src.utils.vectors import VectorLike, as_vector, format_text, format_vector
 
 
 class EmbeddedModel:
     """
     EmbeddedModel is a class that represents the embedded text, original text and the reference of the text.
+    The embedded text is kept as a float32 array, which is a view when it is a row of a batch matrix.
     """
     
-    def __init__(self, embedded_text: List[float], original_text: str, ref: str) -> None:
-        self.embedded_text = embedded_text
+    __slots__ = ("embedded_text", "original_text", "ref", "metadata")
+    
+    def __init__(
+        self,
+        embedded_text: VectorLike,
+        original_text: str,
+        ref: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.embedded_text = as_vector(embedded_text)
         self.original_text = original_text
         self.ref = ref
+        self.metadata = metadata or {}
+    
+    @classmethod
+    def from_source_data(cls, data: SourceData, embedded_text: VectorLike) -> "EmbeddedModel":
+        """
+        Create the EmbeddedModel of a SourceData, keeping its reference and metadata
+
+        Args:
+            data (SourceData): SourceData which is embedded
+            embedded_text (VectorLike): Embedded vector of the data
+
+        Returns:
+            EmbeddedModel: EmbeddedModel
+        """
+        return cls(
+            embedded_text=embedded_text,
+            original_text=data.text,
+            ref=data.ref,
+            metadata=data.metadata,
+        )
         
     def __repr__(self) -> str:
-        return f"EmbeddedModel(embedded_text={self.embedded_text}, original_text={self.original_text}, ref={self.ref})"
+        return f"EmbeddedModel(embedded_text={format_vector(self.embedded_text)}, original_text={format_text(self.original_text)}, ref={self.ref})"
     
     def __str__(self) -> str:
-        return f"EmbeddedModel(embedded_text={self.embedded_text}, original_text={self.original_text}, ref={self.ref})"
\ No newline at end of file
+        return f"EmbeddedModel(embedded_text={format_vector(self.embedded_text)}, original_text={format_text(self.original_text)}, ref={self.ref})"
\ No newline at end of file
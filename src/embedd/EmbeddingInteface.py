@@ -1,7 +1,10 @@
 from typing import List
 
+import numpy as np
+
 from src.embedd.EmbeddedModel import EmbeddedModel
 from src.crawler.SourceData import SourceData
+from src.utils.vectors import as_matrix
 
 class EmbeddingInterface:
     """
@@ -19,15 +22,43 @@ class EmbeddingInterface:
         pass
     
     
-    def embed_simple_text(self, text: str) -> List[float]:
+    def embed_simple_text(self, text: str) -> np.ndarray:
         """
         Embedding text data into vector
 
         Args:
             text_data (SourceData): SourceData to be embedded
+
+        Returns:
+            np.ndarray: float32 vector
         """
         pass
     
+    def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        """
+        Embedding many text data into vectors.
+        Implementations should send as few requests as possible, the default embeds one by one.
+
+        Args:
+            datas (List[SourceData]): SourceData to be embedded
+
+        Returns:
+            List[EmbeddedModel]: EmbeddedModel in the same order as `datas`
+        """
+        return [self.embed(data) for data in datas]
+    
+    def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding many texts into vectors
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, in the same order as `texts`
+        """
+        return as_matrix((self.embed_simple_text(text) for text in texts), self.get_vector_size())
+    
     def get_vector_size(self) -> int:
         """
         Get the vector size of the embedding model
@@ -35,4 +66,13 @@ class EmbeddingInterface:
         Returns:
             int: vector size
         """
-        pass
\ No newline at end of file
+        pass
+    
+    def get_model_name(self) -> str:
+        """
+        Get the name of the embedding model, vectors of different models must not be mixed
+
+        Returns:
+            str: model name
+        """
+        return type(self).__name__
\ No newline at end of file
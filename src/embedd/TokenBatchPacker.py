@@ -0,0 +1,130 @@
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Maximum number of tokens of one input of the OpenAI embedding models
+MAX_INPUT_TOKENS = 8191
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of the text without a tokenizer.
+    ASCII text is counted as 4 characters per token and any other character (e.g. Hangul) as 2 tokens,
+    which over-estimates rather than under-estimates the real count.
+
+    Args:
+        text (str): Text to be measured
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    ascii_count = sum(1 for char in text if char.isascii())
+    return (ascii_count + 3) // 4 + (len(text) - ascii_count) * 2
+
+
+def token_counter_for(model: Optional[str]) -> Callable[[str], int]:
+    """
+    Get the token counter of the model.
+    tiktoken is used if it is installed, otherwise `estimate_tokens` is used.
+
+    Args:
+        model (Optional[str]): Name of the embedding model
+
+    Returns:
+        Callable[[str], int]: Function counting the tokens of a text
+    """
+    if tiktoken is None:
+        return estimate_tokens
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens) -> Tuple[str, int]:
+    """
+    Cut the text to its longest prefix within `max_tokens`, found by a binary search over the prefix length
+    so any token counter can be used.
+
+    Args:
+        text (str): Text to be cut
+        max_tokens (int): Maximum number of tokens of the text
+        count_tokens (Callable[[str], int]): Function counting the tokens of a text
+
+    Returns:
+        str: The text itself when it fits, its longest fitting prefix otherwise
+        int: Number of tokens of the returned text
+    """
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text, tokens
+
+    # `low` characters fit and `high` characters do not
+    low, low_tokens, high = 0, 0, len(text)
+    while high - low > 1:
+        middle = (low + high) // 2
+        middle_tokens = count_tokens(text[:middle])
+        if middle_tokens <= max_tokens:
+            low, low_tokens = middle, middle_tokens
+        else:
+            high = middle
+    return text[:low], low_tokens
+
+
+def fit_texts(texts: List[str], max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens) -> Tuple[List[str], List[int]]:
+    """
+    Truncate the texts exceeding the per-input token limit, which the API would reject
+
+    Args:
+        texts (List[str]): Texts to be embedded
+        max_tokens (int): Maximum number of tokens of one input
+        count_tokens (Callable[[str], int]): Function counting the tokens of a text
+
+    Returns:
+        List[str]: Texts within `max_tokens`, in the input order
+        List[int]: Number of tokens of every returned text, to be given to `pack_batches`
+    """
+    fitted = [truncate_to_tokens(text, max_tokens, count_tokens) for text in texts]
+    return [text for text, _ in fitted], [tokens for _, tokens in fitted]
+
+
+def pack_batches(
+    texts: List[str],
+    max_inputs: int,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    token_counts: Optional[List[int]] = None,
+) -> Iterator[List[int]]:
+    """
+    Pack texts into request batches which respect the per-request input and token limits.
+    A text exceeding `max_tokens` by itself is sent alone in its own batch, use `fit_texts` first so none does.
+
+    Args:
+        texts (List[str]): Texts to be packed
+        max_inputs (int): Maximum number of inputs per request
+        max_tokens (int): Maximum number of tokens per request
+        count_tokens (Callable[[str], int]): Function counting the tokens of a text
+        token_counts (Optional[List[int]]): Number of tokens of every text when they are already counted
+
+    Returns:
+        Iterator[List[int]]: Indexes of the texts for each batch, in the input order
+    """
+    batch = []
+    batch_tokens = 0
+
+    for index, text in enumerate(texts):
+        tokens = token_counts[index] if token_counts is not None else count_tokens(text)
+        if batch and (len(batch) >= max_inputs or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(index)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
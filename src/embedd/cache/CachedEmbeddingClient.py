@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.crawler.SourceData import SourceData
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.embedd.EmbeddingInteface import EmbeddingInterface
+from src.metrics.Instruments import EMBEDDING_CACHE_LOOKUPS
+from src.utils.vectors import VECTOR_DTYPE, as_matrix, as_vector
+
+
+class CachedEmbeddingClient(EmbeddingInterface):
+    """
+    Content-addressed embedding cache which wraps any EmbeddingInterface.
+    Vectors are keyed by (model name, sha256 of text), kept in a SQLite file as float32 blobs
+    and an in-process LRU is put in front of it, so only texts never embedded before reach the wrapped client.
+    """
+    
+    def __init__(
+        self,
+        embedding_client: EmbeddingInterface,
+        path: Optional[str] = None,
+        lru_size: Optional[int] = None,
+        busy_timeout: float = 60.0,
+    ) -> None:
+        if not embedding_client.get_model_name():
+            # Vectors of different models must never be mixed, so they cannot be cached without the model name
+            raise ValueError(f"{type(embedding_client).__name__} has no model name, the embedding cache needs one to key its vectors.")
+        self.embedding_client = embedding_client
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", ".cache/embedding_cache.sqlite3")
+        self.lru_size = lru_size if lru_size is not None else int(os.getenv("EMBEDDING_CACHE_LRU_SIZE", "10000"))
+        
+        self.lru: OrderedDict[Tuple[str, bytes], np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Workers of the sharded ingestion share the file, WAL lets them read while one of them writes
+        # and the timeout makes a writer wait for the lock instead of failing with "database is locked"
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=busy_timeout)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash BLOB NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self.connection.commit()
+    
+    def embed(self, data: SourceData) -> EmbeddedModel:
+        return self.embed_batch([data])[0]
+    
+    def embed_simple_text(self, text: str) -> np.ndarray:
+        return self.embed_simple_texts([text])[0]
+    
+    def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        embedded = self.embed_simple_texts([data.text for data in datas])
+        
+        return [EmbeddedModel.from_source_data(data, vector) for data, vector in zip(datas, embedded)]
+    
+    def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding texts, only the texts missing in the cache are sent to the wrapped client in one batch
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, in the same order as `texts`
+        """
+        model_name = self.get_model_name()
+        keys = [(model_name, hashlib.sha256(text.encode("utf-8")).digest()) for text in texts]
+        found = self._lookup(keys)
+        
+        missing: Dict[Tuple[str, bytes], str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            vectors = self.embedding_client.embed_simple_texts(list(missing.values()))
+            computed = dict(zip(missing.keys(), as_matrix(vectors)))
+            self._store(computed)
+            found.update(computed)
+        
+        return as_matrix((found[key] for key in keys), self.get_vector_size())
+    
+    def get_vector_size(self) -> int:
+        return self.embedding_client.get_vector_size()
+    
+    def get_model_name(self) -> str:
+        return self.embedding_client.get_model_name()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the cache
+
+        Returns:
+            Dict[str, int]: hits of the LRU, hits of the SQLite file, misses and LRU evictions
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "lru_entries": len(self.lru),
+            }
+    
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+    
+    def _lookup(self, keys: List[Tuple[str, bytes]]) -> Dict[Tuple[str, bytes], np.ndarray]:
+        found = {}
+        
+        with self.lock:
+            for key in keys:
+                if key in self.lru:
+                    self.lru.move_to_end(key)
+                    found[key] = self.lru[key]
+                    self.hits += 1
+                    EMBEDDING_CACHE_LOOKUPS.inc(result="hit")
+            
+            for key in dict.fromkeys(key for key in keys if key not in found):
+                row = self.connection.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?", key
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    EMBEDDING_CACHE_LOOKUPS.inc(result="miss")
+                    continue
+                vector = np.frombuffer(row[0], dtype=VECTOR_DTYPE)
+                found[key] = vector
+                self.disk_hits += 1
+                EMBEDDING_CACHE_LOOKUPS.inc(result="disk_hit")
+                self._remember(key, vector)
+        
+        return found
+    
+    def _store(self, computed: Dict[Tuple[str, bytes], np.ndarray]) -> None:
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, text_hash, as_vector(vector).tobytes()) for (model, text_hash), vector in computed.items()],
+            )
+            self.connection.commit()
+            # Rows are copied so that an LRU entry does not keep its whole batch matrix alive
+            for key, vector in computed.items():
+                self._remember(key, vector.copy())
+    
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        self.lru[key] = vector
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+            self.evictions += 1
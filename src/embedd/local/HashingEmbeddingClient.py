@@ -0,0 +1,100 @@
+import os
+import unicodedata
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.embedd.EmbeddingInteface import EmbeddingInterface
+from src.crawler.SourceData import SourceData
+from src.metrics.Instruments import EMBEDDING_BATCH_SIZE, EMBEDDING_REQUEST_SECONDS
+
+class HashingEmbeddingClient(EmbeddingInterface):
+    """
+    Offline CPU embedding baseline which needs no model file and no network.
+    Each text is split into words and character n-grams (which works for Korean without a morphological analyzer),
+    the features are hashed with signed feature hashing into `LOCAL_EMBEDDING_DIM` buckets
+    and every batch is weighted and L2 normalized as one NumPy matrix, so cosine distance can be used as is.
+    """
+    
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        ngram_range: Tuple[int, int] = (2, 3),
+    ) -> None:
+        self.dimension = dimension or int(os.getenv("LOCAL_EMBEDDING_DIM", "768"))
+        self.ngram_range = ngram_range
+    
+    def embed(self, data: SourceData) -> EmbeddedModel:
+        return self.embed_batch([data])[0]
+    
+    def embed_simple_text(self, text: str) -> np.ndarray:
+        return self.embed_simple_texts([text])[0]
+    
+    def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        embedded = self.embed_simple_texts([data.text for data in datas])
+        
+        return [EmbeddedModel.from_source_data(data, vector) for data, vector in zip(datas, embedded)]
+    
+    def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        model_name = self.get_model_name()
+        EMBEDDING_BATCH_SIZE.observe(len(texts), model=model_name)
+        with EMBEDDING_REQUEST_SECONDS.time(model=model_name):
+            return self.embed_matrix(texts)
+    
+    def embed_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding texts into a float32 matrix of shape (len(texts), dimension)
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: L2 normalized vectors, one row per text
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        # Tokenization is the pure Python part and holds the GIL, so threads would not speed it up,
+        # the rest runs on the whole batch at once
+        hashed = [self._hash_features(text) for text in texts]
+        
+        lengths = np.fromiter((len(features) for features in hashed), dtype=np.int64, count=len(hashed))
+        features = np.fromiter(
+            (feature for text_features in hashed for feature in text_features),
+            dtype=np.uint32,
+            count=int(lengths.sum()),
+        )
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        columns = (features % self.dimension).astype(np.int64)
+        signs = np.where(features & 0x80000000, -1.0, 1.0)
+        
+        counts = np.bincount(rows * self.dimension + columns, weights=signs, minlength=len(texts) * self.dimension)
+        matrix = counts.reshape(len(texts), self.dimension).astype(np.float32)
+        
+        # Sublinear term frequency, so repeated words do not dominate the vector
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        
+        return matrix
+    
+    def get_vector_size(self) -> int:
+        return self.dimension
+    
+    def get_model_name(self) -> str:
+        return f"hashing-{self.ngram_range[0]}-{self.ngram_range[1]}-{self.dimension}"
+    
+    def _hash_features(self, text: str) -> List[int]:
+        normalized = unicodedata.normalize("NFKC", text).lower()
+        features = []
+        
+        for word in normalized.split():
+            features.append(zlib.crc32(word.encode("utf-8")))
+            padded = f"<{word}>"
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for start in range(len(padded) - n + 1):
+                    features.append(zlib.crc32(padded[start:start + n].encode("utf-8"), n))
+        
+        return features
@@ -0,0 +1,127 @@
+import asyncio
+import os
+from typing import List, Optional
+
+import aiohttp
+import numpy as np
+
+from src.embedd.AsyncEmbeddingInterface import AsyncEmbeddingInterface
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.embedd.openai.OpenAIClient import DEFAULT_EMBEDDING_MODEL
+from src.embedd.TokenBatchPacker import MAX_INPUT_TOKENS, fit_texts, pack_batches, token_counter_for
+from src.crawler.SourceData import SourceData
+from src.metrics.Instruments import EMBEDDING_BATCH_SIZE, EMBEDDING_REQUEST_SECONDS, EMBEDDING_TOKENS
+from src.utils.vectors import VECTOR_DTYPE
+from src.utils.retry import RETRYABLE_STATUS_CODES, RetryableError, parse_retry_after, retry_with_backoff
+
+class AsyncOpenAIClient(AsyncEmbeddingInterface):
+    """
+    asyncio counterpart of OpenAIClient.
+    Requests share one pooled aiohttp session, at most `OPENAI_MAX_CONCURRENCY` of them are in flight
+    and 429/5xx answers are retried with exponential backoff.
+    """
+    
+    def __init__(self, max_concurrency: Optional[int] = None, max_retries: Optional[int] = None) -> None:
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.api_base = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip("/")
+        self.model = os.getenv("OPENAI_EMBEDDING_MODEL") or DEFAULT_EMBEDDING_MODEL
+        self.max_batch_inputs = int(os.getenv("OPENAI_EMBEDDING_MAX_BATCH_INPUTS", "2048"))
+        self.max_batch_tokens = int(os.getenv("OPENAI_EMBEDDING_MAX_BATCH_TOKENS", "100000"))
+        self.max_input_tokens = int(os.getenv("OPENAI_EMBEDDING_MAX_INPUT_TOKENS", str(MAX_INPUT_TOKENS)))
+        self.max_concurrency = max_concurrency or int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+        self.count_tokens = token_counter_for(self.model)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> "AsyncOpenAIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def embed(self, data: SourceData) -> EmbeddedModel:
+        return (await self.embed_batch([data]))[0]
+    
+    async def embed_simple_text(self, text: str) -> np.ndarray:
+        return (await self.embed_simple_texts([text]))[0]
+    
+    async def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        embedded = await self.embed_simple_texts([data.text for data in datas])
+        
+        return [EmbeddedModel.from_source_data(data, vector) for data, vector in zip(datas, embedded)]
+    
+    async def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding many texts into vectors using OpenAI Embedding API.
+        Texts are packed the same way as OpenAIClient and the requests are sent concurrently.
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, in the same order as `texts`
+        """
+        if not texts:
+            return np.zeros((0, self.get_vector_size()), dtype=VECTOR_DTYPE)
+        
+        # Inputs over the per-input limit would fail the whole request, they are embedded truncated
+        texts, token_counts = fit_texts(texts, min(self.max_input_tokens, self.max_batch_tokens), self.count_tokens)
+        batches = list(pack_batches(texts, self.max_batch_inputs, self.max_batch_tokens, token_counts=token_counts))
+        responses = await asyncio.gather(
+            *[self._create_embeddings([texts[index] for index in batch]) for batch in batches]
+        )
+        
+        embedded = np.empty((len(texts), len(responses[0]["data"][0]["embedding"])), dtype=VECTOR_DTYPE)
+        for batch, response in zip(batches, responses):
+            for item in response["data"]:
+                embedded[batch[item["index"]]] = item["embedding"]
+        
+        return embedded
+    
+    def get_vector_size(self) -> int:
+        return 1536
+    
+    def get_model_name(self) -> str:
+        return self.model
+    
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session must be created inside the running event loop
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+    
+    async def _create_embeddings(self, inputs: List[str]) -> dict:
+        session = self._get_session()
+        
+        async def request() -> dict:
+            async with self.semaphore:
+                try:
+                    with EMBEDDING_REQUEST_SECONDS.time(model=self.model):
+                        async with session.post(
+                            f"{self.api_base}/embeddings",
+                            json={"input": inputs, "model": self.model},
+                        ) as response:
+                            if response.status in RETRYABLE_STATUS_CODES:
+                                raise RetryableError(
+                                    f"OpenAI Embedding API answered {response.status}",
+                                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                                )
+                            response.raise_for_status()
+                            return await response.json()
+                except aiohttp.ClientConnectionError as error:
+                    raise RetryableError(f"OpenAI Embedding API is unreachable: {error}") from error
+        
+        response = await retry_with_backoff(request, self.max_retries, operation="openai_embeddings")
+        EMBEDDING_BATCH_SIZE.observe(len(inputs), model=self.model)
+        EMBEDDING_TOKENS.inc(response.get("usage", {}).get("total_tokens", 0), model=self.model)
+        return response
@@ -1,16 +1,27 @@
 import os
-from typing import List
+from typing import List, Optional, Union
+import numpy as np
 import openai
 
 from src.embedd.EmbeddedModel import EmbeddedModel
 from src.embedd.EmbeddingInteface import EmbeddingInterface
+from src.embedd.TokenBatchPacker import MAX_INPUT_TOKENS, fit_texts, pack_batches, token_counter_for, truncate_to_tokens
 from src.crawler.SourceData import SourceData
+from src.metrics.Instruments import EMBEDDING_BATCH_SIZE, EMBEDDING_REQUEST_SECONDS, EMBEDDING_TOKENS
+from src.utils.vectors import VECTOR_DTYPE, as_vector
+
+# Model used when OPENAI_EMBEDDING_MODEL is not set, its vectors have `get_vector_size` dimensions
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
 
 class OpenAIClient(EmbeddingInterface):
     
     def __init__(self) -> None:
         openai.api_key = os.getenv("OPENAI_API_KEY")
-        self.model = os.getenv("OPENAI_EMBEDDING_MODEL")
+        self.model = os.getenv("OPENAI_EMBEDDING_MODEL") or DEFAULT_EMBEDDING_MODEL
+        self.max_batch_inputs = int(os.getenv("OPENAI_EMBEDDING_MAX_BATCH_INPUTS", "2048"))
+        self.max_batch_tokens = int(os.getenv("OPENAI_EMBEDDING_MAX_BATCH_TOKENS", "100000"))
+        self.max_input_tokens = int(os.getenv("OPENAI_EMBEDDING_MAX_INPUT_TOKENS", str(MAX_INPUT_TOKENS)))
+        self.count_tokens = token_counter_for(self.model)
         pass
     
     
@@ -34,10 +45,11 @@ class OpenAIClient(EmbeddingInterface):
             embedded_text = embedded,
             original_text=text_data,
             ref=data_ref,
+            metadata=data.metadata,
         )
     
     
-    def embed_simple_text(self, text: str) -> List[float]:
+    def embed_simple_text(self, text: str) -> np.ndarray:
         """
         Embedding text data into vector using OpenAI Embedding API
 
@@ -45,18 +57,72 @@ class OpenAIClient(EmbeddingInterface):
             text (str): Text to be embedded
 
         Returns:
-            List[float]: Embedded vector
+            np.ndarray: Embedded float32 vector
+        """
+        
+        # Same per-input limit as `embed_simple_texts`, an oversized query would fail the request
+        text, _ = truncate_to_tokens(text, min(self.max_input_tokens, self.max_batch_tokens), self.count_tokens)
+        response = self._create_embeddings(text)
+        
+        return as_vector(response['data'][0]['embedding'])
+    
+    def embed_batch(self, datas: List[SourceData]) -> List[EmbeddedModel]:
+        """
+        Embedding many text data into vectors using as few OpenAI Embedding API requests as possible
+
+        Args:
+            datas (List[SourceData]): SourceData to be embedded
+
+        Returns:
+            List[EmbeddedModel]: EmbeddedModel in the same order as `datas`
         """
         
-        embedded = openai.Embedding.create(
-            input=text,
-            model=self.model,
-        )['data'][0]['embedding']
+        embedded = self.embed_simple_texts([data.text for data in datas])
+        
+        return [EmbeddedModel.from_source_data(data, vector) for data, vector in zip(datas, embedded)]
+    
+    def embed_simple_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embedding many texts into vectors using OpenAI Embedding API.
+        Texts are packed into requests respecting `OPENAI_EMBEDDING_MAX_BATCH_INPUTS` and `OPENAI_EMBEDDING_MAX_BATCH_TOKENS`.
+
+        Args:
+            texts (List[str]): Texts to be embedded
+
+        Returns:
+            np.ndarray: float32 matrix with one row per text, in the same order as `texts`
+        """
+        
+        if not texts:
+            return np.zeros((0, self.get_vector_size()), dtype=VECTOR_DTYPE)
+        
+        # Allocated on the first response, the size of the vectors depends on the model
+        embedded: Optional[np.ndarray] = None
+        
+        # Inputs over the per-input limit would fail the whole request, they are embedded truncated
+        texts, token_counts = fit_texts(texts, min(self.max_input_tokens, self.max_batch_tokens), self.count_tokens)
+        for batch in pack_batches(texts, self.max_batch_inputs, self.max_batch_tokens, token_counts=token_counts):
+            response = self._create_embeddings([texts[index] for index in batch])
+            # The API answers with the position of each input, which is not guaranteed to be in order
+            for item in response['data']:
+                if embedded is None:
+                    embedded = np.empty((len(texts), len(item['embedding'])), dtype=VECTOR_DTYPE)
+                embedded[batch[item['index']]] = item['embedding']
         
         return embedded
     
     def get_vector_size(self) -> int:
         return 1536
+    
+    def get_model_name(self) -> str:
+        return self.model
+    
+    def _create_embeddings(self, inputs: Union[str, List[str]]) -> dict:
+        with EMBEDDING_REQUEST_SECONDS.time(model=self.model):
+            response = openai.Embedding.create(input=inputs, model=self.model)
+        EMBEDDING_BATCH_SIZE.observe(1 if isinstance(inputs, str) else len(inputs), model=self.model)
+        EMBEDDING_TOKENS.inc(response.get('usage', {}).get('total_tokens', 0), model=self.model)
+        return response
 
 if __name__ == "__main__":
     client = OpenAIClient()
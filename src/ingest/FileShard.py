@@ -0,0 +1,61 @@
+import hashlib
+import os
+from typing import Iterable, List
+
+
+class FileShard:
+    """
+    Byte range [start, end) of a JSONL file, both ends are at the beginning of a line
+    """
+    
+    __slots__ = ("path", "start", "end")
+    
+    def __init__(self, path: str, start: int, end: int) -> None:
+        self.path = path
+        self.start = start
+        self.end = end
+    
+    @property
+    def shard_id(self) -> str:
+        path_hash = hashlib.sha1(os.path.abspath(self.path).encode("utf-8")).hexdigest()[:8]
+        return f"{os.path.basename(self.path)}-{path_hash}-{self.start}"
+    
+    def __repr__(self) -> str:
+        return f"FileShard(path={self.path}, start={self.start}, end={self.end})"
+    
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def plan_file_shards(file_paths: Iterable[str], shard_bytes: int) -> List[FileShard]:
+    """
+    Split files into shards of about `shard_bytes` bytes, moving every boundary to the beginning of the next line
+
+    Args:
+        file_paths (Iterable[str]): JSONL files
+        shard_bytes (int): Target size of a shard
+
+    Returns:
+        List[FileShard]: Shards covering every line of the files once
+    """
+    if shard_bytes < 1:
+        raise ValueError("shard_bytes must be greater than 0")
+    
+    shards = []
+    for file_path in file_paths:
+        size = os.path.getsize(file_path)
+        if size == 0:
+            continue
+        
+        boundaries = [0]
+        with open(file_path, "rb") as file:
+            while boundaries[-1] + shard_bytes < size:
+                file.seek(boundaries[-1] + shard_bytes)
+                file.readline()
+                if file.tell() >= size:
+                    break
+                boundaries.append(file.tell())
+        boundaries.append(size)
+        
+        shards.extend(FileShard(file_path, start, end) for start, end in zip(boundaries, boundaries[1:]))
+    return shards
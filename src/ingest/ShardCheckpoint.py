@@ -0,0 +1,67 @@
+import json
+import os
+from typing import Optional
+
+from src.ingest.FileShard import FileShard
+
+
+class ShardCheckpoint:
+    """
+    Progress of the ingestion of one shard, kept in `<checkpoint_dir>/<shard_id>.json`.
+    `offset` is the byte offset following the last saved line, so a restarted worker resumes from there.
+    """
+    
+    def __init__(self, checkpoint_dir: str, shard: FileShard) -> None:
+        self.path = os.path.join(checkpoint_dir, f"{shard.shard_id}.json")
+        self.shard = shard
+        self.offset = shard.start
+        self.saved = 0
+        self.done = False
+    
+    @classmethod
+    def load(cls, checkpoint_dir: str, shard: FileShard) -> "ShardCheckpoint":
+        """
+        Load the checkpoint of the shard, a missing checkpoint or one of another range of the file starts from the beginning
+
+        Args:
+            checkpoint_dir (str): Directory of the checkpoint files
+            shard (FileShard): Shard to be ingested
+
+        Returns:
+            ShardCheckpoint: Checkpoint of the shard
+        """
+        checkpoint = cls(checkpoint_dir, shard)
+        stored = checkpoint._read()
+        if stored is not None and (stored.get("path"), stored.get("start"), stored.get("end")) == (shard.path, shard.start, shard.end):
+            checkpoint.offset = stored["offset"]
+            checkpoint.saved = stored["saved"]
+            checkpoint.done = stored["done"]
+        return checkpoint
+    
+    def save(self, offset: int, saved: int, done: bool = False) -> None:
+        self.offset = offset
+        self.saved = saved
+        self.done = done
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Written next to the checkpoint and renamed, so a crash never leaves a partial file
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as output:
+            json.dump(
+                {
+                    "path": self.shard.path,
+                    "start": self.shard.start,
+                    "end": self.shard.end,
+                    "offset": offset,
+                    "saved": saved,
+                    "done": done,
+                },
+                output,
+            )
+        os.replace(temporary_path, self.path)
+    
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.path) as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (FileNotFoundError, ValueError):
+            return None
@@ -0,0 +1,144 @@
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from src.crawler.naver.LocalNaverJsonParser import LocalNaverJsonParser
+from src.ingest.FileShard import FileShard, plan_file_shards
+from src.ingest.ShardCheckpoint import ShardCheckpoint
+from src.storage.qdrant.QdrantClient import DEFAULT_EMBED_BATCH_SIZE, DEFAULT_UPSERT_BATCH_SIZE, QdrantClientStorage
+from src.utils.batching import chunked
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+
+# Storage of the worker process, created once by `_init_worker`
+_worker_storage: Optional[QdrantClientStorage] = None
+
+
+class ShardedIngestion:
+    """
+    Ingest the JSONL files of a LocalNaverJsonParser with a pool of processes.
+    Files are split into line-aligned shards, each worker parses, embeds and upserts whole shards with its own clients
+    and checkpoints its progress after every upsert, so an interrupted load only redoes the last batch of each shard.
+    Re-upserting a batch is harmless since point ids are derived from the refs.
+    """
+    
+    def __init__(
+        self,
+        crawler: LocalNaverJsonParser,
+        storage_factory: Callable[[], QdrantClientStorage],
+        checkpoint_dir: str,
+        workers: Optional[int] = None,
+        shard_bytes: int = DEFAULT_SHARD_BYTES,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+    ) -> None:
+        self.crawler = crawler
+        self.storage_factory = storage_factory
+        self.checkpoint_dir = checkpoint_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_bytes = shard_bytes
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+    
+    def run(self, restart: bool = False) -> Dict[str, int]:
+        """
+        Ingest every shard which is not checkpointed as done
+
+        Args:
+            restart (bool): Delete the checkpoints and ingest every shard again
+
+        Returns:
+            Dict[str, int]: Number of shards, shards already done, failed shards and data saved by the shards finished in this run
+        """
+        if restart and os.path.isdir(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir)
+        
+        shards = plan_file_shards(self.crawler.iter_files(), self.shard_bytes)
+        checkpoints = [ShardCheckpoint.load(self.checkpoint_dir, shard) for shard in shards]
+        pending = [checkpoint.shard for checkpoint in checkpoints if not checkpoint.done]
+        resuming = any(checkpoint.done or checkpoint.offset != checkpoint.shard.start for checkpoint in checkpoints)
+        counts = {"shards": len(shards), "done_before": len(shards) - len(pending), "failed": 0, "saved": 0}
+        logger.info("%d of %d shards to ingest with %d workers.", len(pending), len(shards), self.workers)
+        
+        if not pending:
+            return counts
+        
+        # The collection is created or refreshed once here, before the workers connect to it.
+        # A resumed run keeps it, the shards checkpointed as done would be lost otherwise
+        if resuming:
+            with _refresh_disabled():
+                self.storage_factory()
+        else:
+            self.storage_factory()
+        
+        # Workers are spawned, forked clients would share the connections of this process
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(pending)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.storage_factory,),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _ingest_shard,
+                    shard,
+                    self.crawler.source,
+                    self.checkpoint_dir,
+                    self.embed_batch_size,
+                    self.upsert_batch_size,
+                ): shard
+                for shard in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    counts["saved"] += future.result()
+                except Exception:
+                    counts["failed"] += 1
+                    logger.exception("Failed to ingest %s, run again to resume it.", futures[future])
+        
+        logger.info("Sharded ingestion is finished: %s", counts)
+        return counts
+
+
+@contextmanager
+def _refresh_disabled() -> Iterator[None]:
+    previous = os.environ.get("QDRANT_COLLECTION_ALWAYS_REFRES")
+    os.environ["QDRANT_COLLECTION_ALWAYS_REFRES"] = "False"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["QDRANT_COLLECTION_ALWAYS_REFRES"]
+        else:
+            os.environ["QDRANT_COLLECTION_ALWAYS_REFRES"] = previous
+
+
+def _init_worker(storage_factory: Callable[[], QdrantClientStorage]) -> None:
+    global _worker_storage
+    # Only the parent process may refresh the collection
+    os.environ["QDRANT_COLLECTION_ALWAYS_REFRES"] = "False"
+    _worker_storage = storage_factory()
+
+
+def _ingest_shard(shard: FileShard, source: str, checkpoint_dir: str, embed_batch_size: int, upsert_batch_size: int) -> int:
+    checkpoint = ShardCheckpoint.load(checkpoint_dir, shard)
+    parser = LocalNaverJsonParser([shard.path], source=source)
+    saved_before = checkpoint.saved
+    saved = checkpoint.saved
+    offset = checkpoint.offset
+    
+    for batch in chunked(parser.iter_file_range(shard.path, checkpoint.offset, shard.end), upsert_batch_size):
+        saved += _worker_storage.ingest_batch([data for _, data in batch], embed_batch_size, upsert_batch_size)
+        # Near-duplicates dropped from the batch are skipped by a resumed run, so their aliases are written before the checkpoint moves past them
+        _worker_storage.write_aliases()
+        offset = batch[-1][0]
+        checkpoint.save(offset, saved)
+    
+    checkpoint.save(offset, saved, done=True)
+    return saved - saved_before
@@ -1,28 +1,109 @@
+import argparse
+import logging
+import os
+
 from src.crawler.CrawlerInterface import CrawlerInterface
 from src.crawler.naver.LocalNaverJsonParser import LocalNaverJsonParser
+from src.crawler.naver.NaverQnaJsonParser import NaverQnaJsonParser
 from src.embedd.EmbeddingInteface import EmbeddingInterface
+from src.embedd.cache.CachedEmbeddingClient import CachedEmbeddingClient
+from src.embedd.local.HashingEmbeddingClient import HashingEmbeddingClient
 from src.embedd.openai.OpenAIClient import OpenAIClient
+from src.ingest.ShardedIngestion import DEFAULT_SHARD_BYTES, ShardedIngestion
+from src.metrics.MetricsRegistry import REGISTRY
+from src.metrics.PrometheusFileExporter import PrometheusFileExporter
 from src.storage.StorageInterface import StorageInterface
+from src.storage.qdrant.CollectionSnapshot import CollectionSnapshot
 from src.storage.qdrant.QdrantClient import QdrantClientStorage
 
 
+def create_embedding_client() -> EmbeddingInterface:
+    if os.getenv("EMBEDDING_BACKEND", "openai") == "local":
+        return HashingEmbeddingClient()
+    return OpenAIClient()
+
+
+def create_crawler() -> CrawlerInterface:
+    if os.getenv("CRAWLER", "naver_kin") == "naver_qna":
+        return NaverQnaJsonParser()
+    return LocalNaverJsonParser()
+
+
+def create_storage() -> QdrantClientStorage:
+    # Module level so that worker processes of the sharded ingestion can create their own storage
+    return QdrantClientStorage(embedding_client=CachedEmbeddingClient(create_embedding_client()))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest the Naver KiN data into Qdrant or query it")
+    commands = parser.add_subparsers(dest="command")
+    
+    query_parser = commands.add_parser("query", help="Search the collection (default)")
+    query_parser.add_argument("text", nargs="?", default="창업 정보")
+    query_parser.add_argument("--hybrid", action="store_true", help="Fuse the dense results with BM25 results over the original texts")
+    
+    commands.add_parser("sync", help="Embed only new or changed documents and delete vanished ones")
+    
+    ingest_parser = commands.add_parser("ingest", help="Ingest the JSONL files with a pool of processes, resuming from checkpoints")
+    ingest_parser.add_argument("--paths", nargs="+", default=None, help="JSONL files, directories or glob patterns (NAVER_KIN_JSONL_PATHS)")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="Number of processes, the number of cores by default")
+    ingest_parser.add_argument("--shard-size-mb", type=float, default=DEFAULT_SHARD_BYTES / (1024 * 1024))
+    ingest_parser.add_argument("--checkpoint-dir", default=os.getenv("INGEST_CHECKPOINT_DIR", ".cache/ingest_checkpoints"))
+    ingest_parser.add_argument("--embed-batch-size", type=int, default=256)
+    ingest_parser.add_argument("--upsert-batch-size", type=int, default=512)
+    ingest_parser.add_argument("--restart", action="store_true", help="Ignore the checkpoints of a previous run")
+    
+    export_parser = commands.add_parser("export", help="Export the vectors and payloads of the collection into a directory")
+    export_parser.add_argument("directory")
+    
+    import_parser = commands.add_parser("import", help="Load an exported directory into the collection without embedding")
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--upsert-batch-size", type=int, default=512)
+    
+    return parser.parse_args()
+
+
 def main():
-    crawl: CrawlerInterface = LocalNaverJsonParser()
-    embedClient: EmbeddingInterface = OpenAIClient()
-    storageClient: StorageInterface = QdrantClientStorage(embedding_client=embedClient)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    if os.getenv("METRICS_FILE_PATH"):
+        REGISTRY.add_exporter(PrometheusFileExporter(os.getenv("METRICS_FILE_PATH")))
+    args = parse_args()
+    
+    if args.command == "ingest":
+        ingestion = ShardedIngestion(
+            crawler=LocalNaverJsonParser(args.paths),
+            storage_factory=create_storage,
+            checkpoint_dir=args.checkpoint_dir,
+            workers=args.workers,
+            shard_bytes=int(args.shard_size_mb * 1024 * 1024),
+            embed_batch_size=args.embed_batch_size,
+            upsert_batch_size=args.upsert_batch_size,
+        )
+        print(ingestion.run(restart=args.restart))
+        return
     
-    result_datas = crawl.crawl()
+    if args.command == "export":
+        print(CollectionSnapshot(args.directory).export(create_storage()))
+        return
+    if args.command == "import":
+        print(CollectionSnapshot(args.directory).load(create_storage(), upsert_batch_size=args.upsert_batch_size))
+        return
     
-    # already studied data
-    # for data in result_datas:
-    #     embedded = embedClient.embed(data)
-    #     storageClient.save(data=embedded)
+    crawl: CrawlerInterface = create_crawler()
+    storageClient: StorageInterface = create_storage()
     
-    result = storageClient.query(
-        "창업 정보"
-    )
+    if args.command == "sync":
+        print(storageClient.sync(crawl))
+    else:
+        text = getattr(args, "text", None) or "창업 정보"
+        if getattr(args, "hybrid", False):
+            result = storageClient.hybrid_query(text)
+        else:
+            result = storageClient.query(text)
+        
+        print(result)
     
-    print(result)
+    REGISTRY.export()
 
 
 if __name__ == '__main__':
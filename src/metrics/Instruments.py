@@ -0,0 +1,45 @@
+# Metrics recorded on the hot paths of embedding, storage and search
+from src.metrics.MetricsRegistry import REGISTRY, SIZE_BUCKETS
+
+EMBEDDING_REQUEST_SECONDS = REGISTRY.histogram(
+    "embedding_request_seconds", "Latency of one embedding request to the API or the local model", ["model"]
+)
+EMBEDDING_BATCH_SIZE = REGISTRY.histogram(
+    "embedding_batch_size", "Number of texts per embedding request", ["model"], buckets=SIZE_BUCKETS
+)
+EMBEDDING_TOKENS = REGISTRY.counter(
+    "embedding_tokens_total", "Tokens embedded, as counted by the embedding API", ["model"]
+)
+EMBEDDING_CACHE_LOOKUPS = REGISTRY.counter(
+    "embedding_cache_lookups_total", "Lookups of the embedding cache by result (hit, disk_hit, miss)", ["result"]
+)
+
+QDRANT_REQUEST_SECONDS = REGISTRY.histogram(
+    "qdrant_request_seconds", "Latency of one Qdrant request, its count is the number of requests", ["operation"]
+)
+QDRANT_UPSERT_BATCH_SIZE = REGISTRY.histogram(
+    "qdrant_upsert_batch_size", "Number of points per upsert request", buckets=SIZE_BUCKETS
+)
+INGESTED_DOCUMENTS = REGISTRY.counter(
+    "ingested_documents_total", "Documents embedded and saved by ingest and sync"
+)
+DEDUPLICATED_DOCUMENTS = REGISTRY.counter(
+    "deduplicated_documents_total", "Near-duplicate documents dropped by ingest and sync by detection method (minhash, vector)", ["method"]
+)
+
+SEARCH_SECONDS = REGISTRY.histogram(
+    "search_seconds", "Latency of a search from the query text to the results", ["method"]
+)
+SEARCH_BATCH_SIZE = REGISTRY.histogram(
+    "search_batch_size", "Number of queries coalesced into one batched search", buckets=SIZE_BUCKETS
+)
+RERANK_SECONDS = REGISTRY.histogram(
+    "rerank_seconds", "Latency of re-ranking the ANN candidates of one query", ["method"]
+)
+QUERY_CACHE_LOOKUPS = REGISTRY.counter(
+    "query_cache_lookups_total", "Lookups of the query result cache by result (exact_hit, semantic_hit, miss)", ["result"]
+)
+
+RETRIES = REGISTRY.counter(
+    "retries_total", "Requests sent again after a retryable error", ["operation"]
+)
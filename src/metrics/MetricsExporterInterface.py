@@ -0,0 +1,14 @@
+class MetricsExporterInterface:
+    """
+    Interface for metrics exporter classes
+    You have to implement this method when you send the metrics somewhere else than `/metrics` of the search server.
+    """
+    
+    def export(self, registry) -> None:
+        """
+        Export the current values of the metrics
+
+        Args:
+            registry (MetricsRegistry): Registry holding the metrics
+        """
+        pass
@@ -0,0 +1,22 @@
+import os
+
+from src.metrics.MetricsExporterInterface import MetricsExporterInterface
+
+
+class PrometheusFileExporter(MetricsExporterInterface):
+    """
+    Write the metrics in the Prometheus text format into a file, e.g. for the textfile collector of node_exporter.
+    Useful for batch jobs such as ingestion which do not serve HTTP.
+    """
+    
+    def __init__(self, path: str) -> None:
+        self.path = path
+    
+    def export(self, registry) -> None:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Written next to the target and renamed, so a collector never reads a partial file
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as output:
+            output.write(registry.render())
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace
+except ImportError:
+    otel_context = None
+    trace = None
+
+TRACER_NAME = "semantic-search-using-qdrant"
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """
+    Trace the block as an OpenTelemetry span when opentelemetry is installed and configured, do nothing otherwise.
+    Spans opened inside the block, in the same thread, become its children.
+
+    Args:
+        name (str): Name of the span, e.g. "ingest.embed"
+        attributes (Any): Attributes of the span, e.g. batch size
+    """
+    if trace is None:
+        yield
+        return
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=attributes):
+        yield
+
+
+def current_context() -> Optional[Any]:
+    """
+    Get the tracing context of the current thread, to be attached in the worker threads it hands work to
+    """
+    return otel_context.get_current() if otel_context is not None else None
+
+
+@contextmanager
+def attached(context: Optional[Any]) -> Iterator[None]:
+    """
+    Run the block under a context of `current_context`, so its spans are children of the spans of that thread
+    """
+    if otel_context is None or context is None:
+        yield
+        return
+    token = otel_context.attach(context)
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
@@ -0,0 +1,110 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+
+from src.metrics.Instruments import SEARCH_BATCH_SIZE
+from src.storage.QueryFilter import QueryFilter
+from src.storage.QueryResultModel import QueryResultModel
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+
+class QueryBatcher:
+    """
+    Coalesce concurrent queries into one batched embedding call and one Qdrant `search_batch` request.
+    A batch is sent when `max_batch_size` queries are waiting or `max_wait_ms` passed since its first query.
+    Queries arriving while a batch is being searched are collected into the next one.
+    """
+    
+    def __init__(
+        self,
+        storage: QdrantClientStorage,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_concurrent_batches: Optional[int] = None,
+    ) -> None:
+        self.storage = storage
+        self.max_batch_size = max_batch_size or int(os.getenv("SEARCH_BATCH_MAX_SIZE", "64"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("SEARCH_BATCH_MAX_WAIT_MS", "5"))) / 1000
+        self.max_concurrent_batches = max_concurrent_batches or int(os.getenv("SEARCH_MAX_CONCURRENT_BATCHES", "2"))
+        # The storage is synchronous, so batches are searched on a small pool sharing its warm client
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent_batches)
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.batch_slots: Optional[asyncio.Semaphore] = None
+        self.searches = set()
+    
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        self.batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self.worker = asyncio.create_task(self._collect_batches())
+    
+    async def stop(self) -> None:
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+    
+    async def query(self, query: str, limit: int = 10, query_filter: Optional[QueryFilter] = None) -> QueryResultModel:
+        """
+        Query the storage through the next batch
+
+        Args:
+            query (str): Query string
+            limit (int): Maximum number of results
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results
+
+        Returns:
+            QueryResultModel: Payloads of the results
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, limit, query_filter, future))
+        return await future
+    
+    async def _collect_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self.batch_slots.acquire()
+            search = asyncio.create_task(self._search(batch))
+            self.searches.add(search)
+            search.add_done_callback(self.searches.discard)
+    
+    async def _search(self, batch: List[Tuple[str, int, Optional[QueryFilter], asyncio.Future]]) -> None:
+        SEARCH_BATCH_SIZE.observe(len(batch))
+        try:
+            # One request for the whole batch, each query is searched and cached with its own limit
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(
+                    self.storage.query_batch,
+                    [query for query, _, _, _ in batch],
+                    query_filters=[query_filter for _, _, query_filter, _ in batch],
+                    limits=[limit for _, limit, _, _ in batch],
+                ),
+            )
+            for (_, _, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as error:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self.batch_slots.release()
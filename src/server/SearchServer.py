@@ -0,0 +1,114 @@
+import logging
+import os
+
+from aiohttp import web
+
+from src.embedd.cache.CachedEmbeddingClient import CachedEmbeddingClient
+from src.main import create_embedding_client
+from src.metrics.MetricsRegistry import REGISTRY
+from src.server.QueryBatcher import QueryBatcher
+from src.storage.QueryFilter import QueryFilter
+from src.storage.cache.QueryResultCache import QueryResultCache
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+MAX_LIMIT = 100
+
+routes = web.RouteTableDef()
+
+
+@routes.get("/health")
+async def health(request: web.Request) -> web.Response:
+    response = {"status": "ok"}
+    result_cache = request.app["storage"].result_cache
+    if result_cache is not None:
+        response["query_cache"] = result_cache.stats()
+    return web.json_response(response)
+
+
+@routes.get("/metrics")
+async def metrics(request: web.Request) -> web.Response:
+    # Prometheus text exposition format
+    return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+
+
+@routes.get("/search")
+async def search(request: web.Request) -> web.Response:
+    return await _search(request, request.query.get("q"), request.query.get("limit", 10), request.query)
+
+
+@routes.post("/search")
+async def search_json(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body must be JSON")
+    return await _search(request, body.get("query"), body.get("limit", 10), body)
+
+
+def _parse_filter(params) -> QueryFilter:
+    try:
+        return QueryFilter(
+            category=params.get("category"),
+            source=params.get("source"),
+            crawled_from=int(params["crawled_from"]) if params.get("crawled_from") is not None else None,
+            crawled_to=int(params["crawled_to"]) if params.get("crawled_to") is not None else None,
+        )
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text="crawled_from and crawled_to must be unix seconds")
+
+
+async def _search(request: web.Request, query, limit, params) -> web.Response:
+    if not isinstance(query, str) or not query.strip():
+        raise web.HTTPBadRequest(text="query must be a non-empty string")
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text="limit must be an integer")
+    if not 0 < limit <= MAX_LIMIT:
+        raise web.HTTPBadRequest(text=f"limit must be between 1 and {MAX_LIMIT}")
+    
+    results = await request.app["batcher"].query(query, limit, _parse_filter(params))
+    return web.json_response({"query": query, "results": results})
+
+
+def create_app(storage: QdrantClientStorage) -> web.Application:
+    """
+    Create the search application, every request of the process shares the storage and its warm clients
+
+    Args:
+        storage (QdrantClientStorage): Storage to be searched
+
+    Returns:
+        web.Application: aiohttp application
+    """
+    app = web.Application()
+    app["storage"] = storage
+    app["batcher"] = QueryBatcher(storage)
+    app.add_routes(routes)
+    
+    async def start_batcher(app: web.Application) -> None:
+        await app["batcher"].start()
+    
+    async def stop_batcher(app: web.Application) -> None:
+        await app["batcher"].stop()
+    
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    return app
+
+
+def main():
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    storage = QdrantClientStorage(
+        embedding_client=CachedEmbeddingClient(create_embedding_client()),
+        result_cache=QueryResultCache.from_env(),
+    )
+    web.run_app(
+        create_app(storage),
+        host=os.getenv("SEARCH_SERVER_HOST", "0.0.0.0"),
+        port=int(os.getenv("SEARCH_SERVER_PORT", "8080")),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+from typing import List
+
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.storage.QueryResultModel import QueryResultModel
+
+class AsyncStorageInterface:
+    """
+    Interface for asyncio based storage classes
+    You have to implement this method when you make a new async storage class.
+    """
+    
+    async def save(self, data: EmbeddedModel) -> bool:
+        """
+        Save data to storage
+
+        Args:
+            data (EmbeddedModel): Data to be saved
+            
+        Returns:
+            bool: True if data is saved successfully, False otherwise.
+        """
+        pass
+    
+    async def save_many(self, datas: List[EmbeddedModel]) -> bool:
+        """
+        Save many data to storage with as few requests as possible
+
+        Args:
+            datas (List[EmbeddedModel]): Data to be saved
+            
+        Returns:
+            bool: True if all data is saved successfully, False otherwise.
+        """
+        pass
+    
+    async def ingest(self, crawler: CrawlerInterface) -> int:
+        """
+        Crawl, embed and save every data of the crawler in batches
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be saved
+            
+        Returns:
+            int: Number of saved data
+        """
+        pass
+    
+    async def query(self, query: str) -> QueryResultModel:
+        """
+        Query data from storage
+
+        Args:
+            query (str): Query string
+        """
+        pass
+    
+    async def close(self) -> None:
+        """
+        Release the connections held by the storage
+        """
+        pass
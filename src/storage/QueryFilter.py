@@ -0,0 +1,42 @@
+from typing import Hashable, List, Optional, Union
+
+
+class QueryFilter:
+    """
+    Conditions on the metadata of the stored data which a query result must satisfy.
+    Every condition which is not None must match, a list matches any of its values.
+    """
+    
+    def __init__(
+        self,
+        category: Optional[Union[str, List[str]]] = None,
+        doc_id: Optional[Union[str, List[str]]] = None,
+        source: Optional[Union[str, List[str]]] = None,
+        crawled_from: Optional[int] = None,
+        crawled_to: Optional[int] = None,
+    ) -> None:
+        self.category = category
+        self.doc_id = doc_id
+        self.source = source
+        self.crawled_from = crawled_from
+        self.crawled_to = crawled_to
+    
+    def is_empty(self) -> bool:
+        return all(value is None for value in vars(self).values())
+    
+    def cache_key(self) -> Hashable:
+        """
+        Hashable value which is equal for filters with the same conditions, whatever the order or type of their value collections
+        """
+        return tuple(
+            (key, tuple(sorted(value)) if isinstance(value, (list, tuple, set, frozenset)) else value)
+            for key, value in vars(self).items()
+            if value is not None
+        )
+    
+    def __repr__(self) -> str:
+        conditions = ", ".join(f"{key}={value}" for key, value in vars(self).items() if value is not None)
+        return f"QueryFilter({conditions})"
+    
+    def __str__(self) -> str:
+        return self.__repr__()
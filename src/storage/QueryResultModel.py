@@ -1,16 +1,18 @@
-from typing import List
+from src.utils.vectors import VectorLike, as_vector, format_text, format_vector
 
 
 class QueryResultModel:
     
-    def __init__(self, embedded_text: List[float], original_text: str, ref: str) -> None:
-        self.embedded_text = embedded_text
+    __slots__ = ("embedded_text", "original_text", "ref")
+    
+    def __init__(self, embedded_text: VectorLike, original_text: str, ref: str) -> None:
+        self.embedded_text = as_vector(embedded_text)
         self.original_text = original_text
         self.ref = ref
         
     
     def __repr__(self) -> str:
-        return f"QueryResultModel(embedded_text={self.embedded_text}, original_text={self.original_text}, ref={self.ref})"
+        return f"QueryResultModel(embedded_text={format_vector(self.embedded_text)}, original_text={format_text(self.original_text)}, ref={self.ref})"
     
     def __str__(self) -> str:
-        return f"QueryResultModel(embedded_text={self.embedded_text}, original_text={self.original_text}, ref={self.ref})"
\ No newline at end of file
+        return f"QueryResultModel(embedded_text={format_vector(self.embedded_text)}, original_text={format_text(self.original_text)}, ref={self.ref})"
\ No newline at end of file
@@ -0,0 +1,21 @@
+from collections import defaultdict
+from typing import Dict, Hashable, List, Tuple
+
+
+def reciprocal_rank_fusion(rankings: List[List[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse rankings of different retrievers with reciprocal rank fusion (RRF).
+    Only ranks are used, so scores of different scales (e.g. BM25 and cosine) can be combined.
+
+    Args:
+        rankings (List[List[Hashable]]): ids ranked by each retriever, best first
+        k (int): Smoothing constant, larger values weigh low ranks more
+
+    Returns:
+        List[Tuple[Hashable, float]]: ids with their fused score, best first
+    """
+    scores: Dict[Hashable, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
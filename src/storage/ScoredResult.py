@@ -0,0 +1,28 @@
+from typing import Any, Dict, Optional
+
+from src.utils.vectors import format_text
+
+
+class ScoredResult:
+    """
+    ScoredResult is a result of a query with the id of its point, its similarity score and its payload.
+    Results ordered by a reranker also carry its score, which is on the scale of the reranker.
+    """
+    
+    __slots__ = ("id", "score", "payload", "rerank_score")
+    
+    def __init__(self, id: str, score: float, payload: Optional[Dict[str, Any]] = None, rerank_score: Optional[float] = None) -> None:
+        self.id = id
+        self.score = score
+        self.payload = payload or {}
+        self.rerank_score = rerank_score
+    
+    @property
+    def ref(self) -> Optional[str]:
+        return self.payload.get("ref")
+    
+    def __repr__(self) -> str:
+        return f"ScoredResult(id={self.id}, score={self.score:.4f}, ref={self.ref}, original_text={format_text(self.payload.get('original_text', ''))})"
+    
+    def __str__(self) -> str:
+        return self.__repr__()
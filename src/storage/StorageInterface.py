@@ -1,5 +1,10 @@
+from typing import Dict, List, Optional
+
+from src.crawler.CrawlerInterface import CrawlerInterface
 from src.embedd.EmbeddedModel import EmbeddedModel
+from src.storage.QueryFilter import QueryFilter
 from src.storage.QueryResultModel import QueryResultModel
+from src.storage.ScoredResult import ScoredResult
 
 class StorageInterface:
     """
@@ -19,10 +24,62 @@ class StorageInterface:
         """
         pass
     
+    def save_many(self, datas: List[EmbeddedModel]) -> bool:
+        """
+        Save many data to storage with as few requests as possible
+
+        Args:
+            datas (List[EmbeddedModel]): Data to be saved
+            
+        Returns:
+            bool: True if all data is saved successfully, False otherwise.
+        """
+        pass
+    
+    def ingest(self, crawler: CrawlerInterface) -> int:
+        """
+        Crawl, embed and save every data of the crawler in batches
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be saved
+            
+        Returns:
+            int: Number of saved data
+        """
+        pass
+    
+    def sync(self, crawler: CrawlerInterface) -> Dict[str, int]:
+        """
+        Incrementally synchronize storage with the crawler, only new or changed data are embedded
+        and data which are not crawled anymore are deleted
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be synchronized
+            
+        Returns:
+            Dict[str, int]: Number of unchanged, saved and deleted data
+        """
+        pass
+    
     def query(self, query: str) -> QueryResultModel:
         """
         Query data from storage        
 
         Args:
             query (str): Query string
-        """
\ No newline at end of file
+        """
+        pass
+    
+    def query_many(self, queries: List[str], limit: int = 10, query_filter: Optional[QueryFilter] = None) -> List[List[ScoredResult]]:
+        """
+        Query many strings with as few embedding and search requests as possible
+
+        Args:
+            queries (List[str]): Query strings
+            limit (int): Maximum number of results per query
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results of every query
+            
+        Returns:
+            List[List[ScoredResult]]: Ids, scores and payloads of the results, one list per query in the same order as `queries`
+        """
+        pass
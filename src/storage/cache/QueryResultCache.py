@@ -0,0 +1,233 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.metrics.Instruments import QUERY_CACHE_LOOKUPS
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+class QueryResultCache:
+    """
+    Cache of query results in front of the storage.
+
+    The exact tier is an LRU with a TTL keyed by the normalized query text and the query params.
+    The optional semantic tier reuses the result of a cached query with the same params whose vector is
+    within `semantic_distance` cosine distance of the new query vector. Every write to the collection
+    must call `invalidate`, since any cached result may be stale afterwards.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 300,
+        semantic_distance: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_distance = semantic_distance
+        self.entries: OrderedDict[Tuple[str, Hashable], Tuple[float, Any]] = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+        
+        # Semantic lookups compare the query vector with every cached vector at once.
+        # Each cached vector owns a row of the matrix, which grows up to `max_entries` rows,
+        # rows of dropped entries are zeroed and reused so a put never rebuilds the matrix
+        self.matrix: Optional[np.ndarray] = None
+        self.slot_keys: List[Optional[Tuple[str, Hashable]]] = []
+        self.slot_of: Dict[Tuple[str, Hashable], int] = {}
+        self.free_slots: List[int] = []
+        
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.miss_seconds = 0.0
+        self.hit_seconds = 0.0
+    
+    @classmethod
+    def from_env(cls) -> Optional["QueryResultCache"]:
+        """
+        Create the cache from QUERY_CACHE_* variables
+
+        Returns:
+            Optional[QueryResultCache]: None when QUERY_CACHE_SIZE is 0
+        """
+        max_entries = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+        if max_entries <= 0:
+            return None
+        semantic_distance = os.getenv("QUERY_CACHE_SEMANTIC_DISTANCE")
+        return cls(
+            max_entries=max_entries,
+            ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300")),
+            semantic_distance=float(semantic_distance) if semantic_distance else None,
+        )
+    
+    def key(self, query: str, params: Hashable) -> Tuple[str, Hashable]:
+        return (normalize_query(query), params)
+    
+    def get(self, key: Tuple[str, Hashable]) -> Optional[Any]:
+        """
+        Get the result of exactly the same normalized query and params
+
+        Args:
+            key (Tuple[str, Hashable]): Key made by `key`
+
+        Returns:
+            Optional[Any]: cached result, None on a miss
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl_seconds:
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            self.exact_hits += 1
+            QUERY_CACHE_LOOKUPS.inc(result="exact_hit")
+            return entry[1]
+    
+    def get_similar(self, key: Tuple[str, Hashable], vector: List[float]) -> Optional[Any]:
+        """
+        Get the result of a cached query with the same params and a vector close to `vector`
+
+        Args:
+            key (Tuple[str, Hashable]): Key of the new query
+            vector (List[float]): Embedded vector of the new query
+
+        Returns:
+            Optional[Any]: cached result, None on a miss or when the semantic tier is disabled
+        """
+        if self.semantic_distance is None:
+            return None
+        
+        query_vector = np.asarray(vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            return None
+        
+        with self.lock:
+            if self.matrix is None or self.matrix.shape[1] != len(query_vector):
+                return None
+            similarities = self.matrix[:len(self.slot_keys)] @ (query_vector / query_norm)
+            close = np.flatnonzero(similarities >= 1 - self.semantic_distance)
+            for index in close[np.argsort(-similarities[close])]:
+                candidate = self.slot_keys[index]
+                # Free rows are zero, they only pass the distance check when it is 1 or more
+                if candidate is None or candidate[1] != key[1]:
+                    continue
+                entry = self.entries[candidate]
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    continue
+                self.entries.move_to_end(candidate)
+                self.semantic_hits += 1
+                QUERY_CACHE_LOOKUPS.inc(result="semantic_hit")
+                return entry[1]
+        return None
+    
+    def put(self, key: Tuple[str, Hashable], vector: Optional[List[float]], result: Any, generation: int) -> None:
+        """
+        Cache the result of a query
+
+        Args:
+            key (Tuple[str, Hashable]): Key made by `key`
+            vector (Optional[List[float]]): Embedded vector of the query, used by the semantic tier
+            result (Any): Result of the query
+            generation (int): `generation` read before the query, results of queries overlapping a write are dropped
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+            self._drop(key)
+            # Evicted before inserting, so at most `max_entries` rows are ever in use
+            while len(self.entries) >= self.max_entries:
+                self._drop(next(iter(self.entries)))
+            self.entries[key] = (time.monotonic(), result)
+            
+            if vector is not None and self.semantic_distance is not None:
+                vector = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                if norm > 0 and (self.matrix is None or self.matrix.shape[1] == len(vector)):
+                    slot = self._allocate_slot(len(vector))
+                    self.matrix[slot] = vector / norm
+                    self.slot_keys[slot] = key
+                    self.slot_of[key] = slot
+    
+    def invalidate(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.matrix = None
+            self.slot_keys = []
+            self.slot_of = {}
+            self.free_slots = []
+            self.generation += 1
+            self.invalidations += 1
+    
+    def record_miss(self, seconds: float) -> None:
+        with self.lock:
+            self.misses += 1
+            QUERY_CACHE_LOOKUPS.inc(result="miss")
+            self.miss_seconds += seconds
+    
+    def record_hit(self, seconds: float) -> None:
+        with self.lock:
+            self.hit_seconds += seconds
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the counters of the cache.
+        `saved_seconds` estimates the time saved by hits as (average miss latency - average hit latency) * hits.
+
+        Returns:
+            Dict[str, float]: hits of each tier, misses, invalidations, hit rate and saved seconds
+        """
+        with self.lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            average_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            average_hit = self.hit_seconds / hits if hits else 0.0
+            return {
+                "entries": len(self.entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "average_miss_seconds": average_miss,
+                "average_hit_seconds": average_hit,
+                "saved_seconds": max(0.0, average_miss - average_hit) * hits,
+            }
+    
+    def _drop(self, key: Tuple[str, Hashable]) -> None:
+        self.entries.pop(key, None)
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            self.matrix[slot] = 0
+            self.slot_keys[slot] = None
+            self.free_slots.append(slot)
+    
+    def _allocate_slot(self, dimension: int) -> int:
+        if self.free_slots:
+            return self.free_slots.pop()
+        
+        slot = len(self.slot_keys)
+        if self.matrix is None or slot == len(self.matrix):
+            # Doubled when full, so the rows are copied O(1) times per put on average
+            capacity = min(self.max_entries, max(64, 2 * slot))
+            matrix = np.zeros((capacity, dimension), dtype=np.float32)
+            if self.matrix is not None:
+                matrix[:slot] = self.matrix
+            self.matrix = matrix
+        self.slot_keys.append(None)
+        return slot
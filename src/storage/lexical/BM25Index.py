@@ -0,0 +1,111 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Tuple
+
+WORD_PATTERN = re.compile(r"\w+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for lexical matching without a morphological analyzer.
+    Korean words keep their particles attached (e.g. "창업을"), so Hangul words are also split into
+    character bigrams, which lets "창업" match "창업을" and "창업정보".
+
+    Args:
+        text (str): Text to be tokenized
+
+    Returns:
+        List[str]: tokens, with repetitions
+    """
+    tokens = []
+    for word in WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        tokens.append(word)
+        if len(word) > 2 and HANGUL_PATTERN.search(word):
+            tokens.extend(word[index:index + 2] for index in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+    Documents are identified by the id of their point, so lexical and dense results can be fused.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self.document_lengths: Dict[Hashable, int] = {}
+        self.document_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self.total_length = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.document_lengths)
+    
+    def add(self, document_id: Hashable, text: str) -> None:
+        """
+        Index a document, a document with the same id is replaced
+
+        Args:
+            document_id (Hashable): Id of the document
+            text (str): Text of the document
+        """
+        term_frequencies = Counter(tokenize(text))
+        
+        with self.lock:
+            self._remove(document_id)
+            for term, frequency in term_frequencies.items():
+                self.postings[term][document_id] = frequency
+            self.document_terms[document_id] = tuple(term_frequencies)
+            length = sum(term_frequencies.values())
+            self.document_lengths[document_id] = length
+            self.total_length += length
+    
+    def remove(self, document_id: Hashable) -> None:
+        with self.lock:
+            self._remove(document_id)
+    
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Hashable, float]]:
+        """
+        Search the documents sharing terms with the query
+
+        Args:
+            query (str): Query string
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Tuple[Hashable, float]]: document ids with their BM25 score, best first
+        """
+        scores: Dict[Hashable, float] = defaultdict(float)
+        
+        with self.lock:
+            count = len(self.document_lengths)
+            if count == 0:
+                return []
+            average_length = self.total_length / count
+            
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for document_id, frequency in postings.items():
+                    normalization = self.k1 * (1 - self.b + self.b * self.document_lengths[document_id] / average_length)
+                    scores[document_id] += idf * frequency * (self.k1 + 1) / (frequency + normalization)
+        
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    
+    def _remove(self, document_id: Hashable) -> None:
+        length = self.document_lengths.pop(document_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.document_terms.pop(document_id):
+            del self.postings[term][document_id]
+            if not self.postings[term]:
+                del self.postings[term]
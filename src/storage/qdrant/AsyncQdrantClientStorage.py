@@ -0,0 +1,382 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from qdrant_client import models
+
+from src.chunking.TextChunker import TextChunker
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.crawler.SourceData import SourceData
+from src.dedup.MinHashDeduplicator import MinHashDeduplicator, merge_aliases
+from src.embedd.AsyncEmbeddingInterface import AsyncEmbeddingInterface
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.storage.AsyncStorageInterface import AsyncStorageInterface
+from src.storage.QueryResultModel import QueryResultModel
+from src.storage.qdrant.CollectionSettings import CollectionSettings
+from src.storage.QueryFilter import QueryFilter
+from src.storage.qdrant.PayloadSchema import PAYLOAD_INDEXES, aliased_refs_filter, build_payload, to_qdrant_filter
+from src.storage.qdrant.PointIdentity import point_id_of
+from src.storage.ScoredResult import ScoredResult
+from src.storage.qdrant.QdrantClient import DEFAULT_CHUNK_OVERFETCH, DEFAULT_EMBED_BATCH_SIZE, DEFAULT_MAX_IN_FLIGHT, DEFAULT_UPSERT_BATCH_SIZE, QdrantClientStorage
+from src.metrics.Instruments import INGESTED_DOCUMENTS, QDRANT_REQUEST_SECONDS, QDRANT_UPSERT_BATCH_SIZE, SEARCH_SECONDS
+from src.metrics.Tracing import span
+from src.utils.batching import chunked
+from src.utils.vectors import as_matrix
+from src.utils.retry import RETRYABLE_STATUS_CODES, RetryableError, parse_retry_after, retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQdrantClientStorage(AsyncStorageInterface):
+    """
+    asyncio counterpart of QdrantClientStorage talking to the Qdrant REST API.
+    Requests share one pooled httpx client, at most `QDRANT_MAX_CONCURRENCY` of them are in flight
+    and 429/5xx answers are retried with exponential backoff.
+    """
+    
+    def __init__(
+        self,
+        embedding_client: AsyncEmbeddingInterface,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        collection_settings: Optional[CollectionSettings] = None,
+        chunker: Optional[TextChunker] = None,
+        deduplicator: Optional[MinHashDeduplicator] = None,
+    ) -> None:
+        self.collection_name = os.getenv("QDRANT_COLLECTION_NAME")
+        self.collection_settings = collection_settings or CollectionSettings.from_env()
+        self.score_threshold = float(os.getenv("QDRANT_SCORE_THRESHOLD") or 0.8)
+        self.max_concurrency = max_concurrency or int(os.getenv("QDRANT_MAX_CONCURRENCY", "8"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("QDRANT_MAX_RETRIES", "5"))
+        self.http_client = httpx.AsyncClient(
+            base_url=f"{os.getenv('QDRANT_HOST')}:{os.getenv('QDRANT_PORT')}",
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(30.0),
+        )
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.model = embedding_client
+        self.collection_checked = False
+        # Documents are stored as one point per chunk when set, the same way as QdrantClientStorage
+        self.chunker = chunker or TextChunker.from_env()
+        # Near-duplicate documents are dropped before embedding and recorded as aliases of the kept one when set
+        self.deduplicator = deduplicator or MinHashDeduplicator.from_env()
+    
+    async def __aenter__(self) -> "AsyncQdrantClientStorage":
+        await self.ensure_collection()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def ensure_collection(self) -> None:
+        """
+        Create the collection if it does not exist yet
+        """
+        if self.collection_checked:
+            return
+        
+        response = await self._request(
+            "GET", f"/collections/{self.collection_name}", operation="get_collection", allow_not_found=True
+        )
+        if response is None:
+            logger.info("Collection does not exist. So, collection will be created.")
+            create_collection_kwargs = self.collection_settings.to_create_collection_kwargs(self.model.get_vector_size())
+            body = {"vectors": create_collection_kwargs.pop("vectors_config")}
+            body.update((key, value) for key, value in create_collection_kwargs.items() if value is not None)
+            await self._request(
+                "PUT",
+                f"/collections/{self.collection_name}",
+                operation="create_collection",
+                json={
+                    key: value.model_dump(mode="json", exclude_none=True) if hasattr(value, "model_dump") else value
+                    for key, value in body.items()
+                },
+            )
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                await self._request(
+                    "PUT",
+                    f"/collections/{self.collection_name}/index",
+                    operation="create_payload_index",
+                    params={"wait": "true"},
+                    json={"field_name": field_name, "field_schema": field_schema.value},
+                )
+        self.collection_checked = True
+    
+    def convert_single_data_to_point(self, data: EmbeddedModel) -> dict:
+        return {
+            "id": point_id_of(data.ref, data.metadata),
+            "payload": build_payload(data),
+            "vector": data.embedded_text.tolist(),
+        }
+    
+    def convert_data_to_batch(self, datas: List[EmbeddedModel]) -> dict:
+        return {
+            "ids": [point_id_of(data.ref, data.metadata) for data in datas],
+            "vectors": as_matrix([data.embedded_text for data in datas]).tolist(),
+            "payloads": [build_payload(data) for data in datas],
+        }
+    
+    async def save(self, data: EmbeddedModel) -> bool:
+        return await self.save_many([data])
+    
+    async def save_many(self, datas: List[EmbeddedModel], upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE) -> bool:
+        """
+        Save embedded data with concurrent upsert requests of `upsert_batch_size` points
+
+        Args:
+            datas (List[EmbeddedModel]): Embedded data to be saved
+            upsert_batch_size (int): Maximum number of points per upsert request
+
+        Returns:
+            bool: True if every upsert request is completed, False otherwise.
+        """
+        for batch in chunked(datas, upsert_batch_size):
+            QDRANT_UPSERT_BATCH_SIZE.observe(len(batch))
+        results = await asyncio.gather(*[
+            self._request(
+                "PUT",
+                f"/collections/{self.collection_name}/points",
+                operation="upsert",
+                params={"wait": "true"},
+                json={"batch": self.convert_data_to_batch(batch)},
+            )
+            for batch in chunked(datas, upsert_batch_size)
+        ])
+        
+        return all(result["result"]["status"] == "completed" for result in results)
+    
+    async def ingest(
+        self,
+        crawler: CrawlerInterface,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> int:
+        """
+        Crawl, embed and save every data of the crawler in batches, at most `max_in_flight` batches at once.
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be saved
+            embed_batch_size (int): Number of source data embedded together
+            upsert_batch_size (int): Number of points per upsert request
+            max_in_flight (int): Maximum number of batches being embedded or upserted at once
+
+        Returns:
+            int: Number of saved data
+        """
+        await self.ensure_collection()
+        
+        saved_count = 0
+        in_flight = set()
+        
+        # Tasks copy the current context, so the spans of the batches are children of this one
+        with span("ingest", collection=self.collection_name):
+            for batch in crawler.iter_crawl_chunks(upsert_batch_size):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    saved_count += sum(task.result() for task in done)
+                in_flight.add(asyncio.create_task(self._ingest_batch(batch, embed_batch_size, upsert_batch_size)))
+            
+            if in_flight:
+                done, _ = await asyncio.wait(in_flight)
+                saved_count += sum(task.result() for task in done)
+            
+            # Canonical documents of the aliases are all saved by now
+            await self.write_aliases()
+        
+        logger.info("%d data are ingested into %s.", saved_count, self.collection_name)
+        return saved_count
+    
+    async def _ingest_batch(self, batch: List[SourceData], embed_batch_size: int, upsert_batch_size: int) -> int:
+        with span("ingest.batch", size=len(batch)):
+            documents = batch
+            if self.deduplicator is not None:
+                documents = self.deduplicator.drop_duplicates(batch)
+                # Upserting replaces the whole payload, the aliases of a canonical document saved again are carried over
+                documents = self.deduplicator.with_aliases(documents, await self._stored_aliases([data.ref for data in documents]))
+            sources = self.chunker.iter_chunks(documents) if self.chunker is not None else documents
+            with span("ingest.embed"):
+                embedded_batches = await asyncio.gather(
+                    *[self.model.embed_batch(chunk) for chunk in chunked(sources, embed_batch_size)]
+                )
+            embedded = [data for embedded_batch in embedded_batches for data in embedded_batch]
+            
+            # Chunks of a document are not comparable with whole documents, so only unchunked documents are checked
+            if self.deduplicator is not None and self.deduplicator.vector_score is not None and self.chunker is None:
+                embedded = await self._drop_similar(embedded)
+            
+            with span("ingest.upsert"):
+                if not await self.save_many(embedded, upsert_batch_size=upsert_batch_size):
+                    raise RuntimeError(f"Failed to save {len(embedded)} data into {self.collection_name}.")
+        
+        saved_count = len({data.ref for data in embedded})
+        INGESTED_DOCUMENTS.inc(saved_count)
+        return saved_count
+    
+    async def _drop_similar(self, embedded: List[EmbeddedModel]) -> List[EmbeddedModel]:
+        if not embedded:
+            return embedded
+        response = await self._request(
+            "POST",
+            f"/collections/{self.collection_name}/points/search/batch",
+            operation="search_batch",
+            json={
+                "searches": [
+                    {
+                        "vector": data.embedded_text.tolist(),
+                        # The closest point may be the previous version of the document itself
+                        "limit": 2,
+                        "score_threshold": self.deduplicator.vector_score,
+                        "with_payload": ["ref"],
+                    }
+                    for data in embedded
+                ],
+            },
+        )
+        return self.deduplicator.drop_similar(
+            embedded, [[hit["payload"].get("ref") for hit in hits] for hits in response["result"]]
+        )
+    
+    async def _stored_aliases(self, refs: List[str], page_size: int = 1000) -> Dict[str, List[str]]:
+        stored = {}
+        offset = None
+        scroll_filter = aliased_refs_filter(refs).model_dump(mode="json", exclude_none=True)
+        while refs:
+            response = await self._request(
+                "POST",
+                f"/collections/{self.collection_name}/points/scroll",
+                operation="scroll",
+                json={
+                    "filter": scroll_filter,
+                    "limit": page_size,
+                    "with_payload": ["ref", "aliases"],
+                    "with_vector": False,
+                    **({"offset": offset} if offset is not None else {}),
+                },
+            )
+            for point in response["result"]["points"]:
+                ref = point["payload"]["ref"]
+                stored[ref] = merge_aliases(stored.get(ref), point["payload"].get("aliases"))
+            offset = response["result"].get("next_page_offset")
+            if offset is None:
+                break
+        return stored
+    
+    async def write_aliases(self) -> int:
+        """
+        Store the references of the dropped near-duplicates in the `aliases` payload of every point of their canonical document
+
+        Returns:
+            int: Number of updated canonical documents
+        """
+        if self.deduplicator is None:
+            return 0
+        
+        aliases = self.deduplicator.pop_dirty_aliases()
+        # Aliases recorded by previous runs are kept
+        stored_aliases = await self._stored_aliases(list(aliases))
+        await asyncio.gather(*[
+            self._request(
+                "POST",
+                f"/collections/{self.collection_name}/points/payload",
+                operation="set_payload",
+                params={"wait": "true"},
+                json={
+                    "payload": {"aliases": merge_aliases(stored_aliases.get(canonical), refs)},
+                    "filter": models.Filter(
+                        must=[models.FieldCondition(key="ref", match=models.MatchValue(value=canonical))]
+                    ).model_dump(mode="json", exclude_none=True),
+                },
+            )
+            for canonical, refs in aliases.items()
+        ])
+        return len(aliases)
+    
+    async def query(
+        self,
+        query: str,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+        query_filter: Optional[QueryFilter] = None,
+        limit: int = 10,
+    ) -> QueryResultModel:
+        """
+        Query the closest data of the query string, chunks of the same document are grouped into its best chunk
+
+        Args:
+            query (str): Query string
+            hnsw_ef (Optional[int]): Size of the HNSW beam, larger is more accurate and slower
+            exact (bool): Search without approximation
+            rescore (Optional[bool]): Re-score quantized candidates with the original vectors
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results (e.g. category, crawl date)
+            limit (int): Maximum number of results
+
+        Returns:
+            QueryResultModel: Payloads of the results
+        """
+        started = time.perf_counter()
+        vector = await self.model.embed_simple_text(query)
+        qdrant_filter = to_qdrant_filter(query_filter)
+        
+        response = await self._request(
+            "POST",
+            f"/collections/{self.collection_name}/points/search",
+            operation="search",
+            json={
+                "vector": vector.tolist(),
+                # Several chunks of a document collapse into one result
+                "limit": limit * DEFAULT_CHUNK_OVERFETCH if self.chunker is not None else limit,
+                "score_threshold": self.score_threshold,
+                "with_payload": True,
+                **self._search_params(hnsw_ef=hnsw_ef, exact=exact, rescore=rescore),
+                **({"filter": qdrant_filter.model_dump(mode="json", exclude_none=True)} if qdrant_filter else {}),
+            },
+        )
+        
+        SEARCH_SECONDS.observe(time.perf_counter() - started, method="query")
+        results = [ScoredResult(hit["id"], hit["score"], hit["payload"]) for hit in response["result"]]
+        return [result.payload for result in QdrantClientStorage._group_by_ref(results, limit)]
+    
+    async def close(self) -> None:
+        await self.http_client.aclose()
+    
+    def _search_params(self, **kwargs) -> dict:
+        search_params = self.collection_settings.search_params(**kwargs)
+        if search_params is None:
+            return {}
+        return {"params": search_params.model_dump(mode="json", exclude_none=True)}
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        operation: str,
+        allow_not_found: bool = False,
+        **kwargs,
+    ) -> Optional[dict]:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def request() -> Optional[dict]:
+            async with self.semaphore:
+                try:
+                    with QDRANT_REQUEST_SECONDS.time(operation=operation):
+                        response = await self.http_client.request(method, url, **kwargs)
+                except httpx.TransportError as error:
+                    raise RetryableError(f"Qdrant is unreachable: {error}") from error
+            
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableError(
+                    f"Qdrant answered {response.status_code}",
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+            if allow_not_found and response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
+        
+        return await retry_with_backoff(request, self.max_retries, operation=f"qdrant_{operation}")
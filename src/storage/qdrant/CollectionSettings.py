@@ -0,0 +1,131 @@
+import os
+from typing import Optional
+
+from qdrant_client import models
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+class CollectionSettings:
+    """
+    Storage, index and quantization settings used when the Qdrant collection is created,
+    and the search params derived from them.
+    """
+    
+    def __init__(
+        self,
+        on_disk_vectors: bool = False,
+        on_disk_payload: bool = False,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        quantization: str = "none",
+        quantization_always_ram: bool = True,
+        scalar_quantile: float = 0.99,
+        product_compression: str = "x16",
+        rescore: bool = True,
+    ) -> None:
+        if quantization not in ("none", "scalar", "product"):
+            raise ValueError(f"Unknown quantization: {quantization}. It must be one of none, scalar and product.")
+        
+        self.on_disk_vectors = on_disk_vectors
+        self.on_disk_payload = on_disk_payload
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.quantization = quantization
+        self.quantization_always_ram = quantization_always_ram
+        self.scalar_quantile = scalar_quantile
+        self.product_compression = product_compression
+        self.rescore = rescore
+    
+    @classmethod
+    def from_env(cls) -> "CollectionSettings":
+        return cls(
+            on_disk_vectors=_env_bool("QDRANT_ON_DISK_VECTORS", False),
+            on_disk_payload=_env_bool("QDRANT_ON_DISK_PAYLOAD", False),
+            hnsw_m=_env_int("QDRANT_HNSW_M"),
+            hnsw_ef_construct=_env_int("QDRANT_HNSW_EF_CONSTRUCT"),
+            quantization=os.getenv("QDRANT_QUANTIZATION") or "none",
+            quantization_always_ram=_env_bool("QDRANT_QUANTIZATION_ALWAYS_RAM", True),
+            scalar_quantile=float(os.getenv("QDRANT_SCALAR_QUANTILE") or 0.99),
+            product_compression=os.getenv("QDRANT_PRODUCT_COMPRESSION") or "x16",
+            rescore=_env_bool("QDRANT_QUANTIZATION_RESCORE", True),
+        )
+    
+    def to_create_collection_kwargs(self, vector_size: int) -> dict:
+        """
+        Build the arguments of `create_collection`/`recreate_collection`
+
+        Args:
+            vector_size (int): Size of the vectors
+
+        Returns:
+            dict: keyword arguments except the collection name
+        """
+        hnsw_config = None
+        if self.hnsw_m is not None or self.hnsw_ef_construct is not None:
+            hnsw_config = models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+        
+        return {
+            "vectors_config": models.VectorParams(
+                size=vector_size,
+                distance=models.Distance.COSINE,
+                on_disk=self.on_disk_vectors or None,
+            ),
+            "on_disk_payload": self.on_disk_payload or None,
+            "hnsw_config": hnsw_config,
+            "quantization_config": self.quantization_config(),
+        }
+    
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.scalar_quantile,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(self.product_compression),
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        return None
+    
+    def search_params(
+        self,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+    ) -> Optional[models.SearchParams]:
+        """
+        Build the search params of a query.
+        Quantized collections re-score the candidates with the original vectors unless `rescore` is False.
+
+        Args:
+            hnsw_ef (Optional[int]): Size of the HNSW beam, the collection default is used if None
+            exact (bool): Search without approximation
+            rescore (Optional[bool]): Re-score with the original vectors, `QDRANT_QUANTIZATION_RESCORE` is used if None
+
+        Returns:
+            Optional[models.SearchParams]: None when every param is the default
+        """
+        quantization = None
+        if self.quantization != "none":
+            quantization = models.QuantizationSearchParams(rescore=self.rescore if rescore is None else rescore)
+        
+        if hnsw_ef is None and not exact and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import time
+from itertools import islice
+from typing import Any, Dict
+
+import numpy as np
+from qdrant_client import models
+
+from src.metrics.Instruments import QDRANT_REQUEST_SECONDS, QDRANT_UPSERT_BATCH_SIZE
+from src.storage.qdrant.QdrantClient import DEFAULT_UPSERT_BATCH_SIZE, QdrantClientStorage
+from src.utils.vectors import VECTOR_DTYPE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+VECTORS_FILE_NAME = "vectors.npy"
+PAYLOADS_FILE_NAME = "payloads.jsonl"
+META_FILE_NAME = "meta.json"
+
+
+class CollectionSnapshot:
+    """
+    Portable bundle of the points of a collection in a directory, which can be loaded into any Qdrant without embedding again.
+
+    - `vectors.npy`: float32 matrix with one row per point, memory-mapped while it is written and read
+    - `payloads.jsonl`: id and payload of every point, in the same order as the rows of the matrix
+    - `meta.json`: embedding model, dimension and number of points, written last so a bundle without it is incomplete
+
+    Both directions stream the points page by page, so the corpus is never held in memory.
+    """
+    
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, VECTORS_FILE_NAME)
+        self.payloads_path = os.path.join(directory, PAYLOADS_FILE_NAME)
+        self.meta_path = os.path.join(directory, META_FILE_NAME)
+    
+    def read_meta(self) -> Dict[str, Any]:
+        with open(self.meta_path, encoding="utf-8") as meta_file:
+            return json.load(meta_file)
+    
+    def export(self, storage: QdrantClientStorage, page_size: int = 1000) -> int:
+        """
+        Write every point of the collection of the storage into the directory
+
+        Args:
+            storage (QdrantClientStorage): Storage whose collection is exported
+            page_size (int): Number of points per scroll request
+
+        Returns:
+            int: Number of exported points
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            # A bundle being overwritten is incomplete until its new meta.json is written
+            os.remove(self.meta_path)
+        
+        dimension = storage.model.get_vector_size()
+        # Points saved while exporting may be missed, the matrix is sized by the count at the start
+        capacity = storage.qdrant_client.count(collection_name=storage.collection_name, exact=True).count
+        vectors = np.lib.format.open_memmap(self.vectors_path, mode="w+", dtype=VECTOR_DTYPE, shape=(capacity, dimension))
+        
+        count = 0
+        offset = None
+        with open(self.payloads_path, "w", encoding="utf-8") as payloads_file:
+            while count < capacity:
+                with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                    points, offset = storage.qdrant_client.scroll(
+                        collection_name=storage.collection_name,
+                        limit=min(page_size, capacity - count),
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=True,
+                    )
+                for point in points:
+                    vectors[count] = point.vector
+                    payloads_file.write(json.dumps({"id": point.id, "payload": point.payload}, ensure_ascii=False) + "\n")
+                    count += 1
+                if offset is None:
+                    break
+        vectors.flush()
+        del vectors
+        
+        meta = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "collection_name": storage.collection_name,
+            "embedding_model": storage.model.get_model_name(),
+            "dimension": dimension,
+            # Rows after `count` are unused when points were deleted while exporting
+            "count": count,
+            "exported_at": int(time.time()),
+        }
+        with open(self.meta_path, "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file, indent=2)
+        
+        logger.info("%d points of %s are exported into %s.", count, storage.collection_name, self.directory)
+        return count
+    
+    def load(
+        self,
+        storage: QdrantClientStorage,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        defer_indexing: bool = True,
+    ) -> int:
+        """
+        Upsert every point of the bundle into the collection of the storage, with the ids they were exported with
+
+        Args:
+            storage (QdrantClientStorage): Storage whose collection receives the points
+            upsert_batch_size (int): Number of points per upsert request
+            defer_indexing (bool): Build the HNSW index once after loading instead of while loading
+
+        Returns:
+            int: Number of loaded points
+        """
+        meta = self.read_meta()
+        if meta["format_version"] != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {meta['format_version']}")
+        if meta["dimension"] != storage.model.get_vector_size() or meta["embedding_model"] != storage.model.get_model_name():
+            raise ValueError(
+                f"The snapshot is embedded with {meta['embedding_model']} ({meta['dimension']} dimensions), "
+                f"but the storage embeds queries with {storage.model.get_model_name()} ({storage.model.get_vector_size()} dimensions)."
+            )
+        
+        count = meta["count"]
+        vectors = np.load(self.vectors_path, mmap_mode="r")
+        indexing_threshold = storage.qdrant_client.get_collection(storage.collection_name).config.optimizer_config.indexing_threshold
+        if defer_indexing:
+            storage.qdrant_client.update_collection(
+                collection_name=storage.collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+            )
+        
+        try:
+            with open(self.payloads_path, encoding="utf-8") as payloads_file:
+                for start in range(0, count, upsert_batch_size):
+                    rows = [json.loads(line) for line in islice(payloads_file, min(upsert_batch_size, count - start))]
+                    QDRANT_UPSERT_BATCH_SIZE.observe(len(rows))
+                    with QDRANT_REQUEST_SECONDS.time(operation="upsert"):
+                        storage.qdrant_client.upsert(
+                            collection_name=storage.collection_name,
+                            points=models.Batch(
+                                ids=[row["id"] for row in rows],
+                                vectors=vectors[start:start + len(rows)].tolist(),
+                                payloads=[row["payload"] for row in rows],
+                            ),
+                        )
+        finally:
+            if defer_indexing:
+                storage.qdrant_client.update_collection(
+                    collection_name=storage.collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+                )
+        
+        # Both are derived from the collection, which changed behind their back
+        storage.lexical_index = None
+        if storage.result_cache is not None:
+            storage.result_cache.invalidate()
+        
+        logger.info("%d points of %s are loaded into %s.", count, self.directory, storage.collection_name)
+        return count
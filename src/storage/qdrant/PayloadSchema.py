@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import models
+
+from src.embedd.EmbeddedModel import EmbeddedModel
+from src.storage.QueryFilter import QueryFilter
+from src.storage.qdrant.PointIdentity import content_hash
+
+# Payload fields used by filters and synchronization, they are indexed when the storage is created
+PAYLOAD_INDEXES = {
+    "ref": models.PayloadSchemaType.KEYWORD,
+    "category": models.PayloadSchemaType.KEYWORD,
+    "doc_id": models.PayloadSchemaType.KEYWORD,
+    "source": models.PayloadSchemaType.KEYWORD,
+    "crawled_at": models.PayloadSchemaType.INTEGER,
+}
+
+
+def build_payload(data: EmbeddedModel) -> Dict[str, Any]:
+    """
+    Build the payload of a point, the metadata of the data are stored next to its text and reference
+
+    Args:
+        data (EmbeddedModel): Embedded data to be saved
+
+    Returns:
+        Dict[str, Any]: payload of the point
+    """
+    payload = {key: value for key, value in data.metadata.items() if value is not None}
+    payload.update({
+        "original_text": data.original_text,
+        "ref": data.ref,
+        # Chunks carry the hash of their whole document, which is what synchronization compares
+        "content_hash": data.metadata.get("content_hash") or content_hash(data.original_text),
+    })
+    return payload
+
+
+def _match(key: str, value) -> models.FieldCondition:
+    if isinstance(value, (list, tuple, set)):
+        return models.FieldCondition(key=key, match=models.MatchAny(any=list(value)))
+    return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+
+
+def aliased_refs_filter(refs: List[str]) -> models.Filter:
+    """
+    Filter of the points of the documents which have aliases recorded in their payload
+
+    Args:
+        refs (List[str]): References of the documents
+
+    Returns:
+        models.Filter: Qdrant filter
+    """
+    return models.Filter(
+        must=[_match("ref", refs)],
+        must_not=[models.IsEmptyCondition(is_empty=models.PayloadField(key="aliases"))],
+    )
+
+
+def to_qdrant_filter(query_filter: Optional[QueryFilter]) -> Optional[models.Filter]:
+    """
+    Convert a QueryFilter into a Qdrant filter, so Qdrant applies it during the HNSW traversal
+
+    Args:
+        query_filter (Optional[QueryFilter]): Conditions of the query
+
+    Returns:
+        Optional[models.Filter]: None when there is no condition
+    """
+    if query_filter is None or query_filter.is_empty():
+        return None
+    
+    must: List[models.FieldCondition] = [
+        _match(key, value)
+        for key, value in (
+            ("category", query_filter.category),
+            ("doc_id", query_filter.doc_id),
+            ("source", query_filter.source),
+        )
+        if value is not None
+    ]
+    if query_filter.crawled_from is not None or query_filter.crawled_to is not None:
+        must.append(models.FieldCondition(
+            key="crawled_at",
+            range=models.Range(gte=query_filter.crawled_from, lte=query_filter.crawled_to),
+        ))
+    
+    return models.Filter(must=must)
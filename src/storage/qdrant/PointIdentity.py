@@ -0,0 +1,47 @@
+import hashlib
+import uuid
+from typing import Any, Dict, Optional
+
+
+def point_id(ref: str, section: Optional[str] = None, chunk_index: Optional[int] = None) -> str:
+    """
+    Deterministic point id of a document or of one of its chunks, so saving the same `ref` again overwrites its points
+
+    Args:
+        ref (str): Reference of the document
+        section (Optional[str]): Section of the chunk (e.g. question, answer)
+        chunk_index (Optional[int]): Position of the chunk in its section, None for a document stored as one point
+
+    Returns:
+        str: UUID derived from the reference
+    """
+    if chunk_index is None:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, ref))
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{ref}#{section}#{chunk_index}"))
+
+
+def point_id_of(ref: str, metadata: Dict[str, Any]) -> str:
+    """
+    Point id of a data or a stored payload, chunks are identified by their `section` and `chunk_index` metadata
+
+    Args:
+        ref (str): Reference of the document
+        metadata (Dict[str, Any]): Metadata or payload of the point
+
+    Returns:
+        str: UUID of the point
+    """
+    return point_id(ref, metadata.get("section"), metadata.get("chunk_index"))
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash of the embedded text, stored in the payload to detect changed documents
+
+    Args:
+        text (str): Embedded text of the document
+
+    Returns:
+        str: sha256 hex digest of the text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
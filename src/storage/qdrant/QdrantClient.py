@@ -1,97 +1,843 @@
+import logging
 import os
-import uuid
-from typing import List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from src.chunking.TextChunker import TextChunker
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.dedup.MinHashDeduplicator import MinHashDeduplicator, merge_aliases
 from src.embedd.EmbeddedModel import EmbeddedModel
+from src.storage.QueryFilter import QueryFilter
 from src.storage.QueryResultModel import QueryResultModel
+from src.storage.RankFusion import reciprocal_rank_fusion
+from src.storage.ScoredResult import ScoredResult
+from src.storage.lexical.BM25Index import BM25Index
+from src.storage.rerank.RerankStage import RerankStage
 from src.storage.StorageInterface import StorageInterface
+from src.storage.cache.QueryResultCache import QueryResultCache
+from src.storage.qdrant.CollectionSettings import CollectionSettings
+from src.storage.qdrant.PayloadSchema import PAYLOAD_INDEXES, aliased_refs_filter, build_payload, to_qdrant_filter
+from src.storage.qdrant.PointIdentity import content_hash, point_id_of
 from src.embedd.EmbeddingInteface import EmbeddingInterface
-from src.embedd.openai.OpenAIClient import OpenAIClient
+from src.crawler.SourceData import SourceData
+from src.metrics.Instruments import INGESTED_DOCUMENTS, QDRANT_REQUEST_SECONDS, QDRANT_UPSERT_BATCH_SIZE, SEARCH_SECONDS
+from src.metrics.Tracing import attached, current_context, span
+from src.utils.batching import chunked
+from src.utils.vectors import as_matrix
 
 from qdrant_client import QdrantClient
 from qdrant_client import models
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_BATCH_SIZE = 256
+DEFAULT_UPSERT_BATCH_SIZE = 512
+DEFAULT_MAX_IN_FLIGHT = 4
+# Queries per Qdrant `search_batch` request of query_many
+DEFAULT_SEARCH_BATCH_SIZE = 256
+# Chunks fetched per requested result when documents are chunked, several chunks of a document collapse into one result
+DEFAULT_CHUNK_OVERFETCH = 4
+
 class QdrantClientStorage(StorageInterface):
     
-    def __init__(self, embedding_client: EmbeddingInterface) -> None:
-        self.collection_name = os.getenv("QDRANT_COLLECTION_NAME")
-        self.qdrant_client = QdrantClient(
+    def __init__(
+        self,
+        embedding_client: EmbeddingInterface,
+        collection_settings: Optional[CollectionSettings] = None,
+        collection_name: Optional[str] = None,
+        result_cache: Optional[QueryResultCache] = None,
+        qdrant_client: Optional[QdrantClient] = None,
+        chunker: Optional[TextChunker] = None,
+        deduplicator: Optional[MinHashDeduplicator] = None,
+        rerank_stage: Optional[RerankStage] = None,
+    ) -> None:
+        self.collection_name = collection_name or os.getenv("QDRANT_COLLECTION_NAME")
+        self.collection_settings = collection_settings or CollectionSettings.from_env()
+        self.score_threshold = float(os.getenv("QDRANT_SCORE_THRESHOLD") or 0.8)
+        # An injected client can be the in-process mode, e.g. QdrantClient(":memory:") in benchmarks
+        self.qdrant_client = qdrant_client or QdrantClient(
             host=os.getenv("QDRANT_HOST"), 
             port=os.getenv("QDRANT_PORT"),
         )
         
-        if (os.getenv("QDRANT_COLLECTION_ALWAYS_REFRES") == True):
-            print("QDRANT_COLLECTION_ALWAYS_REFRES is set. So, collection will be refreshed.")
+        create_collection_kwargs = self.collection_settings.to_create_collection_kwargs(embedding_client.get_vector_size())
+        
+        if (os.getenv("QDRANT_COLLECTION_ALWAYS_REFRES") == "True"):
+            logger.info("QDRANT_COLLECTION_ALWAYS_REFRES is set. So, collection will be refreshed.")
             self.qdrant_client.recreate_collection(
                 collection_name=self.collection_name,
-                vectors_config=models.VectorParams(size=embedding_client.get_vector_size(), distance=models.Distanc.COSINE),
+                **create_collection_kwargs,
             )
         else:
-            print("QDRANT_COLLECTION_ALWAYS_REFRES is not set. So, collection will not be refreshed.")
-            if (self.qdrant_client.get_collection(collection_name=self.collection_name) == None):
-                print("Collection does not exist. So, collection will be created.")
+            logger.info("QDRANT_COLLECTION_ALWAYS_REFRES is not set. So, collection will not be refreshed.")
+            if (not self.collection_exists()):
+                logger.info("Collection does not exist. So, collection will be created.")
                 self.qdrant_client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(size=embedding_client.get_vector_size(), distance=models.Distance.COSINE),
+                    **create_collection_kwargs,
                 )
+        self.create_payload_indexes()
         
         self.model = embedding_client
+        # Built from the collection on the first hybrid query, then kept in sync by save and delete
+        self.lexical_index: Optional[BM25Index] = None
+        self.lexical_index_lock = threading.Lock()
+        # Invalidated on every save and delete
+        self.result_cache = result_cache
+        # Documents are stored as one point per chunk when set
+        self.chunker = chunker or TextChunker.from_env()
+        # Near-duplicate documents are dropped before embedding and recorded as aliases of the kept one when set
+        self.deduplicator = deduplicator or MinHashDeduplicator.from_env()
+        # Candidates of query, query_batch and query_many are re-ranked when set
+        self.rerank_stage = rerank_stage or RerankStage.from_env()
+    
+    def collection_exists(self) -> bool:
+        collections = self.qdrant_client.get_collections().collections
+        return any(collection.name == self.collection_name for collection in collections)
+    
+    def create_payload_indexes(self) -> None:
+        """
+        Index the payload fields used by filters, so filtered queries are answered during the HNSW traversal.
+        Indexes which already exist are left as they are.
+        """
+        indexed = self.qdrant_client.get_collection(collection_name=self.collection_name).payload_schema or {}
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name not in indexed:
+                self.qdrant_client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
     
     def convert_single_data_to_point_struct(self, data: EmbeddedModel) -> models.PointStruct:
         return models.PointStruct(
-            id=uuid.uuid4().hex,
-            payload={
-                "original_text": data.original_text,
-                "ref": data.ref,
-            },
-            vector=data.embedded_text
+            id=point_id_of(data.ref, data.metadata),
+            payload=build_payload(data),
+            vector=data.embedded_text.tolist()
         )
         
     def convert_data_to_point_structs(self, datas: List[EmbeddedModel]) -> List[models.PointStruct]:
         return [self.convert_single_data_to_point_struct(data) for data in datas]
     
+    def convert_data_to_batch(self, datas: List[EmbeddedModel]) -> models.Batch:
+        # The vectors are stacked into one float32 matrix and converted to floats in a single call
+        return models.Batch(
+            ids=[point_id_of(data.ref, data.metadata) for data in datas],
+            vectors=as_matrix([data.embedded_text for data in datas]).tolist(),
+            payloads=[build_payload(data) for data in datas],
+        )
+    
     def save(self, data: EmbeddedModel) -> bool:
         datas = self.convert_data_to_point_structs([data])
         
-        result = self.qdrant_client.upsert(
-            collection_name=self.collection_name, points=datas
-        )
+        QDRANT_UPSERT_BATCH_SIZE.observe(1)
+        with QDRANT_REQUEST_SECONDS.time(operation="upsert"):
+            result = self.qdrant_client.upsert(
+                collection_name=self.collection_name, points=datas
+            )
+        self._after_save([data])
         
         return result
     
-    def query(self, query: str) -> QueryResultModel:
+    def save_many(self, datas: List[EmbeddedModel], upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE) -> bool:
+        """
+        Save embedded data with one upsert request per `upsert_batch_size` points
+
+        Args:
+            datas (List[EmbeddedModel]): Embedded data to be saved
+            upsert_batch_size (int): Maximum number of points per upsert request
+
+        Returns:
+            bool: True if every upsert request is completed, False otherwise.
+        """
+        saved = True
+        for batch in chunked(datas, upsert_batch_size):
+            points = self.convert_data_to_batch(batch)
+            QDRANT_UPSERT_BATCH_SIZE.observe(len(batch))
+            with QDRANT_REQUEST_SECONDS.time(operation="upsert"):
+                result = self.qdrant_client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                )
+            saved = saved and result.status == models.UpdateStatus.COMPLETED
+        self._after_save(datas)
+        
+        return saved
+    
+    def ingest(
+        self,
+        crawler: CrawlerInterface,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> int:
+        """
+        Crawl, embed and save every data of the crawler in batches, chunking the documents when a chunker is set.
+        Each worker embeds `upsert_batch_size` source data in chunks of `embed_batch_size`
+        and saves them with a single upsert, at most `max_in_flight` workers run at once.
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be saved
+            embed_batch_size (int): Number of source data embedded together
+            upsert_batch_size (int): Number of points per upsert request
+            max_in_flight (int): Maximum number of batches being embedded or upserted at once, 0 runs them in the calling thread
+
+        Returns:
+            int: Number of saved data
+        """
+        with span("ingest", collection=self.collection_name):
+            saved_count = self._ingest_stream(crawler.iter_crawl(), embed_batch_size, upsert_batch_size, max_in_flight, False)
+        
+        logger.info("%d data are ingested into %s.", saved_count, self.collection_name)
+        return saved_count
+    
+    def sync(
+        self,
+        crawler: CrawlerInterface,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> Dict[str, int]:
+        """
+        Incrementally synchronize the collection with the crawler.
+        Only new or changed documents (by the `content_hash` payload) are embedded and saved,
+        and the points of documents which are not crawled anymore are deleted.
+        Chunks left over by a changed document which now has fewer chunks are deleted after its new chunks are saved.
+
+        Args:
+            crawler (CrawlerInterface): Source of the data to be synchronized
+            embed_batch_size (int): Number of source data embedded together
+            upsert_batch_size (int): Number of points per upsert request
+            max_in_flight (int): Maximum number of batches being embedded or upserted at once, 0 runs them in the calling thread
+
+        Returns:
+            Dict[str, int]: Number of unchanged, saved and deleted documents
+        """
+        stored_hashes, stale_ids = self.scroll_content_hashes()
+        crawled_refs: Set[str] = set()
+        counts = {"unchanged": 0, "saved": 0, "deleted": 0}
+        
+        def changed_datas() -> Iterator[SourceData]:
+            for data in crawler.iter_crawl():
+                if data.ref in crawled_refs:
+                    continue
+                crawled_refs.add(data.ref)
+                if stored_hashes.get(data.ref) == content_hash(data.text):
+                    counts["unchanged"] += 1
+                    if self.deduplicator is not None:
+                        self.deduplicator.register(data)
+                    continue
+                yield data
+        
+        with span("sync", collection=self.collection_name):
+            counts["saved"] = self._ingest_stream(changed_datas(), embed_batch_size, upsert_batch_size, max_in_flight, True)
+        
+        vanished_refs = list(stored_hashes.keys() - crawled_refs)
+        counts["deleted"] = len(vanished_refs)
+        self.delete_refs(vanished_refs, upsert_batch_size)
+        self.delete_points(stale_ids, upsert_batch_size)
+        
+        logger.info("%s is synchronized: %s", self.collection_name, counts)
+        return counts
+    
+    def scroll_content_hashes(self, page_size: int = 1000) -> Tuple[Dict[str, Optional[str]], List]:
+        """
+        Read the reference and content hash of every stored point without their vectors
+
+        Args:
+            page_size (int): Number of points per scroll request
+
+        Returns:
+            Dict[str, Optional[str]]: content hash per reference, None for points saved without a hash
+            List: ids of points whose id is not derived from their reference and chunk (e.g. saved with random ids)
+        """
+        hashes = {}
+        stale_ids = []
+        offset = None
+        
+        while True:
+            with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                points, offset = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=["ref", "content_hash", "section", "chunk_index"],
+                    with_vectors=False,
+                )
+            for point in points:
+                ref = point.payload.get("ref")
+                if ref is None or str(point.id) != point_id_of(ref, point.payload):
+                    stale_ids.append(point.id)
+                    continue
+                hashes[ref] = point.payload.get("content_hash")
+            if offset is None:
+                return hashes, stale_ids
+    
+    def delete_points(self, ids: List, batch_size: int = DEFAULT_UPSERT_BATCH_SIZE) -> None:
+        for batch in chunked(ids, batch_size):
+            with QDRANT_REQUEST_SECONDS.time(operation="delete"):
+                self.qdrant_client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(points=batch),
+                )
+        if self.lexical_index is not None:
+            for id in ids:
+                self.lexical_index.remove(str(id))
+        if self.result_cache is not None:
+            self.result_cache.invalidate()
+    
+    def delete_refs(self, refs: List[str], batch_size: int = DEFAULT_UPSERT_BATCH_SIZE, keep_ids: Optional[List[str]] = None) -> None:
+        """
+        Delete every point of the documents, i.e. all of their chunks
+
+        Args:
+            refs (List[str]): References of the documents
+            batch_size (int): Number of documents per request
+            keep_ids (Optional[List[str]]): Ids of points of these documents which must be kept
+        """
+        for batch in chunked(refs, batch_size):
+            scroll_filter = models.Filter(
+                must=[models.FieldCondition(key="ref", match=models.MatchAny(any=batch))],
+                must_not=[models.HasIdCondition(has_id=keep_ids)] if keep_ids else None,
+            )
+            ids = []
+            offset = None
+            while True:
+                # Ids are listed first so the lexical index can forget them too
+                with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                    points, offset = self.qdrant_client.scroll(
+                        collection_name=self.collection_name,
+                        scroll_filter=scroll_filter,
+                        limit=1000,
+                        offset=offset,
+                        with_payload=False,
+                        with_vectors=False,
+                    )
+                ids.extend(point.id for point in points)
+                if offset is None:
+                    break
+            if ids:
+                self.delete_points(ids, batch_size)
+    
+    def _after_save(self, datas: List[EmbeddedModel]) -> None:
+        if self.lexical_index is not None:
+            for data in datas:
+                self.lexical_index.add(point_id_of(data.ref, data.metadata), data.original_text)
+        if self.result_cache is not None:
+            self.result_cache.invalidate()
+    
+    @staticmethod
+    def _cache_params(
+        limit: Optional[int],
+        hnsw_ef: Optional[int],
+        exact: bool,
+        rescore: Optional[bool],
+        query_filter: Optional[QueryFilter],
+    ) -> Hashable:
+        return (limit, hnsw_ef, exact, rescore, query_filter.cache_key() if query_filter is not None else None)
+    
+    def _ingest_stream(
+        self,
+        datas: Iterable[SourceData],
+        embed_batch_size: int,
+        upsert_batch_size: int,
+        max_in_flight: int,
+        replace: bool,
+    ) -> int:
+        saved_count = 0
+        in_flight = set()
+        
+        # The in-process Qdrant persisted with `path` can only be used from the thread which opened it
+        if max_in_flight == 0:
+            for batch in chunked(datas, upsert_batch_size):
+                saved_count += self.ingest_batch(batch, embed_batch_size, upsert_batch_size, replace)
+            self.write_aliases()
+            return saved_count
+        
+        # Spans of the workers are children of the span of the calling thread
+        context = current_context()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for batch in chunked(datas, upsert_batch_size):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    saved_count += sum(future.result() for future in done)
+                in_flight.add(executor.submit(self.ingest_batch, batch, embed_batch_size, upsert_batch_size, replace, context))
+            
+            done, _ = wait(in_flight)
+            saved_count += sum(future.result() for future in done)
+        
+        # Canonical documents of the aliases are all saved by now
+        self.write_aliases()
+        return saved_count
+    
+    def ingest_batch(
+        self,
+        batch: List[SourceData],
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        replace: bool = False,
+        context: Optional[object] = None,
+    ) -> int:
+        """
+        Drop near-duplicates and chunk when a deduplicator and a chunker are set, embed and save one batch of documents.
+        Aliases of the dropped documents are stored by `write_aliases`, which must be called once the batches are saved.
+
+        Args:
+            batch (List[SourceData]): Documents to be saved
+            embed_batch_size (int): Number of source data embedded together
+            upsert_batch_size (int): Number of points per upsert request
+            replace (bool): Delete the other points of these documents afterwards, e.g. chunks of a previous longer version
+                or every point of a document which became a near-duplicate
+            context (Optional[object]): Tracing context of the thread which handed the batch over
+
+        Returns:
+            int: Number of saved documents
+        """
+        with attached(context), span("ingest.batch", size=len(batch)):
+            documents = batch
+            if self.deduplicator is not None:
+                documents = self.deduplicator.drop_duplicates(batch)
+                # Upserting replaces the whole payload, the aliases of a canonical document saved again are carried over
+                documents = self.deduplicator.with_aliases(documents, self._stored_aliases([data.ref for data in documents]))
+            sources = self.chunker.iter_chunks(documents) if self.chunker is not None else documents
+            embedded = []
+            with span("ingest.embed"):
+                for chunk in chunked(sources, embed_batch_size):
+                    embedded.extend(self.model.embed_batch(chunk))
+            
+            # Chunks of a document are not comparable with whole documents, so only unchunked documents are checked
+            if self.deduplicator is not None and self.deduplicator.vector_score is not None and self.chunker is None:
+                embedded = self._drop_similar(embedded)
+            
+            with span("ingest.upsert"):
+                if not self.save_many(embedded, upsert_batch_size=upsert_batch_size):
+                    raise RuntimeError(f"Failed to save {len(embedded)} data into {self.collection_name}.")
+                if replace:
+                    self.delete_refs(
+                        [data.ref for data in batch],
+                        upsert_batch_size,
+                        keep_ids=[point_id_of(data.ref, data.metadata) for data in embedded],
+                    )
+        
+        saved_count = len({data.ref for data in embedded})
+        INGESTED_DOCUMENTS.inc(saved_count)
+        return saved_count
+    
+    def _drop_similar(self, embedded: List[EmbeddedModel]) -> List[EmbeddedModel]:
+        if not embedded:
+            return embedded
+        with QDRANT_REQUEST_SECONDS.time(operation="search_batch"):
+            search_results = self.qdrant_client.search_batch(
+                collection_name=self.collection_name,
+                requests=[
+                    models.SearchRequest(
+                        vector=data.embedded_text.tolist(),
+                        # The closest point may be the previous version of the document itself
+                        limit=2,
+                        score_threshold=self.deduplicator.vector_score,
+                        with_payload=["ref"],
+                    )
+                    for data in embedded
+                ],
+            )
+        return self.deduplicator.drop_similar(embedded, [[hit.payload.get("ref") for hit in hits] for hits in search_results])
+    
+    def _stored_aliases(self, refs: List[str], page_size: int = 1000) -> Dict[str, List[str]]:
+        """
+        Read the aliases recorded in the payloads of the documents
+
+        Args:
+            refs (List[str]): References of the documents
+            page_size (int): Number of points per scroll request
+
+        Returns:
+            Dict[str, List[str]]: aliases per reference, documents without aliases are left out
+        """
+        stored = {}
+        offset = None
+        while refs:
+            with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                points, offset = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=aliased_refs_filter(refs),
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=["ref", "aliases"],
+                    with_vectors=False,
+                )
+            for point in points:
+                ref = point.payload["ref"]
+                stored[ref] = merge_aliases(stored.get(ref), point.payload.get("aliases"))
+            if offset is None:
+                break
+        return stored
+    
+    def write_aliases(self) -> int:
+        """
+        Store the references of the dropped near-duplicates in the `aliases` payload of every point of their canonical document
+
+        Returns:
+            int: Number of updated canonical documents
+        """
+        if self.deduplicator is None:
+            return 0
+        
+        aliases = self.deduplicator.pop_dirty_aliases()
+        # Aliases recorded by previous runs are kept
+        stored_aliases = self._stored_aliases(list(aliases))
+        for canonical, refs in aliases.items():
+            with QDRANT_REQUEST_SECONDS.time(operation="set_payload"):
+                self.qdrant_client.set_payload(
+                    collection_name=self.collection_name,
+                    payload={"aliases": merge_aliases(stored_aliases.get(canonical), refs)},
+                    points=models.Filter(must=[models.FieldCondition(key="ref", match=models.MatchValue(value=canonical))]),
+                )
+        if aliases and self.result_cache is not None:
+            self.result_cache.invalidate()
+        return len(aliases)
+    
+    @SEARCH_SECONDS.time(method="query")
+    def query(
+        self,
+        query: str,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+        query_filter: Optional[QueryFilter] = None,
+        limit: int = 10,
+    ) -> QueryResultModel:
+        """
+        Query the closest data of the query string, chunks of the same document are grouped into its best chunk
+
+        Args:
+            query (str): Query string
+            hnsw_ef (Optional[int]): Size of the HNSW beam, larger is more accurate and slower
+            exact (bool): Search without approximation
+            rescore (Optional[bool]): Re-score quantized candidates with the original vectors
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results (e.g. category, crawl date)
+            limit (int): Maximum number of results
+
+        Returns:
+            QueryResultModel: Payloads of the results
+        """
+        started = time.perf_counter()
+        cache = self.result_cache
+        if cache is not None:
+            generation = cache.generation
+            key = cache.key(query, self._cache_params(limit, hnsw_ef, exact, rescore, query_filter))
+            payloads = cache.get(key)
+            if payloads is not None:
+                cache.record_hit(time.perf_counter() - started)
+                return payloads
+        
         # Convert text query into vector
         vector = self.model.embed_simple_text(query)
+        
+        if cache is not None:
+            payloads = cache.get_similar(key, vector)
+            if payloads is not None:
+                cache.record_hit(time.perf_counter() - started)
+                return payloads
 
         # Use `vector` for search for closest vectors in the collection
-        search_result = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=vector,
-            score_threshold=0.8,
-            query_filter=None,  # If you don't want any filters for now
-        )
+        with QDRANT_REQUEST_SECONDS.time(operation="search"):
+            search_result = self.qdrant_client.search(
+                collection_name=self.collection_name,
+                query_vector=vector,
+                score_threshold=self._search_score_threshold(),
+                query_filter=to_qdrant_filter(query_filter),
+                search_params=self._search_params(hnsw_ef, exact, rescore),
+                limit=self._search_limit(limit),
+                with_vectors=self.rerank_stage is not None,
+            )
         
         # `search_result` contains found vector ids with similarity scores along with the stored payload
         # In this function you are interested in payload only
-        payloads = [hit.payload for hit in search_result]
+        payloads = [result.payload for result in self._rank(query, vector, search_result, limit)]
+        
+        if cache is not None:
+            cache.record_miss(time.perf_counter() - started)
+            cache.put(key, vector, payloads, generation)
         
         return payloads
     
+    @SEARCH_SECONDS.time(method="query_batch")
+    def query_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+        query_filters: Optional[List[Optional[QueryFilter]]] = None,
+        limits: Optional[List[int]] = None,
+    ) -> List[QueryResultModel]:
+        """
+        Query many strings with one batched embedding call and one Qdrant `search_batch` request
+
+        Args:
+            queries (List[str]): Query strings
+            limit (int): Maximum number of results per query
+            hnsw_ef (Optional[int]): Size of the HNSW beam, larger is more accurate and slower
+            exact (bool): Search without approximation
+            rescore (Optional[bool]): Re-score quantized candidates with the original vectors
+            query_filters (Optional[List[Optional[QueryFilter]]]): Conditions of each query, in the same order as `queries`
+            limits (Optional[List[int]]): Maximum number of results of each query, `limit` for every query when None
+
+        Returns:
+            List[QueryResultModel]: Payloads of the results, one list per query in the same order as `queries`
+        """
+        if not queries:
+            return []
+        
+        started = time.perf_counter()
+        cache = self.result_cache
+        query_filters = query_filters or [None] * len(queries)
+        limits = limits or [limit] * len(queries)
+        results: List[Optional[QueryResultModel]] = [None] * len(queries)
+        pending = list(range(len(queries)))
+        vector_of: Dict[int, List[float]] = {}
+        
+        if cache is not None:
+            generation = cache.generation
+            keys = [
+                cache.key(query, self._cache_params(query_limit, hnsw_ef, exact, rescore, query_filter))
+                for query, query_limit, query_filter in zip(queries, limits, query_filters)
+            ]
+            for index in pending:
+                results[index] = cache.get(keys[index])
+            pending = [index for index in pending if results[index] is None]
+        
+        if pending:
+            vectors = self.model.embed_simple_texts([queries[index] for index in pending])
+            vector_of.update(zip(pending, vectors))
+            
+            if cache is not None:
+                for index in pending:
+                    results[index] = cache.get_similar(keys[index], vector_of[index])
+                pending = [index for index in pending if results[index] is None]
+        
+        if pending:
+            scored_results = self._search_vectors(
+                [queries[index] for index in pending],
+                [vector_of[index] for index in pending],
+                [limits[index] for index in pending],
+                [query_filters[index] for index in pending],
+                self._search_params(hnsw_ef, exact, rescore),
+            )
+            for index, scored in zip(pending, scored_results):
+                results[index] = [result.payload for result in scored]
+        
+        if cache is not None:
+            # Latency is shared by every query of the batch
+            seconds = (time.perf_counter() - started) / len(queries)
+            searched = set(pending)
+            for index in range(len(queries)):
+                if index in searched:
+                    cache.record_miss(seconds)
+                    cache.put(keys[index], vector_of[index], results[index], generation)
+                else:
+                    cache.record_hit(seconds)
+        
+        return results
+    
+    @SEARCH_SECONDS.time(method="hybrid_query")
+    def hybrid_query(
+        self,
+        query: str,
+        limit: int = 10,
+        candidates: Optional[int] = None,
+        query_filter: Optional[QueryFilter] = None,
+        rrf_k: int = 60,
+    ) -> QueryResultModel:
+        """
+        Query with both dense vectors and BM25 over `original_text`, fused with reciprocal rank fusion.
+        Short keyword queries find the documents containing their words even when the dense score is low,
+        so no score threshold is applied to the dense candidates.
 
-if __name__ == "__main__":
-    client = QdrantClientStorage(
-        embedding_client=OpenAIClient()
-    )
+        Args:
+            query (str): Query string
+            limit (int): Maximum number of results
+            candidates (Optional[int]): Number of candidates of each retriever, 5 times `limit` by default
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results
+            rrf_k (int): Smoothing constant of reciprocal rank fusion
+
+        Returns:
+            QueryResultModel: Payloads of the results
+        """
+        candidates = candidates or self._search_limit(limit, rerank=False) * 5
+        qdrant_filter = to_qdrant_filter(query_filter)
+        lexical_index = self.load_lexical_index()
+        
+        query_vector = self.model.embed_simple_text(query)
+        with QDRANT_REQUEST_SECONDS.time(operation="search"):
+            dense_hits = self.qdrant_client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                query_filter=qdrant_filter,
+                limit=candidates,
+                search_params=self.collection_settings.search_params(),
+            )
+        payloads = {str(hit.id): hit.payload for hit in dense_hits}
+        
+        lexical_ids = [document_id for document_id, _ in lexical_index.search(query, candidates)]
+        missing_ids = [document_id for document_id in lexical_ids if document_id not in payloads]
+        if missing_ids:
+            # The lexical index knows nothing about metadata, so Qdrant applies the filter on its candidates
+            must = [models.HasIdCondition(has_id=missing_ids)]
+            if qdrant_filter is not None:
+                must.extend(qdrant_filter.must)
+            with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                points, _ = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=models.Filter(must=must),
+                    limit=len(missing_ids),
+                    with_payload=True,
+                    with_vectors=False,
+                )
+            payloads.update((str(point.id), point.payload) for point in points)
+        
+        dense_ranking = [str(hit.id) for hit in dense_hits]
+        lexical_ranking = [document_id for document_id in lexical_ids if document_id in payloads]
+        fused = reciprocal_rank_fusion([dense_ranking, lexical_ranking], k=rrf_k)
+        
+        fused_results = [ScoredResult(document_id, score, payloads[document_id]) for document_id, score in fused]
+        return [result.payload for result in self._group_by_ref(fused_results, limit)]
     
-    result = client.save(
-        data=EmbeddedModel(
-            embedded_text=[0.0015061837621033192, 0.0034185831900686026, -0.012801367789506912, -0.03333835303783417, -0.009449690580368042, 0.00477263517677784, -0.015369287692010403, 0.0016710595227777958, -0.00296298461034894, -0.0249782782047987, 0.029922956600785255, 0.007123906631022692, -0.016822105273604393, -0.018007298931479454, 0.010405492037534714, -0.0028004981577396393, 0.02519492618739605, -0.015139894559979439, 0.011272084899246693, 0.01073046401143074, -0.00816254410892725, -0.001796906697563827, 0.017115218564867973, 0.006072525400668383, -0.014247813262045383, -0.007346927188336849, 0.003482303349301219, -0.015930024906992912, 0.037161558866500854, -0.025806639343500137, 0.009902102872729301, -0.006690610200166702, -0.004791751503944397, -0.01386549323797226, 0.011769101954996586, -0.018963100388646126, 0.0050052134320139885, -0.011335805058479309, 0.01901407726109028, -0.011781846173107624, 0.004823611117899418, 0.005607368424534798, 0.0030346696730703115, -0.006270057521760464, -0.026813415810465813, 0.008334588259458542, 0.005448068492114544, -0.009233041666448116, -0.006117129232734442, 0.020517870783805847, 0.02041591890156269, -0.011807333678007126, -0.013648844324052334, 0.007671899627894163, -0.01856803707778454, -0.00045878469245508313, -0.038359496742486954, 0.023971499875187874, 0.030916990712285042, -0.022161848843097687, 0.01974048651754856, 0.008028732612729073, -0.022939234972000122, 0.010035915300250053, -0.010341771878302097, 0.005132653750479221, 0.014260557480156422, 0.013954700902104378, -0.02227654494345188, 0.024111684411764145, 0.020097319036722183, 0.001941869966685772, -0.0056487866677343845, -0.0048140534199774265, 0.020161038264632225, 0.00029331157566048205, -0.02050512656569481, 0.005916411057114601, 0.00041497714119032025, -0.008742397651076317, 0.02869953215122223, -0.035963620990514755, -0.013253780081868172, 0.014630134217441082, 0.02228928916156292, 0.003644789569079876, -0.005855876952409744, 0.022748075425624847, -0.016936801373958588, -0.015356543473899364, -0.009889358654618263, 0.005846318788826466, 0.015522215515375137, 0.013852749019861221, -0.024047965183854103, 0.01289694756269455, 0.002927938476204872, 0.03106991946697235, -0.0002837535575963557, -0.035963620990514755, -0.013241035863757133, -0.0037276255898177624, -0.010354516096413136, -0.014107629656791687, -0.019434629008173943, 0.0072067431174218655, -0.011049064807593822, -0.0020294850692152977, 0.027476105839014053, 0.0013524590758606791, -0.023270579054951668, 0.00890806969255209, -0.0004918394843116403, -0.03323640301823616, -0.0026491631288081408, -0.008468400686979294, -0.0009215518948622048, 0.010647628456354141, 0.0013293605297803879, -0.02033945545554161, 0.01864450052380562, 0.021257024258375168, 0.0064771478064358234, -0.023385275155305862, 0.0021441811695694923, 0.004094016272574663, -0.034612756222486496, -0.021601112559437752, -0.0077292476780712605, -0.012508255429565907, 0.025309622287750244, -0.001983287977054715, -0.004125876352190971, 0.00026045588310807943, -0.033363841474056244, 0.02734866552054882, -0.011240225285291672, 0.01944737322628498, -0.02198343351483345, -0.009392342530190945, 0.000893674383405596, 0.027934890240430832, 0.011864681728184223, -0.001941869966685772, -0.007066558580845594, 0.020772751420736313, 0.0040175518952310085, -0.013610612601041794, 0.013355731964111328, -0.0068753985688090324, 0.005709320772439241, 0.018542548641562462, 0.011017204262316227, 0.0038359498139470816, 0.012412674725055695, 0.03489312529563904, -0.0016885825898498297, 0.020747262984514236, 0.004326594527810812, -0.0173573549836874, 0.0037021376192569733, -0.008729653432965279, 0.0065026357769966125, -0.025437062606215477, 0.01744656264781952, 0.01909054070711136, 0.01989341340959072, 0.011010833084583282, -0.00995307881385088, -0.020237503573298454, -0.012081330642104149, 0.003178039798513055, -0.04294734448194504, 0.02281179465353489, -0.01464287843555212, 0.015343799255788326, 0.004014366306364536, 0.01610844023525715, -0.014349766075611115, -0.0294386837631464, -0.02765452116727829, 0.008850721642374992, 0.003533279290422797, 0.029719052836298943, 0.009188437834382057, 8.258721936726943e-05, 0.012922435998916626, -0.011495104990899563, 0.0049000754952430725, -0.013890980742871761, 0.008697792887687683, 0.03764583170413971, 0.024430284276604652, 0.017395585775375366, -0.6867496967315674, -0.01188379805535078, 0.019421884790062904, 0.018797429278492928, 0.00616810517385602, 0.00987024325877428, 0.007684643846005201, 0.03731448948383331, 0.00032815849408507347, 0.029489660635590553, -0.02093842439353466, 0.022760817781090736, -0.014222325757145882, -0.0067224702797830105, -0.007353299297392368, -0.014808550477027893, 0.004046225920319557, -0.015483983792364597, -0.0049383076839149, 0.007009210530668497, -0.01285234373062849, 0.029030876234173775, -0.023601923137903214, -0.01684759370982647, 0.011756357736885548, 0.00872328132390976, 0.006400683894753456, -0.015420263633131981, -0.014489949680864811, 0.0323188342154026, -0.00395064614713192, 0.0131135955452919, 0.00553409056738019, 0.006203151308000088, 0.04970167577266693, 0.015840815380215645, 0.0021569253876805305, 0.001507776789367199, 0.007971384562551975, 0.02974454127252102, -0.019995367154479027, -0.019778717309236526, 0.010622140020132065, -0.016452528536319733, 0.008857093751430511, 0.004998841788619757, 0.003101575654000044, -0.00577941257506609, 0.0038964839186519384, 0.007123906631022692, 0.01640155352652073, -0.0007168510928750038, 0.014859526418149471, 0.018886636942625046, -0.000741542608011514, 0.007761107757687569, 0.01578984037041664, 0.014528182335197926, -5.650180537486449e-05, 0.005400278139859438, 0.0014329056721180677, 0.02109135128557682, -0.0018032786902040243, 0.006072525400668383, -0.019358165562152863, 0.01856803707778454, -0.01818571612238884, 0.01491050235927105, -0.0038805538788437843, -0.012164166197180748, -0.012495511211454868, -0.0067415861412882805, -0.014935990795493126, -0.01840236410498619, 0.0063720098696649075, 0.025819383561611176, 0.02570468746125698, -0.0034472572151571512, -0.005263280123472214, 0.017497537657618523, 0.017306378111243248, 0.017178937792778015, -0.006544054020196199, -0.023359786719083786, 0.016567224636673927, -0.023130394518375397, -0.031044431030750275, -0.017867114394903183, 0.0019801019225269556, 0.004444476682692766, 0.037085097283124924, 0.007079302798956633, -0.010335399769246578, -0.029795518144965172, 0.02429010160267353, 0.006279615685343742, -0.012622951529920101, -0.00197532307356596, 0.017548514530062675, -0.00890806969255209, 0.010176099836826324, 0.0006256516790017486, 0.007907664403319359, -0.0011302352650091052, 0.01618490368127823, 0.012508255429565907, -0.001260064891539514, 0.04167294502258301, 0.021409953013062477, -0.02547529526054859, -0.005174071993678808, 0.005655158776789904, -0.0374419279396534, 0.01505068689584732, 0.01170538179576397, -0.024646934121847153, 0.001405028160661459, 0.022034408524632454, 0.029897470027208328, -0.014668365940451622, 0.022862771525979042, -0.00853849295526743, 0.009647222235798836, 0.007869431748986244, 0.0026013730093836784, 0.015343799255788326, -0.01345768477767706, 0.006330591626465321, -0.016286857426166534, 0.005479928106069565, 0.01826217956840992, 0.007378787267953157, 0.0011477582156658173, -0.0034791172947734594, 0.004947865381836891, 0.007143022958189249, 0.015458495356142521, -0.011323060840368271, 0.0032847709953784943, 0.02086195908486843, -0.008009616285562515, 0.0035046052653342485, 0.0004094016330782324, -0.0016726525500416756, 0.009621734730899334, -0.01907779648900032, -0.0017602676525712013, 0.01781613938510418, 0.005683832801878452, -0.006098013371229172, 0.014413486234843731, -0.008933557197451591, -0.028113307431340218, 0.02847013995051384, -0.011374037712812424, -0.0023719805758446455, -0.007550831418484449, -0.025806639343500137, -0.026252679526805878, -0.031018942594528198, 0.010233447887003422, 0.017382841557264328, -0.011151016689836979, 0.003982506226748228, -0.011730870231986046, -0.027297688648104668, -0.020619822666049004, 0.02304118685424328, 0.0046356371603906155, -0.022837283089756966, 0.005352488253265619, -0.011412269435822964, -0.024239124730229378, -0.0038869259878993034, -0.0027144760824739933, 0.010947112925350666, -0.012387187220156193, -0.022544169798493385, -0.0011605023173615336, -0.020390430465340614, 0.004450848791748285, -0.007990499958395958, -0.002359236590564251, 0.017918091267347336, 0.02691536955535412, -0.002802091185003519, 0.002314632525667548, 0.022939234972000122, -0.024646934121847153, -0.010832416824996471, 0.017268145456910133, 0.011947518214583397, -0.019205236807465553, -0.004594218917191029, 0.002136216266080737, -0.01824943535029888, -0.0026427910197526217, -0.0017682326724752784, 0.008787001483142376, 0.019613046199083328, 0.020658055320382118, 0.007761107757687569, 0.020301222801208496, -0.02602328732609749, -0.01981694996356964, -0.026966344565153122, -0.0008442912949249148, -0.031095407903194427, 0.005473556462675333, 0.016363320872187614, 0.011437756940722466, 0.001302279531955719, -0.0003339331306051463, 0.016439784318208694, 0.018071020022034645, 0.02408619597554207, -0.0013309535570442677, -0.022391242906451225, -0.022684354335069656, 0.00596101488918066, 0.0036670914851129055, 0.01427330169826746, -0.016146672889590263, -0.006773446220904589, 0.00853849295526743, 0.031426750123500824, 0.008232636377215385, 0.04024561494588852, 0.010634884238243103, -0.026940856128931046, -0.019268957898020744, 0.01773967407643795, 0.011820077896118164, 0.014349766075611115, -0.008054220117628574, -0.0025010136887431145, 0.001906823948957026, -0.013024387881159782, 0.03524995595216751, 0.0127057870849967, -0.007461623288691044, 0.013585124164819717, 0.0266095120459795, -0.017472051084041595, -0.0032130859326571226, 0.029973933473229408, 0.02064531110227108, -0.0065886578522622585, 0.003115912666544318, 0.028419163078069687, -0.01069860439747572, -0.004450848791748285, -0.0013269709888845682, -0.014528182335197926, 0.01468111015856266, -0.030866015702486038, 0.008602213114500046, -0.015114407055079937, 0.021193305030465126, 0.032752130180597305, 0.02079823985695839, 0.008621329441666603, 0.003415397135540843, -0.00652175210416317, 0.00419596815481782, -0.012763135135173798, -0.005479928106069565, -0.013954700902104378, 0.005244163796305656, -0.0009661559597589076, -0.02227654494345188, -0.01147598959505558, 0.027603546157479286, -0.03777327388525009, 0.0059737591072916985, 0.00316688884049654, -0.0046356371603906155, -0.010284423828125, -0.007391531020402908, 0.0005495858495123684, -0.0083537045866251, -0.02676244080066681, 0.0013245815644040704, 0.006582286208868027, 0.004829983226954937, -0.012839599512517452, -0.029795518144965172, -0.00954527035355568, -0.00557232229039073, -0.003638417460024357, -0.0001859830372268334, 0.008978161960840225, 0.0073596709407866, -0.02630365639925003, 0.011896542273461819, -0.003737183753401041, 0.025666454806923866, 0.0030282975640147924, -0.0015037943376228213, -0.015968255698680878, 0.014783062040805817, 0.022709842771291733, -0.006524937693029642, -0.018274923786520958, 0.005358860362321138, 0.0001771219540387392, -0.006639634259045124, -0.02228928916156292, 0.007085674908012152, -0.015420263633131981, 0.0061712912283837795, 0.002818021224811673, -0.0007514989119954407, 0.004039854276925325, 0.010571164079010487, 0.0012106818612664938, -0.0009573944262228906, 0.023793084546923637, 0.02974454127252102, 0.0063242195174098015, 0.006684238091111183, -0.0013755576219409704, -0.021792273968458176, -0.008506633341312408, 0.07620923221111298, 0.000902435858733952, 0.002529687946662307, 0.016197647899389267, -0.015891792252659798, -0.0086786774918437, -0.026176216080784798, -0.021664833649992943, -0.02109135128557682, -0.011151016689836979, -0.0012584718642756343, 0.002308260416612029, -0.017637722194194794, 0.008143428713083267, 0.008047848008573055, 0.008213520050048828, 0.004489080980420113, -0.015458495356142521, -0.0077101318165659904, 0.009825638495385647, -0.009003649465739727, 0.009513410739600658, -0.002639604965224862, 0.01087702065706253, 0.024876326322555542, 0.0008251752587966621, 0.006862654350697994, 0.012680299580097198, -0.008200776763260365, -0.009832010604441166, 0.00458466075360775, -0.009679082781076431, 0.018529804423451424, 0.0019179749069735408, 0.013546892441809177, 0.014362509362399578, -0.009194809943437576, 0.029183804988861084, 0.010558419860899448, -0.010947112925350666, 0.006690610200166702, 0.0032911431044340134, -0.009035510011017323, -0.0029438685160130262, 0.01013149507343769, 0.0023066673893481493, -0.008959045633673668, 0.02796037867665291, -0.002451630774885416, -0.02719573676586151, 0.02205989696085453, 0.0015969849191606045, -0.00815617199987173, -0.014337021857500076, -0.014005676843225956, 0.01566240005195141, 0.0038741817697882652, -0.016006488353013992, -0.014744830317795277, -0.017828883603215218, -0.0070920465514063835, -0.018440596759319305, -0.016681920737028122, -0.009430574253201485, -0.022110873833298683, -0.026660488918423653, -0.02265886589884758, -0.004903261549770832, -0.011488733813166618, -0.005798528902232647, -0.010622140020132065, -0.04521578177809715, -0.016452528536319733, -0.004062156192958355, 0.019268957898020744, 0.0019100098870694637, 0.005884550977498293, -0.006107571069151163, 0.0051422119140625, 0.0020740891341120005, -0.014222325757145882, -0.02706829644739628, 0.01303713209927082, -0.01073683612048626, 0.014426229521632195, 0.004007994197309017, -0.0042565022595226765, 0.00946243479847908, -0.022008921951055527, 0.03122284822165966, 0.00207727518863976, 0.024175405502319336, 0.022161848843097687, 0.001949834986589849, 0.007659155409783125, 0.007665527518838644, -0.000774995656684041, -0.0011111191706731915, -0.018211204558610916, -0.0005583473248407245, -0.005540462210774422, -0.008627701550722122, -0.001166874310001731, -0.010335399769246578, -0.00024372937332373112, 0.008857093751430511, 0.010902508161962032, 0.024111684411764145, -0.016197647899389267, 4.126871863263659e-05, 0.03489312529563904, -0.02295197919011116, 0.018134739249944687, 0.0022971094585955143, 0.002666685963049531, 0.007334182970225811, 0.02765452116727829, 0.0314522385597229, 0.0005483910790644586, -0.032242368906736374, -0.0022190522868186235, -0.0225824024528265, 0.006582286208868027, 0.01524184737354517, 0.006381567567586899, -0.00037455468554981053, -0.0023225974291563034, -0.015636911615729332, -0.011055436916649342, -0.0007522953674197197, -0.006432543974369764, 0.016528993844985962, -0.0025567689444869757, -0.006760702468454838, -0.00557232229039073, -0.008398308418691158, -0.02056884765625, 0.010806928388774395, -0.004211898427456617, -0.015687888488173485, -0.017421074211597443, -0.00637519545853138, -0.0022015294525772333, -0.014222325757145882, -0.04399235546588898, -0.04264148697257042, -0.007448879536241293, -0.0024054336827248335, -0.007684643846005201, 0.01856803707778454, -0.002743150107562542, 0.0008912848425097764, -0.019065052270889282, -0.014120373874902725, -0.0014161791186779737, -0.020288478583097458, -0.003600185504183173, -0.003753113793209195, 0.026940856128931046, 0.025284133851528168, 0.023385275155305862, 0.014744830317795277, 0.01638880930840969, 0.0006180849159136415, -0.0007391531253233552, -0.009736430831253529, 0.00936048198491335, -0.004970167763531208, -0.012170538306236267, 0.007678271736949682, 0.017765162512660027, 0.018198460340499878, -0.013572380878031254, 0.017089730128645897, 0.0013213955098763108, -0.008047848008573055, -0.015496727079153061, 0.01069860439747572, -0.01767595484852791, -0.017561258748173714, -0.02824074774980545, -0.0018016857793554664, 0.003976134117692709, 0.004122690297663212, 0.0039060418494045734, -0.011730870231986046, 0.016274113208055496, 0.012278862297534943, 0.019511094316840172, 0.0038741817697882652, 0.033797141164541245, -0.024787116795778275, 0.024417541921138763, 0.008876209147274494, 0.012992527335882187, -0.017102474346756935, -0.0026284540072083473, -0.012164166197180748, 0.022990209981799126, 0.004368012771010399, 0.017981810495257378, 0.023283323273062706, -0.006798934191465378, -0.009264902211725712, 0.0015149452956393361, 0.027527082711458206, -0.00573799479752779, 0.002829172182828188, 0.005868620704859495, -0.006088455207645893, 0.002034264151006937, -0.021142328158020973, -0.00036220892798155546, -0.013572380878031254, 0.004281990695744753, -0.01578984037041664, -0.019116029143333435, 0.011947518214583397, -0.017472051084041595, -0.03481665998697281, -0.019804205745458603, 0.0008570352802053094, 0.045725543051958084, -0.004020737949758768, 0.00936048198491335, 0.022646121680736542, 0.0025089788250625134, 0.0012393558863550425, 0.011170133017003536, -0.01675838604569435, -0.004317036364227533, 0.038130104541778564, 0.007984127849340439, -0.010794184170663357, -0.013139083981513977, -0.0004460406780708581, 0.00556913623586297, -0.013470428064465523, -0.01826217956840992, -0.0007961029768921435, 0.023359786719083786, 0.002255691448226571, -0.01617216132581234, 0.006212709471583366, -0.02824074774980545, 0.021677576005458832, -0.002214273437857628, -0.021193305030465126, -0.02005908638238907, 0.007302322890609503, -0.023372530937194824, 0.0163250882178545, -0.02033945545554161, 0.03323640301823616, 0.02304118685424328, -0.014859526418149471, -0.0064771478064358234, 0.004100388381630182, 0.0008152190130203962, -0.009812895208597183, -0.000826768227852881, 0.025360599160194397, -0.0035269074141979218, 0.0004623689455911517, 0.013030759990215302, -0.0017220355803146958, -0.0167074091732502, -0.008137056604027748, -0.0070538148283958435, 0.023793084546923637, -0.02370387688279152, 0.007429763209074736, -0.005451254080981016, 0.009309506043791771, 0.00020131567725911736, 0.014362509362399578, -0.014744830317795277, -0.015675144270062447, 0.0033930952195078135, -0.00064755545463413, 0.03280310705304146, 0.0027734171599149704, 0.0009565979707986116, -0.018083764240145683, -0.013164572417736053, -0.027170248329639435, -0.0512564443051815, -0.0005344523233361542, -0.005492672324180603, -0.0335167720913887, -0.013699821196496487, -0.003883739933371544, 0.009475178085267544, 0.018657244741916656, 0.01787985861301422, -0.009965823031961918, 0.013572380878031254, 0.02369113266468048, -0.016044721007347107, -0.005591438617557287, 0.02683890424668789, 0.014795806258916855, -0.028342699632048607, 0.01840236410498619, -0.003329375060275197, -0.020454151555895805, 0.0013317500706762075, -0.00811794027686119, -0.010596652515232563, 0.0069136302918195724, 0.01166077796369791, 0.008812488988041878, -0.009991311468183994, 0.008417424745857716, 0.029234779998660088, 0.028648555278778076, 0.018669988960027695, -0.00754445930942893, -0.010176099836826324, 0.04779007285833359, -0.009456062689423561, -8.965616871137172e-05, -0.0047280313447117805, -0.012412674725055695, 0.02407345175743103, -0.007493483368307352, -0.016376065090298653, 0.007996872067451477, -0.037365466356277466, -0.004998841788619757, -0.005795342847704887, -0.006301917601376772, 0.009698199108242989, -0.025092974305152893, -0.02256965823471546, -0.007015582639724016, -0.017905347049236298, 0.002376759657636285, 0.008442913182079792, -0.016414297744631767, -0.0030171466059982777, 0.0171407051384449, 0.01893761195242405, -0.004199154209345579, -0.0006443694583140314, -0.011361293494701385, -0.0175230260938406, -0.014617389999330044, -0.02212361805140972, -0.014885014854371548, -0.004027110058814287, 0.04159647971391678, 0.012368070892989635, -0.011214736849069595, -0.00987024325877428, 0.0020804612431675196, -0.026660488918423653, -0.033363841474056244, -0.0016853965353220701, -0.005871806759387255, 0.0017411516746506095, 0.012986156158149242, -0.002861032262444496, 0.012272490188479424, 0.004657939076423645, 0.000997219467535615, -0.013368476182222366, -0.016745641827583313, 0.021346231922507286, -0.0031971558928489685, 0.01767595484852791, 0.005362045951187611, -0.030152350664138794, -0.001881335861980915, 0.0019769161008298397, 0.014553669840097427, -0.011501477099955082, 0.012552859261631966, -0.004626078996807337, -0.012399930506944656, -0.011004460975527763, -0.010679488070309162, 0.00015133523265831172, 0.008965417742729187, 0.021805016323924065, -0.012845971621572971, -0.004992469679564238, 0.00042652638512663543, -0.0074233911000192165, 0.005588252563029528, -0.009328622370958328, 0.014413486234843731, -0.018211204558610916, 0.013202804140746593, -0.021601112559437752, -0.005221861880272627, -0.007193998899310827, -0.01678387261927128, 0.00693274661898613, -0.017841627821326256, 0.007920407690107822, 0.024481261149048805, 0.0008873023325577378, 0.00912471767514944, -0.004629265051335096, 0.0002491057675797492, -0.006544054020196199, 0.00932225026190281, 0.00016049499390646815, -0.013151828199625015, 0.002727220067754388, 0.0034600012004375458, -0.018669988960027695, -0.025526270270347595, 0.005355674307793379, -0.03609106317162514, -0.009003649465739727, -0.0065886578522622585, 0.0338481143116951, 0.015840815380215645, -0.020364942029118538, -0.008589468896389008, -0.019778717309236526, 0.00012465243344195187, 0.010564791969954967, -0.017994554713368416, 0.0077292476780712605, -0.007633667439222336, 0.006177663337439299, 0.02525864541530609, -0.016286857426166534, 0.002666685963049531, 0.01759949140250683, 0.013393964618444443, -0.006311475764960051, 0.02691536955535412, 0.2322470098733902, -0.011679893359541893, 0.010443723760545254, 0.02436656504869461, 0.013648844324052334, 0.017178937792778015, 0.010615767911076546, -0.0009215518948622048, 0.001506980275735259, 0.01423506997525692, -0.009405085816979408, -0.00476944912225008, -0.0008411052986048162, 0.0075380876660346985, 0.002367201494053006, 0.0015284857945516706, -0.018338643014431, -0.015522215515375137, -0.029158316552639008, -0.02773098647594452, -0.004855471197515726, -0.030203325673937798, -0.019651276990771294, -0.017905347049236298, 0.017344610765576363, -0.009366854093968868, -0.006805306300520897, 0.0028928923420608044, 0.03328737989068031, 0.0061330595053732395, -0.006970978807657957, -0.01483403891324997, 0.010787812061607838, 0.006607774179428816, -0.006939118728041649, -0.023907780647277832, 0.032242368906736374, 0.005604182370007038, 0.03756937012076378, 0.007461623288691044, -0.010195215232670307, -0.01677113026380539, -0.005059375893324614, -0.0147193418815732, 0.01110641285777092, 0.009634478949010372, 0.002249319339171052, -0.0262271910905838, 0.008417424745857716, 0.03448531776666641, 0.0006324219866655767, 0.009558014571666718, 0.012603835202753544, 0.03369518741965294, 0.0004894500016234815, -0.013980189338326454, 0.011775474064052105, 0.013572380878031254, 0.0019769161008298397, -0.003848693799227476, 5.092629726277664e-05, 0.02796037867665291, -0.0041513643227517605, 0.027985867112874985, -0.022008921951055527, 0.007512599229812622, -0.030738575384020805, -0.0009048253996297717, 0.008340960368514061, -0.009819267317652702, -0.015343799255788326, -0.004887331277132034, 0.013190059922635555, -0.0059737591072916985, -0.028979899361729622, -0.0038518798537552357, 0.014515438117086887, -0.004313850775361061, 0.025322366505861282, 0.01780339516699314, -0.0029836934991180897, 0.005632856395095587, -0.005699762608855963, -0.018886636942625046, -0.03214041516184807, -0.02877599559724331, 0.005008399486541748, -0.002819614252075553, -0.015509471297264099, -0.023665644228458405, -0.009583503007888794, -0.01152059342712164, -0.00011698611342580989, -0.0019307188922539353, 0.026787929236888885, 0.02392052486538887, -0.0021425881423056126, 0.014362509362399578, -0.01367433276027441, 0.008289984427392483, -0.007327811326831579, 0.002682616002857685, -0.0054034641943871975, 0.01285871583968401, -0.0043297805823385715, 0.0027973123360425234, -0.009647222235798836, 2.237048420283827e-06, -0.0009940335294231772, -0.0237803403288126, -0.029617100954055786, -0.0067224702797830105, 0.004371198825538158, -0.0017411516746506095, -0.008780629374086857, 0.0018542548641562462, -0.00032835762249305844, 0.005744366906583309, -0.0051390258595347404, -0.011941146105527878, -0.0023624226450920105, -0.012215142138302326, -0.013521404936909676, -0.00019444586359895766, -0.004845913499593735, -0.02183050476014614, -0.007015582639724016, -0.003893297864124179, 0.013597868382930756, -0.029387708753347397, 0.015904536470770836, -0.0010927997063845396, 0.027705498039722443, 0.014247813262045383, -0.006945490371435881, 0.010978972539305687, 0.014158605597913265, -0.00592596922069788, -0.015993744134902954, -0.0010235040681436658, 0.002794126281514764, -0.022340266034007072, 0.016286857426166534, -0.006703353952616453, -0.01427330169826746, -0.01091525238007307, 0.03496959060430527, -0.026558537036180496, -0.00010483946971362457, 0.006658750120550394, -0.03524995595216751, -0.011934773996472359, -0.008455656468868256, -0.0114823617041111, 0.026813415810465813, -0.017013266682624817, -0.022671610116958618, -0.026584023609757423, -0.0022859585005789995, 0.0030346696730703115, -0.026354631409049034, 0.012278862297534943, 0.036193013191223145, -0.0017650467343628407, -0.025908591225743294, -0.013253780081868172, -0.16342930495738983, 0.015496727079153061, 0.01601923257112503, -0.020747262984514236, 0.027170248329639435, 0.010558419860899448, 0.030534669756889343, 0.0027351852040737867, -0.005890923086553812, 0.021142328158020973, 0.008009616285562515, -0.018759196624159813, -0.01427330169826746, -0.007843944244086742, 0.0043042926117777824, -0.009271274320781231, -0.006531309802085161, 0.017714187502861023, 0.03191102296113968, 0.027680009603500366, 0.026584023609757423, -0.019256213679909706, 0.010309911333024502, -0.003139807842671871, 0.011533337645232677, -0.009468805976212025, -0.0038901118095964193, 0.037238024175167084, -0.01691131293773651, -0.007984127849340439, -0.016605457291007042, -0.02281179465353489, 0.022913746535778046, 0.011635289527475834, 0.01743381842970848, 0.00025229176389984787, 0.012756763026118279, -0.04399235546588898, -0.016044721007347107, 0.02004634216427803, 0.02519492618739605, 0.011953890323638916, 0.02384405955672264, -0.016452528536319733, -0.01531831081956625, -0.008360076695680618, 0.020912935957312584, 0.01930718868970871, 0.02467242069542408, -0.009309506043791771, 0.010023171082139015, -0.004759891424328089, 0.003638417460024357, -0.017344610765576363, 0.02765452116727829, 0.028521114960312843, -0.0009096043650060892, 0.017714187502861023, 0.00023018884530756623, -0.004944679327309132, -0.0003016748232766986, -0.01661820150911808, -0.005467184353619814, 0.002614116994664073, 0.01106818113476038, -0.008047848008573055, 0.004664311185479164, 0.013623356819152832, -0.0005651176325045526, 0.012807739898562431, -0.008659561164677143, -0.024532238021492958, -0.011074553243815899, -0.031171871349215508, 0.0046738688834011555, 0.006018362939357758, -0.03369518741965294, 0.018593523651361465, -0.014069397002458572, -0.026252679526805878, -0.009965823031961918, 0.02831721119582653, 0.00012166555825388059, 0.0036989515647292137, -0.018287668004631996, 0.0001601963012944907, 0.004970167763531208, 0.018427852541208267, -0.031018942594528198, -0.040500491857528687, 0.014349766075611115, -0.012495511211454868, -0.007952268235385418, -0.021346231922507286, 0.0004105963744223118, 0.01743381842970848, 0.018236691132187843, 0.010660371743142605, -0.017051497474312782, -0.013151828199625015, 0.002110728295519948, 0.00839193630963564, -0.018517060205340385, 0.013738052919507027, 0.03948097303509712, -0.005196373909711838, 0.007850316353142262, 0.004403058905154467, 0.024685164913535118, -0.026176216080784798, -0.03257371485233307, 0.0070729306899011135, 0.015534959733486176, 0.02706829644739628, 0.01363610103726387, 0.02384405955672264, -0.003141400869935751, -0.017701443284749985, 0.003415397135540843, -0.014808550477027893, 0.05327000096440315, -0.00473121739923954, -0.04330417886376381, 0.0006280412198975682, 0.00308405258692801, -0.010571164079010487, -0.08701616525650024, -0.026278167963027954, -0.0003847100888378918, 0.00950703863054514, 0.006626890040934086, 0.04779007285833359, 0.005795342847704887, 0.005645600613206625, -0.0005627280916087329, 0.00969182699918747, 0.004520941060036421, -0.030075885355472565, -0.024799861013889313, -0.0118901701644063, 0.042233679443597794, -0.03219139203429222, 0.013100852258503437, 0.0011087296297773719, -0.02816428244113922, 0.013967445120215416, -0.005687018856406212, -0.0005587455816566944, 0.0008737618336454034, -0.008137056604027748, -0.017344610765576363, 0.012559231370687485, -0.020734518766403198, 0.030916990712285042, 0.003338932991027832, -0.012132306583225727, -0.021435441449284554, -0.02734866552054882, -0.011839194223284721, -0.008245380595326424, 0.0033739791251719, 0.011832822114229202, -0.04055146872997284, 0.031630657613277435, 0.012693042866885662, -0.04011817276477814, 0.025844871997833252, 0.011692637577652931, -0.006442101672291756, -0.06407693028450012, -0.0039028560277074575, 0.01826217956840992, -0.0017570817144587636, 0.03535190969705582, 0.011654405854642391, -0.010048659518361092, -0.026405608281493187, -0.025322366505861282, -0.026201704517006874, 0.00395064614713192, 0.0185552928596735, -0.006308289710432291, 0.008748768828809261, 0.03078955039381981, 0.0037658577784895897, 0.01106180902570486, 0.011297573335468769, 0.004301106557250023, -0.020084574818611145, 0.015420263633131981, -0.007448879536241293, 0.01824943535029888, -0.015420263633131981, 0.02481260523200035, 0.005776226986199617, 0.00114138622302562, -0.019804205745458603, 0.021728552877902985, 0.007238603197038174, 0.014413486234843731, -0.033210914582014084, -0.00635289354249835, -0.019613046199083328, -0.010481955483555794, 0.010647628456354141, -0.0009056218550540507, -0.0342814102768898, -0.017790650948882103, 0.018083764240145683, -0.0009223484084941447, 0.017459306865930557, 0.010125122964382172, -0.013444940559566021, 0.002598186954855919, -0.008245380595326424, -0.03420494869351387, -0.02839367464184761, 0.002290737582370639, 0.011233853176236153, -0.00653768191114068, 0.010080519132316113, 0.006862654350697994, -0.006387939676642418, -0.00026762441848404706, 0.018580779433250427, 0.012826855294406414, -0.03244627267122269, 0.002904043300077319, -0.0654023066163063, 0.02974454127252102, -0.014222325757145882, -0.03157968074083328, -0.000293709832476452, -0.014783062040805817, 0.008850721642374992, -0.015063431113958359, 0.000749507627915591, -0.012884203344583511, -0.014757574535906315, -0.006225453224033117, 0.009264902211725712, 0.014808550477027893, -0.030916990712285042, 0.005929154809564352, 0.007843944244086742, 0.012597463093698025, 0.009832010604441166, 0.00612668739631772, 0.010564791969954967, -0.035887159407138824, -0.008748768828809261, -0.0049383076839149, -0.024188147857785225, 0.007805712055414915, -0.03346579521894455, -0.002195157343521714, -0.0033102589659392834, -0.010265307500958443, 0.013992933556437492, -0.04123964533209801, 0.009787406772375107, 0.021779529750347137, 0.010080519132316113, -0.008876209147274494, 0.004581475164741278, 0.022556914016604424, -0.0007893326692283154, 0.02451949380338192, -0.02824074774980545, -0.027603546157479286, 0.010290795937180519, -0.016643689945340157, -0.007009210530668497, 0.004320222418755293, -0.0047216592356562614, 0.0013301570434123278, 0.03423043712973595, 0.021409953013062477, -0.009080113843083382, 0.033873602747917175, -0.0318855382502079, -0.015917280688881874, -0.014935990795493126, -0.014056653715670109, -0.005448068492114544, 0.004275618586689234, -0.0025838499423116446, -0.03810461610555649, 0.029260268434882164, 0.006677865982055664, 0.02719573676586151, -0.005983317270874977, 0.006824422162026167, 0.0017156635876744986, -0.023270579054951668, 0.0013859120663255453, -0.017905347049236298, -0.02256965823471546, -0.00973005872219801, -0.012699414975941181, 0.005033887457102537, -0.0015985779464244843, 0.018466083332896233, 0.020632566884160042, -0.0072449748404324055, 0.013126339763402939, -0.04368649795651436, 0.03637143224477768, 0.014387997798621655, 0.016796616837382317, -0.029617100954055786, -0.0015252998564392328, 0.039226092398166656, 0.012597463093698025, -0.008277240209281445, -0.010947112925350666, -0.0015284857945516706, -0.006368823815137148, -0.027858426794409752, -0.017051497474312782, 0.007487111259251833, 0.027323177084326744, 0.0034345132298767567, 0.010577536188066006, 0.021588368341326714, 0.011004460975527763, 0.021269768476486206, 0.023818572983145714, -0.005448068492114544, 0.016681920737028122, -0.020326711237430573, -0.0067479582503438, -0.01640155352652073, 0.010456467978656292, -0.006646005902439356, -0.04044951871037483, 0.007678271736949682, 0.010685860179364681, 0.010724091902375221, 0.03550483658909798, -0.0008681862964294851, 0.011641661636531353, -0.026584023609757423, -0.010195215232670307, 0.024124428629875183, 0.004916005302220583, -0.026048775762319565, 0.04350808262825012, -0.013585124164819717, 0.005699762608855963, 0.022901002317667007, -0.02070903219282627, 0.004227828234434128, -0.000404423481086269, -0.012374443002045155, -0.011405897326767445, 0.012202398851513863, -0.0010824451455846429, 0.018007298931479454, -0.005103979725390673, -0.023130394518375397, -0.0040653422474861145, -3.1685813155490905e-05, 0.02072177454829216, -0.007155766710639, 0.025653710588812828, -0.014158605597913265, 0.052352432161569595, -0.007856687530875206, -0.0017602676525712013, 0.02281179465353489, 0.02199617773294449, 0.013967445120215416, 0.01884840428829193, 0.015573191456496716, -0.009921219199895859, -0.01587904803454876, -0.006422985810786486, 0.010481955483555794, 0.006515379995107651, -0.02773098647594452, -0.025526270270347595, 0.0024643747601658106, -0.021703064441680908, -0.0009645629907026887, -0.015331055037677288, 0.01870821975171566, 0.01878468506038189, 0.013597868382930756, 0.028801484033465385, 0.006117129232734442, -0.024723397567868233, -0.014260557480156422, 0.003354863030835986, 0.00734055507928133, -0.0072449748404324055, -0.023742107674479485, 0.016146672889590263, 0.009194809943437576, -0.010609395802021027, -0.012234258465468884, -5.660136594087817e-05, 0.0027144760824739933, -0.013419452123343945, -0.0038295777048915625, -0.0007789781666360795, 0.005750738549977541, 0.02430284582078457, 0.004638823214918375, -0.025615479797124863, -0.026431096717715263, 0.004106760025024414, 0.005186815746128559, -0.030585646629333496, -0.002537652850151062, -0.01923072524368763],
-            original_text="Hello, world!",
-            ref="https://www.google.com"
-        )
-    )
+    @SEARCH_SECONDS.time(method="query_many")
+    def query_many(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        query_filter: Optional[QueryFilter] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+        search_batch_size: int = DEFAULT_SEARCH_BATCH_SIZE,
+    ) -> List[List[ScoredResult]]:
+        """
+        Query many strings for bulk jobs (e.g. offline evaluation), all of them are embedded with batched calls
+        and searched with `search_batch` requests of `search_batch_size` queries. The result cache is bypassed.
+
+        Args:
+            queries (List[str]): Query strings
+            limit (int): Maximum number of results per query
+            query_filter (Optional[QueryFilter]): Conditions on the metadata of the results of every query
+            hnsw_ef (Optional[int]): Size of the HNSW beam, larger is more accurate and slower
+            exact (bool): Search without approximation
+            rescore (Optional[bool]): Re-score quantized candidates with the original vectors
+            search_batch_size (int): Maximum number of queries per Qdrant request
+
+        Returns:
+            List[List[ScoredResult]]: Ids, scores and payloads of the results, one list per query in the same order as `queries`
+        """
+        if not queries:
+            return []
+        
+        vectors = self.model.embed_simple_texts(queries)
+        search_params = self._search_params(hnsw_ef, exact, rescore)
+        results = []
+        for offset in range(0, len(queries), search_batch_size):
+            batch_queries = queries[offset:offset + search_batch_size]
+            batch_vectors = vectors[offset:offset + search_batch_size]
+            results.extend(self._search_vectors(
+                batch_queries, batch_vectors, [limit] * len(batch_queries), [query_filter] * len(batch_queries), search_params
+            ))
+        return results
     
-    query_result = client.query(
-        query="Find Hello",
-    )
+    def _search_vectors(
+        self,
+        queries: List[str],
+        vectors: Sequence,
+        limits: List[int],
+        query_filters: List[Optional[QueryFilter]],
+        search_params: Optional[models.SearchParams],
+    ) -> List[List[ScoredResult]]:
+        with QDRANT_REQUEST_SECONDS.time(operation="search_batch"):
+            search_results = self.qdrant_client.search_batch(
+                collection_name=self.collection_name,
+                requests=[
+                    models.SearchRequest(
+                        vector=vector.tolist(),
+                        filter=to_qdrant_filter(query_filter),
+                        limit=self._search_limit(limit),
+                        score_threshold=self._search_score_threshold(),
+                        params=search_params,
+                        with_payload=True,
+                        with_vector=self.rerank_stage is not None,
+                    )
+                    for vector, limit, query_filter in zip(vectors, limits, query_filters)
+                ],
+            )
+        
+        return [
+            self._rank(query, vector, search_result, limit)
+            for query, vector, limit, search_result in zip(queries, vectors, limits, search_results)
+        ]
+    
+    def _rank(self, query: str, query_vector, search_result: List[models.ScoredPoint], limit: int) -> List[ScoredResult]:
+        results = [ScoredResult(str(hit.id), hit.score, hit.payload) for hit in search_result]
+        if self.rerank_stage is not None:
+            results = self.rerank_stage.rerank(
+                query, query_vector, results, [hit.vector for hit in search_result], score_threshold=self.score_threshold
+            )
+        return self._group_by_ref(results, limit)
     
-    print(query_result)
\ No newline at end of file
+    def _search_score_threshold(self) -> Optional[float]:
+        # Scores of the ANN search are not re-scored when the re-rank stage runs, it applies the threshold to exact scores
+        return self.score_threshold if self.rerank_stage is None else None
+    
+    def _search_params(self, hnsw_ef: Optional[int], exact: bool, rescore: Optional[bool]) -> Optional[models.SearchParams]:
+        if self.rerank_stage is not None:
+            # Candidates are scored again by the re-rank stage, so the ANN search can be cheap
+            hnsw_ef = hnsw_ef or self.rerank_stage.hnsw_ef
+            rescore = False if rescore is None else rescore
+        return self.collection_settings.search_params(hnsw_ef=hnsw_ef, exact=exact, rescore=rescore)
+    
+    def _search_limit(self, limit: int, rerank: bool = True) -> int:
+        search_limit = limit * DEFAULT_CHUNK_OVERFETCH if self.chunker is not None else limit
+        if rerank and self.rerank_stage is not None:
+            search_limit = max(search_limit, self.rerank_stage.candidates)
+        return search_limit
+    
+    @staticmethod
+    def _group_by_ref(hits: list, limit: int) -> list:
+        # Hits are sorted by relevance, so the first chunk of a document is its best one
+        grouped = {}
+        for hit in hits:
+            grouped.setdefault(hit.payload.get("ref"), hit)
+        return list(grouped.values())[:limit]
+    
+    def load_lexical_index(self, page_size: int = 1000) -> BM25Index:
+        """
+        Build the BM25 index from the `original_text` of every stored point, only once per storage
+
+        Args:
+            page_size (int): Number of points per scroll request
+
+        Returns:
+            BM25Index: the lexical index of the collection
+        """
+        with self.lexical_index_lock:
+            if self.lexical_index is not None:
+                return self.lexical_index
+            
+            lexical_index = BM25Index()
+            offset = None
+            while True:
+                with QDRANT_REQUEST_SECONDS.time(operation="scroll"):
+                    points, offset = self.qdrant_client.scroll(
+                        collection_name=self.collection_name,
+                        limit=page_size,
+                        offset=offset,
+                        with_payload=["original_text"],
+                        with_vectors=False,
+                    )
+                for point in points:
+                    lexical_index.add(str(point.id), point.payload.get("original_text", ""))
+                if offset is None:
+                    break
+            
+            self.lexical_index = lexical_index
+            return lexical_index
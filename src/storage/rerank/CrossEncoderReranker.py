@@ -0,0 +1,32 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from src.storage.ScoredResult import ScoredResult
+from src.storage.rerank.RerankerInterface import RerankerInterface
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    CrossEncoder = None
+
+# Multilingual, so Korean questions are scored too
+DEFAULT_CROSS_ENCODER_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+class CrossEncoderReranker(RerankerInterface):
+    """
+    Score every (query, `original_text`) pair with a cross-encoder of sentence-transformers on the CPU.
+    It is more precise than any vector similarity and much slower, so keep the re-rank budget small.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, batch_size: int = 32, max_length: int = 512) -> None:
+        if CrossEncoder is None:
+            raise ImportError("sentence-transformers is required by CrossEncoderReranker, install it with `pip install sentence-transformers`.")
+        self.model_name = model_name or os.getenv("RERANK_CROSS_ENCODER_MODEL") or DEFAULT_CROSS_ENCODER_MODEL
+        self.batch_size = batch_size
+        self.model = CrossEncoder(self.model_name, max_length=max_length, device="cpu")
+    
+    def score(self, query: str, query_vector: np.ndarray, candidates: List[ScoredResult], vectors: np.ndarray) -> np.ndarray:
+        pairs = [(query, candidate.payload.get("original_text", "")) for candidate in candidates]
+        return np.asarray(self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False), dtype=np.float32)
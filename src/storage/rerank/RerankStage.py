@@ -0,0 +1,103 @@
+import os
+from typing import List, Optional, Sequence
+
+from src.metrics.Instruments import RERANK_SECONDS
+from src.storage.ScoredResult import ScoredResult
+from src.storage.rerank.CrossEncoderReranker import CrossEncoderReranker
+from src.storage.rerank.ExactCosineReranker import ExactCosineReranker, cosine_similarities
+from src.storage.rerank.RerankerInterface import RerankerInterface
+from src.utils.vectors import as_matrix
+
+RERANKERS = {
+    "exact": ExactCosineReranker,
+    "cross_encoder": CrossEncoderReranker,
+}
+
+
+class RerankStage:
+    """
+    Second stage of a query: the ANN search over-fetches `candidates` hits, possibly with a cheap `hnsw_ef`
+    and quantized scores, and the first `budget` of them are ordered again by the reranker.
+    Candidates beyond the budget are dropped, so every result is ordered on the scale of the reranker.
+    
+    The stored vectors of the candidates are always fetched: `score` of the results is their exact cosine
+    similarity, which the score threshold is applied to, and `rerank_score` is the score of the reranker.
+    """
+    
+    def __init__(
+        self,
+        reranker: RerankerInterface,
+        candidates: int = 50,
+        budget: Optional[int] = None,
+        hnsw_ef: Optional[int] = None,
+    ) -> None:
+        if candidates < 1:
+            raise ValueError("candidates must be positive")
+        self.reranker = reranker
+        self.candidates = candidates
+        self.budget = budget or candidates
+        self.hnsw_ef = hnsw_ef
+    
+    @classmethod
+    def from_env(cls) -> Optional["RerankStage"]:
+        """
+        Create the stage from RERANK_* variables
+
+        Returns:
+            Optional[RerankStage]: None when RERANK_METHOD is none, the ANN hits are then returned as they are
+        """
+        method = os.getenv("RERANK_METHOD") or "none"
+        if method == "none":
+            return None
+        if method not in RERANKERS:
+            raise ValueError(f"Unknown rerank method: {method}. It must be one of none, {', '.join(RERANKERS)}.")
+        budget = os.getenv("RERANK_BUDGET")
+        hnsw_ef = os.getenv("RERANK_HNSW_EF")
+        return cls(
+            reranker=RERANKERS[method](),
+            candidates=int(os.getenv("RERANK_CANDIDATES") or 50),
+            budget=int(budget) if budget else None,
+            hnsw_ef=int(hnsw_ef) if hnsw_ef else None,
+        )
+    
+    def rerank(
+        self,
+        query: str,
+        query_vector,
+        candidates: List[ScoredResult],
+        vectors: Sequence,
+        score_threshold: Optional[float] = None,
+    ) -> List[ScoredResult]:
+        """
+        Order the first `budget` candidates of a query by the scores of the reranker, the others are dropped
+
+        Args:
+            query (str): Query string
+            query_vector: Embedded query
+            candidates (List[ScoredResult]): Candidates of the ANN search, best first
+            vectors (Sequence): Stored vectors of the candidates
+            score_threshold (Optional[float]): Minimum exact cosine similarity of the results
+
+        Returns:
+            List[ScoredResult]: Candidates with their exact score and the score of the reranker, best first
+        """
+        reranked = candidates[:self.budget]
+        if not reranked:
+            return reranked
+        
+        matrix = as_matrix(vectors[:len(reranked)])
+        exact_scores = cosine_similarities(query_vector, matrix)
+        if score_threshold is not None:
+            kept = [index for index in range(len(reranked)) if exact_scores[index] >= score_threshold]
+            reranked, matrix, exact_scores = [reranked[index] for index in kept], matrix[kept], exact_scores[kept]
+            if not reranked:
+                return reranked
+        
+        with RERANK_SECONDS.time(method=type(self.reranker).__name__):
+            scores = self.reranker.score(query, query_vector, reranked, matrix)
+        
+        order = sorted(range(len(reranked)), key=lambda index: scores[index], reverse=True)
+        return [
+            ScoredResult(reranked[index].id, float(exact_scores[index]), reranked[index].payload, rerank_score=float(scores[index]))
+            for index in order
+        ]
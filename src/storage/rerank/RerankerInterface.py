@@ -0,0 +1,26 @@
+from typing import List
+
+import numpy as np
+
+from src.storage.ScoredResult import ScoredResult
+
+class RerankerInterface:
+    """
+    Interface for the second stage of a query, which scores the candidates of the ANN search again
+    You have to implement this method when you make a new reranker class.
+    """
+    
+    def score(self, query: str, query_vector: np.ndarray, candidates: List[ScoredResult], vectors: np.ndarray) -> np.ndarray:
+        """
+        Score the candidates of a query, higher is more relevant
+
+        Args:
+            query (str): Query string
+            query_vector (np.ndarray): Embedded query
+            candidates (List[ScoredResult]): Candidates of the ANN search, best first
+            vectors (np.ndarray): Stored vectors of the candidates, one row per candidate
+            
+        Returns:
+            np.ndarray: Score of every candidate
+        """
+        pass
@@ -0,0 +1,26 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most `size` items without materializing it.
+
+    Args:
+        iterable (Iterable[T]): Items to be split
+        size (int): Maximum number of items per chunk
+
+    Returns:
+        Iterator[List[T]]: Chunks in the original order
+    """
+    if size < 1:
+        raise ValueError("size must be greater than 0")
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
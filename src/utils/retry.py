@@ -0,0 +1,62 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from src.metrics.Instruments import RETRIES
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """
+    Error of a request which may succeed when it is sent again (e.g. HTTP 429 or 5xx).
+    """
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def retry_with_backoff(
+    request: Callable[[], Awaitable[T]],
+    max_retries: int,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    operation: str = "request",
+) -> T:
+    """
+    Await the request again with exponential backoff and full jitter while it raises RetryableError.
+    A `retry_after` given by the server is used as the lower bound of the delay.
+
+    Args:
+        request (Callable[[], Awaitable[T]]): Function creating the request to be awaited
+        max_retries (int): Maximum number of retries after the first attempt
+        base_delay (float): Delay in seconds before the first retry
+        max_delay (float): Upper bound of the delay in seconds
+        operation (str): Label of the retries in the `retries_total` metric
+
+    Returns:
+        T: Result of the first successful attempt
+    """
+    attempt = 0
+    while True:
+        try:
+            return await request()
+        except RetryableError as error:
+            if attempt >= max_retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if error.retry_after is not None:
+                delay = max(delay, min(error.retry_after, max_delay))
+            attempt += 1
+            RETRIES.inc(operation=operation)
+            await asyncio.sleep(delay)
@@ -0,0 +1,49 @@
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+VECTOR_DTYPE = np.float32
+
+VectorLike = Union[np.ndarray, Sequence[float]]
+
+
+def as_vector(values: VectorLike) -> np.ndarray:
+    """
+    Convert a vector into a contiguous float32 array, without copying when it already is one
+
+    Args:
+        values (VectorLike): Vector as an array or a sequence of floats
+
+    Returns:
+        np.ndarray: 1-D float32 array
+    """
+    return np.ascontiguousarray(values, dtype=VECTOR_DTYPE).reshape(-1)
+
+
+def as_matrix(vectors: Union[np.ndarray, Iterable[VectorLike]], dimension: Optional[int] = None) -> np.ndarray:
+    """
+    Convert vectors into a contiguous float32 matrix with one row per vector
+
+    Args:
+        vectors (Union[np.ndarray, Iterable[VectorLike]]): Matrix or vectors of the same size
+        dimension (Optional[int]): Number of columns of an empty matrix
+
+    Returns:
+        np.ndarray: 2-D float32 array
+    """
+    if isinstance(vectors, np.ndarray):
+        matrix = np.ascontiguousarray(vectors, dtype=VECTOR_DTYPE)
+        return matrix if matrix.ndim == 2 else matrix.reshape(len(matrix), -1)
+    vectors = list(vectors)
+    if not vectors:
+        return np.zeros((0, dimension or 0), dtype=VECTOR_DTYPE)
+    return np.stack([as_vector(vector) for vector in vectors])
+
+
+def format_vector(vector: np.ndarray, head: int = 3) -> str:
+    values = ", ".join(f"{value:.4f}" for value in vector[:head])
+    return f"[{values}, ...]({len(vector)})" if len(vector) > head else f"[{values}]"
+
+
+def format_text(text: str, width: int = 50) -> str:
+    return text if len(text) <= width else text[:width] + "..."
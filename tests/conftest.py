@@ -0,0 +1,44 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# `src` is imported from the repository root and the scrapy project from its own directory, as `scrapy crawl` does
+for path in (ROOT, os.path.join(ROOT, "naver_kin")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+from qdrant_client import QdrantClient
+
+from benchmarks.FakeEmbeddingClient import FakeEmbeddingClient
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+# Optional stages read from the environment, tests turn them on explicitly
+STAGE_VARIABLES = (
+    "QDRANT_COLLECTION_ALWAYS_REFRES",
+    "CHUNK_MAX_TOKENS",
+    "DEDUP_MINHASH_THRESHOLD",
+    "DEDUP_VECTOR_SCORE",
+    "RERANK_METHOD",
+)
+
+
+@pytest.fixture
+def make_storage(monkeypatch):
+    """
+    Factory of QdrantClientStorage over a fresh in-process Qdrant, with a deterministic fake embedding model
+    """
+    for name in STAGE_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("QDRANT_SCORE_THRESHOLD", "0")
+    
+    def make(embedding_client=None, qdrant_client=None, **kwargs):
+        return QdrantClientStorage(
+            embedding_client=embedding_client or FakeEmbeddingClient(dimension=16),
+            collection_name="test",
+            qdrant_client=qdrant_client or QdrantClient(":memory:"),
+            **kwargs,
+        )
+    
+    return make
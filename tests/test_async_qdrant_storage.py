@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from benchmarks.FakeEmbeddingClient import FakeEmbeddingClient
+from benchmarks.ingest_query_benchmark import SyntheticCrawler
+from src.embedd.AsyncEmbeddingInterface import AsyncEmbeddingInterface
+from src.storage.qdrant.AsyncQdrantClientStorage import AsyncQdrantClientStorage
+from src.utils import retry
+from tests.conftest import STAGE_VARIABLES
+
+
+class FakeAsyncEmbeddingClient(AsyncEmbeddingInterface):
+    def __init__(self):
+        self.client = FakeEmbeddingClient(dimension=16)
+    
+    async def embed(self, data):
+        return self.client.embed(data)
+    
+    async def embed_simple_text(self, text):
+        return self.client.embed_simple_text(text)
+    
+    async def embed_batch(self, datas):
+        await asyncio.sleep(0)
+        return self.client.embed_batch(datas)
+    
+    async def embed_simple_texts(self, texts):
+        return self.client.embed_simple_texts(texts)
+    
+    def get_vector_size(self):
+        return self.client.get_vector_size()
+    
+    def get_model_name(self):
+        return self.client.get_model_name()
+
+
+class FakeQdrant:
+    """
+    Minimal Qdrant REST API keeping the points in memory, which throttles the first upsert with 429
+    """
+    
+    def __init__(self):
+        self.points = {}
+        self.collection_exists = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttled = 0
+        self.upserts = 0
+    
+    async def handle(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Requests overlap while one of them is waiting here
+            await asyncio.sleep(0.01)
+            return self.route(request)
+        finally:
+            self.in_flight -= 1
+    
+    def route(self, request):
+        path = request.url.path
+        if request.method == "GET":
+            return httpx.Response(200, json={"result": {}}) if self.collection_exists else httpx.Response(404)
+        if request.method == "PUT" and path == "/collections/test":
+            self.collection_exists = True
+            return httpx.Response(200, json={"result": True})
+        if path.endswith("/index"):
+            return httpx.Response(200, json={"result": {"status": "completed"}})
+        if path.endswith("/points") and request.method == "PUT":
+            if self.throttled == 0:
+                self.throttled += 1
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            self.upserts += 1
+            batch = httpx.Response(200, content=request.content).json()["batch"]
+            for point_id, vector, payload in zip(batch["ids"], batch["vectors"], batch["payloads"]):
+                self.points[point_id] = (np.asarray(vector), payload)
+            return httpx.Response(200, json={"result": {"status": "completed"}})
+        if path.endswith("/points/search"):
+            body = httpx.Response(200, content=request.content).json()
+            vector = np.asarray(body["vector"])
+            hits = sorted(
+                ({"id": point_id, "score": float(vector @ point_vector), "payload": payload}
+                 for point_id, (point_vector, payload) in self.points.items()),
+                key=lambda hit: -hit["score"],
+            )
+            return httpx.Response(200, json={"result": hits[:body["limit"]]})
+        return httpx.Response(400)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    for name in STAGE_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("QDRANT_COLLECTION_NAME", "test")
+    monkeypatch.setenv("QDRANT_SCORE_THRESHOLD", "0")
+    # Backoff without jitter, so the retry waits only for the Retry-After of the server
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: low)
+    
+    qdrant = FakeQdrant()
+    storage = AsyncQdrantClientStorage(FakeAsyncEmbeddingClient(), max_concurrency=2, max_retries=2)
+    storage.http_client = httpx.AsyncClient(transport=httpx.MockTransport(qdrant.handle), base_url="http://qdrant")
+    storage.qdrant = qdrant
+    return storage
+
+
+def test_ingest_and_query_within_the_concurrency_limit(storage):
+    async def run():
+        async with storage:
+            saved = await storage.ingest(SyntheticCrawler(40), embed_batch_size=4, upsert_batch_size=5, max_in_flight=4)
+            results = await storage.query("제목: benchmark document 7 질문: synthetic question body 7", limit=3)
+        return saved, results
+    
+    saved, results = asyncio.run(run())
+    
+    assert saved == 40
+    assert len(storage.qdrant.points) == 40
+    assert storage.qdrant.upserts == 8
+    # Four batches were in flight, but never more requests than the semaphore lets through
+    assert storage.qdrant.max_in_flight == 2
+    assert results[0]["ref"] == "https://benchmark.local/7"
+
+
+def test_throttled_upsert_is_retried(storage):
+    async def run():
+        async with storage:
+            return await storage.ingest(SyntheticCrawler(5), upsert_batch_size=5, max_in_flight=1)
+    
+    assert asyncio.run(run()) == 5
+    assert storage.qdrant.throttled == 1
+    assert storage.qdrant.upserts == 1
+    assert len(storage.qdrant.points) == 5
+
+
+def test_throttling_beyond_max_retries_fails(storage):
+    storage.max_retries = 0
+    
+    async def run():
+        async with storage:
+            return await storage.ingest(SyntheticCrawler(5), upsert_batch_size=5, max_in_flight=1)
+    
+    with pytest.raises(retry.RetryableError):
+        asyncio.run(run())
+    assert storage.qdrant.upserts == 0
@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+from src.storage.RankFusion import reciprocal_rank_fusion
+from src.storage.lexical.BM25Index import BM25Index, tokenize
+
+
+def test_tokenize_adds_hangul_bigrams():
+    assert tokenize("창업을 준비 Python3") == ["창업을", "창업", "업을", "준비", "python3"]
+
+
+def test_bm25_score_matches_the_formula():
+    index = BM25Index(k1=1.2, b=0.75)
+    index.add("a", "cat cat dog")
+    index.add("b", "dog bird")
+    index.add("c", "bird fish")
+    
+    results = dict(index.search("cat"))
+    
+    # Only "a" holds "cat": idf = ln(1 + (3 - 1 + 0.5) / (1 + 0.5)), tf = 2, length 3 over an average of 7 / 3
+    idf = math.log(1 + 2.5 / 1.5)
+    normalization = 1.2 * (1 - 0.75 + 0.75 * 3 / (7 / 3))
+    assert results == {"a": pytest.approx(idf * 2 * 2.2 / (2 + normalization))}
+
+
+def test_bm25_prefers_rare_terms_and_short_documents():
+    index = BM25Index()
+    index.add("common", "고양이 사료")
+    index.add("rare", "고양이 간식")
+    index.add("long", "고양이 사료 추천 그리고 아주 긴 본문 내용")
+    index.add("other", "강아지 사료")
+    
+    ranked = [document_id for document_id, _ in index.search("고양이 간식")]
+    
+    assert ranked[0] == "rare"
+    assert ranked.index("common") < ranked.index("long")
+    assert "other" not in ranked
+
+
+def test_bm25_replaces_and_removes_documents():
+    index = BM25Index()
+    index.add(1, "고양이 사료")
+    index.add(2, "강아지 사료")
+    index.add(1, "햄스터 간식")
+    
+    assert [document_id for document_id, _ in index.search("고양이")] == []
+    assert [document_id for document_id, _ in index.search("햄스터")] == [1]
+    
+    index.remove(1)
+    index.remove(1)
+    
+    assert len(index) == 1
+    assert index.search("햄스터") == []
+    assert index.total_length == sum(index.document_lengths.values())
+
+
+def test_bm25_limits_results():
+    index = BM25Index()
+    for document_id in range(20):
+        index.add(document_id, f"사료 {document_id}")
+    
+    assert len(index.search("사료", limit=5)) == 5
+    assert BM25Index().search("사료") == []
+
+
+def test_rrf_ranks_consensus_first():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]], k=60)
+    
+    # Ties keep the order in which the items were first ranked
+    assert [item for item, _ in fused] == ["b", "a", "d", "c", "e"]
+    assert dict(fused)["b"] == pytest.approx(2 / 62)
+    assert dict(fused)["a"] == pytest.approx(1 / 61)
+
+
+def test_rrf_ignores_score_scales_and_weighs_ranks_by_k():
+    # Only ranks count, so a retriever with one strong hit cannot outweigh agreement of the others
+    fused = reciprocal_rank_fusion([["x", "y"], ["y", "x"], ["y", "z"]], k=1)
+    
+    assert [item for item, _ in fused] == ["y", "x", "z"]
+    assert dict(fused)["y"] == pytest.approx(1 / 2 + 1 / 2 + 1 / 3)
+    assert reciprocal_rank_fusion([]) == []
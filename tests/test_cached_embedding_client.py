@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from benchmarks.FakeEmbeddingClient import FakeEmbeddingClient
+from src.embedd.cache.CachedEmbeddingClient import CachedEmbeddingClient
+from src.embedd.openai.OpenAIClient import DEFAULT_EMBEDDING_MODEL, OpenAIClient
+
+
+class RecordingEmbeddingClient(FakeEmbeddingClient):
+    def __init__(self, model_name="fake-8"):
+        super().__init__(dimension=8, clusters=4)
+        self.model_name = model_name
+        self.embedded_texts = []
+    
+    def embed_simple_texts(self, texts):
+        self.embedded_texts.extend(texts)
+        return super().embed_simple_texts(texts)
+    
+    def get_model_name(self):
+        return self.model_name
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "embedding_cache.sqlite3")
+
+
+def test_only_missing_texts_reach_the_wrapped_client(cache_path):
+    client = RecordingEmbeddingClient()
+    cache = CachedEmbeddingClient(client, path=cache_path, lru_size=10)
+    
+    first = cache.embed_simple_texts(["a", "b", "a"])
+    second = cache.embed_simple_texts(["b", "c"])
+    
+    assert client.embedded_texts == ["a", "b", "c"]
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(first[1], second[0])
+    np.testing.assert_array_equal(second, client.embed_simple_texts(["b", "c"]))
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_evicted_vectors_are_read_from_the_file(cache_path):
+    client = RecordingEmbeddingClient()
+    cache = CachedEmbeddingClient(client, path=cache_path, lru_size=2)
+    cache.embed_simple_texts(["a", "b", "c"])
+    
+    cache.embed_simple_texts(["a"])
+    
+    stats = cache.stats()
+    assert client.embedded_texts == ["a", "b", "c"]
+    assert stats["evictions"] == 2
+    assert stats["disk_hits"] == 1
+    assert stats["lru_entries"] == 2
+
+
+def test_vectors_are_reused_by_another_process(cache_path):
+    CachedEmbeddingClient(RecordingEmbeddingClient(), path=cache_path).embed_simple_texts(["a"])
+    client = RecordingEmbeddingClient()
+    
+    CachedEmbeddingClient(client, path=cache_path).embed_simple_texts(["a"])
+    
+    assert client.embedded_texts == []
+
+
+def test_vectors_of_another_model_are_not_reused(cache_path):
+    CachedEmbeddingClient(RecordingEmbeddingClient("fake-a"), path=cache_path).embed_simple_texts(["a"])
+    client = RecordingEmbeddingClient("fake-b")
+    
+    CachedEmbeddingClient(client, path=cache_path).embed_simple_texts(["a"])
+    
+    assert client.embedded_texts == ["a"]
+
+
+def test_client_without_a_model_name_is_rejected(cache_path):
+    with pytest.raises(ValueError, match="model name"):
+        CachedEmbeddingClient(RecordingEmbeddingClient(model_name=None), path=cache_path)
+
+
+def test_openai_client_defaults_its_model_name(monkeypatch):
+    monkeypatch.delenv("OPENAI_EMBEDDING_MODEL", raising=False)
+    
+    assert OpenAIClient().get_model_name() == DEFAULT_EMBEDDING_MODEL
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.FakeEmbeddingClient import FakeEmbeddingClient
+from benchmarks.ingest_query_benchmark import SyntheticCrawler
+from src.storage.qdrant.CollectionSnapshot import CollectionSnapshot
+
+
+def all_points(storage):
+    points, _ = storage.qdrant_client.scroll(collection_name="test", limit=1000, with_payload=True, with_vectors=True)
+    return {str(point.id): point for point in points}
+
+
+def test_export_and_load_round_trip(make_storage, tmp_path):
+    source = make_storage()
+    source.ingest(SyntheticCrawler(25), max_in_flight=0)
+    snapshot = CollectionSnapshot(str(tmp_path / "snapshot"))
+    
+    assert snapshot.export(source, page_size=7) == 25
+    meta = snapshot.read_meta()
+    assert (meta["count"], meta["dimension"], meta["embedding_model"]) == (25, 16, "fake-16")
+    
+    target = make_storage()
+    assert snapshot.load(target, upsert_batch_size=10) == 25
+    
+    exported, loaded = all_points(source), all_points(target)
+    assert loaded.keys() == exported.keys()
+    for point_id, point in exported.items():
+        assert loaded[point_id].payload == point.payload
+        assert np.allclose(loaded[point_id].vector, point.vector)
+    # Queries are answered the same without embedding the corpus again
+    query = "제목: benchmark document 3 질문: synthetic question body 3"
+    results = source.query(query)
+    assert results and target.query(query) == results
+
+
+def test_export_of_an_empty_collection(make_storage, tmp_path):
+    snapshot = CollectionSnapshot(str(tmp_path))
+    
+    assert snapshot.export(make_storage()) == 0
+    assert snapshot.load(make_storage()) == 0
+
+
+def test_load_rejects_another_embedding_model(make_storage, tmp_path):
+    source = make_storage()
+    source.ingest(SyntheticCrawler(3), max_in_flight=0)
+    snapshot = CollectionSnapshot(str(tmp_path))
+    snapshot.export(source)
+    
+    with pytest.raises(ValueError):
+        snapshot.load(make_storage(embedding_client=FakeEmbeddingClient(dimension=8)))
+    
+    meta = snapshot.read_meta()
+    with open(snapshot.meta_path, "w", encoding="utf-8") as meta_file:
+        json.dump({**meta, "format_version": meta["format_version"] + 1}, meta_file)
+    with pytest.raises(ValueError):
+        snapshot.load(make_storage())
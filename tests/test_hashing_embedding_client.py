@@ -0,0 +1,27 @@
+import threading
+
+import numpy as np
+
+from src.embedd.local.HashingEmbeddingClient import HashingEmbeddingClient
+
+
+def test_embeds_normalized_deterministic_vectors():
+    client = HashingEmbeddingClient(dimension=64)
+    
+    vectors = client.embed_simple_texts(["고양이 사료 추천", "강아지 산책 시간", "고양이 사료 추천", ""])
+    
+    assert vectors.shape == (4, 64)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0)
+    assert not vectors[3].any()
+    assert np.array_equal(vectors[0], vectors[2])
+    assert np.array_equal(vectors[0], HashingEmbeddingClient(dimension=64).embed_simple_text("고양이 사료 추천"))
+
+
+def test_does_not_start_threads():
+    threads_before = threading.active_count()
+    
+    for _ in range(5):
+        HashingEmbeddingClient(dimension=32).embed_simple_texts(["질문 본문"] * 10)
+    
+    assert threading.active_count() == threads_before
@@ -0,0 +1,80 @@
+import os
+
+import scrapy
+from scrapy.http import HtmlResponse
+
+from naver_kin.spiders.quotes_naver_kin import exampleSpider
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "naver_kin")
+BASE_URL = "http://kin.example"
+
+
+def fixture_response(name, url, **cb_kwargs):
+    with open(os.path.join(FIXTURES, name), "rb") as fixture:
+        body = fixture.read()
+    return HtmlResponse(url=url, body=body, encoding="utf-8", request=scrapy.Request(url, cb_kwargs=cb_kwargs))
+
+
+def list_response():
+    return fixture_response("list_page1.html", f"{BASE_URL}/qna/list.nhn?dirId=4", page=1)
+
+
+def detail_response():
+    return fixture_response("detail_1001.html", f"{BASE_URL}/qna/detail.nhn?d1id=1&dirId=4&docId=1001")
+
+
+def test_parse_follows_unseen_questions_and_the_next_page():
+    spider = exampleSpider(max_pages=3, base_url=BASE_URL)
+    spider.seen_doc_ids.add("1002")
+
+    requests = list(spider.parse(list_response(), page=1))
+
+    questions = [request for request in requests if request.callback == spider.parse_doc]
+    pages = [request for request in requests if request.callback == spider.parse]
+    assert [spider._query_param(request.url, "docId") for request in questions] == ["1001", "1003"]
+    assert len(pages) == 1
+    assert spider._query_param(pages[0].url, "page") == "2"
+    assert pages[0].cb_kwargs == {"page": 2}
+
+
+def test_parse_stops_at_max_pages():
+    spider = exampleSpider(max_pages=1, base_url=BASE_URL)
+
+    requests = list(spider.parse(list_response(), page=1))
+
+    assert all(request.callback == spider.parse_doc for request in requests)
+    assert len(requests) == 3
+
+
+def test_parse_doc_extracts_the_question():
+    spider = exampleSpider(base_url=BASE_URL)
+
+    item = spider.parse_doc(detail_response())
+
+    assert item["ref"] == f"{BASE_URL}/qna/detail.nhn?d1id=1&dirId=4&docId=1001"
+    assert item["title"] == "컴퓨터가 갑자기 꺼져요"
+    assert item["category"] == "4"
+    assert item["doc_id"] == "1001"
+    assert "게임을 하다 보면 컴퓨터가 갑자기 꺼집니다." in item["question"]
+    assert "파워 문제인가요?" in item["question"]
+
+
+def test_doc_id_is_seen_only_once_the_item_is_scraped(tmp_path):
+    seen_path = tmp_path / "seen_doc_ids.txt"
+    spider = exampleSpider(base_url=BASE_URL)
+    spider._open_seen_doc_ids(str(seen_path))
+
+    item = spider.parse_doc(detail_response())
+    assert "1001" not in spider.seen_doc_ids
+
+    spider.item_scraped(item, detail_response(), spider)
+    spider.closed("finished")
+
+    assert "1001" in spider.seen_doc_ids
+    assert seen_path.read_text() == "1001\n"
+    # The next run skips the question before requesting it
+    next_run = exampleSpider(max_pages=1, base_url=BASE_URL)
+    next_run._open_seen_doc_ids(str(seen_path))
+    requests = list(next_run.parse(list_response(), page=1))
+    next_run.closed("finished")
+    assert "1001" not in [next_run._query_param(request.url, "docId") for request in requests]
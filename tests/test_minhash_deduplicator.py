@@ -0,0 +1,125 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.crawler.SourceData import SourceData
+from src.dedup.MinHashDeduplicator import MinHashDeduplicator, merge_aliases, normalize_text
+from src.embedd.EmbeddedModel import EmbeddedModel
+
+QUESTION = "고양이가 사료를 잘 먹지 않는데 어떤 사료로 바꿔야 할까요? 나이는 세 살이고 실내에서만 키우고 있습니다."
+
+
+class ListCrawler(CrawlerInterface):
+    def __init__(self, datas: List[SourceData]):
+        self.datas = datas
+    
+    def crawl(self) -> List[SourceData]:
+        return self.datas
+
+
+def document(index, text):
+    return SourceData(text=text, ref=f"https://kin.naver.com/{index}")
+
+
+def test_normalize_text_ignores_case_punctuation_and_spacing():
+    assert normalize_text("Hello,   WORLD!!  ") == normalize_text("hello world") == "hello world"
+
+
+def test_drops_near_duplicates_as_aliases_of_the_first_document():
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    batch = [
+        document(1, QUESTION),
+        document(2, QUESTION.replace("?", "??").upper()),
+        document(3, QUESTION + " 감사합니다"),
+        document(4, "강아지 산책은 하루에 몇 번 시키는 것이 좋을까요? 소형견이고 두 살입니다."),
+    ]
+    
+    kept = deduplicator.drop_duplicates(batch)
+    
+    assert [data.ref for data in kept] == [batch[0].ref, batch[3].ref]
+    assert deduplicator.aliases_of(batch[0].ref) == [batch[1].ref, batch[2].ref]
+    assert deduplicator.aliases_of(batch[3].ref) == []
+
+
+def test_checking_a_document_again_does_not_alias_it_to_itself():
+    deduplicator = MinHashDeduplicator()
+    data = document(1, QUESTION)
+    
+    assert deduplicator.check(data) is None
+    assert deduplicator.check(data) is None
+    assert deduplicator.check(SourceData(text="", ref="empty")) is None
+    assert deduplicator.aliases_of(data.ref) == []
+
+
+def test_registered_documents_become_canonical():
+    deduplicator = MinHashDeduplicator()
+    deduplicator.register(document(1, QUESTION))
+    # A near-duplicate of a registered document is not registered itself
+    deduplicator.register(document(2, QUESTION + "!"))
+    
+    assert deduplicator.check(document(3, QUESTION)) == "https://kin.naver.com/1"
+    assert "https://kin.naver.com/2" not in deduplicator.signatures
+
+
+def test_pop_dirty_aliases_returns_only_new_aliases():
+    deduplicator = MinHashDeduplicator()
+    deduplicator.drop_duplicates([document(1, QUESTION), document(2, QUESTION)])
+    
+    assert deduplicator.pop_dirty_aliases() == {"https://kin.naver.com/1": ["https://kin.naver.com/2"]}
+    assert deduplicator.pop_dirty_aliases() == {}
+    
+    deduplicator.drop_duplicates([document(3, QUESTION)])
+    assert deduplicator.pop_dirty_aliases() == {
+        "https://kin.naver.com/1": ["https://kin.naver.com/2", "https://kin.naver.com/3"],
+    }
+
+
+def test_drop_similar_skips_the_previous_version_of_the_document():
+    deduplicator = MinHashDeduplicator(vector_score=0.95)
+    vector = np.ones(4, dtype=np.float32)
+    embedded = [EmbeddedModel.from_source_data(document(index, f"text {index}"), vector) for index in range(3)]
+    
+    kept = deduplicator.drop_similar(embedded, [
+        ["https://kin.naver.com/0"],
+        ["https://kin.naver.com/1", "https://kin.naver.com/9"],
+        [],
+    ])
+    
+    assert [data.ref for data in kept] == ["https://kin.naver.com/0", "https://kin.naver.com/2"]
+    assert deduplicator.aliases_of("https://kin.naver.com/9") == ["https://kin.naver.com/1"]
+
+
+def test_with_aliases_merges_stored_and_new_aliases():
+    deduplicator = MinHashDeduplicator()
+    deduplicator.add_alias("canonical", "new")
+    data = SourceData(text=QUESTION, ref="canonical", metadata={"category": "반려동물"})
+    
+    merged = deduplicator.with_aliases([data, document(2, "other")], {"canonical": ["stored", "new"]})
+    
+    assert merged[0].metadata == {"category": "반려동물", "aliases": ["stored", "new"]}
+    assert merged[1].metadata == {}
+    assert data.metadata == {"category": "반려동물"}
+    assert merge_aliases(None, ["a", "b"], [], ["b", "c"]) == ["a", "b", "c"]
+
+
+def test_aliases_survive_a_new_run_saving_the_canonical_document(make_storage):
+    qdrant_client = make_storage().qdrant_client
+    storage = make_storage(qdrant_client=qdrant_client, deduplicator=MinHashDeduplicator())
+    
+    assert storage.ingest(ListCrawler([document(1, QUESTION), document(2, QUESTION + "!")]), max_in_flight=0) == 1
+    
+    # A later run with a fresh deduplicator saves the canonical document again and finds another duplicate
+    storage = make_storage(qdrant_client=qdrant_client, deduplicator=MinHashDeduplicator())
+    storage.ingest(ListCrawler([document(1, QUESTION), document(3, QUESTION + ".")]), max_in_flight=0)
+    
+    points, _ = qdrant_client.scroll(collection_name="test", with_payload=True)
+    assert [point.payload["ref"] for point in points] == ["https://kin.naver.com/1"]
+    assert points[0].payload["aliases"] == ["https://kin.naver.com/2", "https://kin.naver.com/3"]
+
+
+@pytest.mark.parametrize("threshold,num_perm,bands", [(0, 64, 16), (1.5, 64, 16), (0.8, 64, 10)])
+def test_rejects_invalid_parameters(threshold, num_perm, bands):
+    with pytest.raises(ValueError):
+        MinHashDeduplicator(threshold=threshold, num_perm=num_perm, bands=bands)
@@ -0,0 +1,60 @@
+from typing import List
+
+from src.crawler.CrawlerInterface import CrawlerInterface
+from src.crawler.SourceData import SourceData
+
+
+class ListCrawler(CrawlerInterface):
+    def __init__(self, datas: List[SourceData]):
+        self.datas = datas
+    
+    def crawl(self) -> List[SourceData]:
+        return self.datas
+
+
+def documents(size: int, changed=()) -> List[SourceData]:
+    return [
+        SourceData(
+            text=f"질문 {index} {'수정된 본문' if index in changed else '본문'}",
+            ref=f"https://kin.naver.com/{index}",
+            metadata={"doc_id": str(index)},
+        )
+        for index in range(size)
+    ]
+
+
+def stored_points(storage):
+    points, _ = storage.qdrant_client.scroll(collection_name="test", limit=100, with_payload=True)
+    return {point.payload["ref"]: point for point in points}
+
+
+def test_sync_saves_only_new_and_changed_documents(make_storage):
+    storage = make_storage()
+    
+    assert storage.sync(ListCrawler(documents(10)), max_in_flight=0) == {"unchanged": 0, "saved": 10, "deleted": 0}
+    first_ids = {ref: point.id for ref, point in stored_points(storage).items()}
+    
+    assert storage.sync(ListCrawler(documents(10)), max_in_flight=0) == {"unchanged": 10, "saved": 0, "deleted": 0}
+    
+    # Documents 2 and 5 are edited, 8 and 9 are not crawled anymore
+    counts = storage.sync(ListCrawler(documents(8, changed={2, 5})), max_in_flight=0)
+    
+    assert counts == {"unchanged": 6, "saved": 2, "deleted": 2}
+    points = stored_points(storage)
+    assert sorted(points) == sorted(f"https://kin.naver.com/{index}" for index in range(8))
+    # Point ids are derived from the reference, a changed document overwrites its own point
+    assert {ref: point.id for ref, point in points.items()} == {ref: first_ids[ref] for ref in points}
+    assert points["https://kin.naver.com/2"].payload["original_text"] == "질문 2 수정된 본문"
+    assert points["https://kin.naver.com/3"].payload["original_text"] == "질문 3 본문"
+
+
+def test_sync_embeds_unchanged_documents_once(make_storage):
+    storage = make_storage()
+    storage.sync(ListCrawler(documents(4)), max_in_flight=0)
+    embedded_texts = []
+    embed_simple_texts = storage.model.embed_simple_texts
+    storage.model.embed_simple_texts = lambda texts: embedded_texts.extend(texts) or embed_simple_texts(texts)
+    
+    storage.sync(ListCrawler(documents(4, changed={1})), max_in_flight=0)
+    
+    assert embedded_texts == ["질문 1 수정된 본문"]
@@ -0,0 +1,43 @@
+import asyncio
+
+from src.crawler.SourceData import SourceData
+from src.server.QueryBatcher import QueryBatcher
+from src.storage.cache.QueryResultCache import QueryResultCache
+
+
+def make_cached_storage(make_storage):
+    storage = make_storage(result_cache=QueryResultCache())
+    storage.save_many(storage.model.embed_batch([SourceData(f"text {index}", f"ref{index}") for index in range(30)]))
+    # Saving invalidates the cache, the counters start from here
+    storage.result_cache = QueryResultCache()
+    return storage
+
+
+def test_each_query_of_a_batch_is_cached_with_its_own_limit(make_storage):
+    storage = make_cached_storage(make_storage)
+    
+    batched = storage.query_batch(["text 1", "text 2"], limits=[2, 5])
+    
+    assert [len(results) for results in batched] == [2, 5]
+    assert storage.query_batch(["text 1"], limit=2) == [batched[0]]
+    assert storage.query_batch(["text 2"], limit=5) == [batched[1]]
+    assert storage.result_cache.stats()["exact_hits"] == 2
+
+
+def test_batched_queries_get_the_results_of_their_own_limit(make_storage):
+    storage = make_cached_storage(make_storage)
+    alone = [storage.query_batch(["text 1"], limit=2)[0], storage.query_batch(["text 1"], limit=6)[0]]
+    storage.result_cache = QueryResultCache()
+    
+    async def run():
+        batcher = QueryBatcher(storage, max_batch_size=8, max_wait_ms=50, max_concurrent_batches=1)
+        await batcher.start()
+        try:
+            return await asyncio.gather(batcher.query("text 1", 2), batcher.query("text 1", 6))
+        finally:
+            await batcher.stop()
+    
+    batched = asyncio.run(run())
+    
+    assert batched == alone
+    assert storage.result_cache.stats()["entries"] == 2
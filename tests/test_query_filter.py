@@ -0,0 +1,30 @@
+from src.storage.QueryFilter import QueryFilter
+from src.storage.cache.QueryResultCache import QueryResultCache
+from src.storage.qdrant.PayloadSchema import to_qdrant_filter
+from src.storage.qdrant.QdrantClient import QdrantClientStorage
+
+
+def test_cache_key_is_the_same_for_any_collection_of_the_same_values():
+    keys = {
+        QueryFilter(category=values).cache_key()
+        for values in (["4", "208"], ("208", "4"), {"4", "208"}, frozenset(["208", "4"]))
+    }
+    
+    assert keys == {(("category", ("208", "4")),)}
+
+
+def test_set_filter_is_cached():
+    cache = QueryResultCache()
+    query_filter = QueryFilter(category={"4", "208"}, crawled_from=100)
+    key = cache.key("창업 정보", QdrantClientStorage._cache_params(10, None, False, None, query_filter))
+    
+    cache.put(key, None, ["result"], cache.generation)
+    
+    same_filter = QueryFilter(category=["208", "4"], crawled_from=100)
+    assert cache.get(cache.key("창업 정보", QdrantClientStorage._cache_params(10, None, False, None, same_filter))) == ["result"]
+
+
+def test_set_filter_matches_any_of_its_values():
+    qdrant_filter = to_qdrant_filter(QueryFilter(category={"4", "208"}))
+    
+    assert sorted(qdrant_filter.must[0].match.any) == ["208", "4"]
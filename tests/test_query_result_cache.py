@@ -0,0 +1,104 @@
+from src.storage.cache.QueryResultCache import QueryResultCache
+
+
+def put(cache, query, vector=None, params=10):
+    key = cache.key(query, params)
+    cache.put(key, vector, [query], cache.generation)
+    return key
+
+
+def one_hot(index, dimension):
+    vector = [0.0] * dimension
+    vector[index] = 1.0
+    return vector
+
+
+def test_exact_hit_ignores_case_and_spacing():
+    cache = QueryResultCache()
+    put(cache, "창업  정보")
+    
+    assert cache.get(cache.key(" 창업 정보 ", 10)) == ["창업  정보"]
+    assert cache.get(cache.key("창업 정보", 20)) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryResultCache(max_entries=2)
+    first = put(cache, "first")
+    second = put(cache, "second")
+    cache.get(first)
+    
+    third = put(cache, "third")
+    
+    assert cache.get(second) is None
+    assert cache.get(first) == ["first"]
+    assert cache.get(third) == ["third"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_expired_entry_is_a_miss():
+    cache = QueryResultCache(ttl_seconds=-1)
+    key = put(cache, "query", vector=[1.0, 0.0])
+    
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_close_vector_with_the_same_params_is_a_semantic_hit():
+    cache = QueryResultCache(semantic_distance=0.05)
+    put(cache, "창업 정보", vector=[1.0, 0.0, 0.0])
+    
+    assert cache.get_similar(cache.key("창업 관련 정보", 10), [0.99, 0.05, 0.0]) == ["창업 정보"]
+    assert cache.get_similar(cache.key("창업 관련 정보", 20), [0.99, 0.05, 0.0]) is None
+    assert cache.get_similar(cache.key("컴퓨터 수리", 10), [0.0, 1.0, 0.0]) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_semantic_tier_is_disabled_by_default():
+    cache = QueryResultCache()
+    put(cache, "query", vector=[1.0, 0.0])
+    
+    assert cache.get_similar(cache.key("query", 10), [1.0, 0.0]) is None
+
+
+def test_evicted_entry_is_no_semantic_hit_and_its_row_is_reused():
+    cache = QueryResultCache(max_entries=2, semantic_distance=0.05)
+    put(cache, "first", vector=[1.0, 0.0, 0.0])
+    put(cache, "second", vector=[0.0, 1.0, 0.0])
+    
+    put(cache, "third", vector=[0.0, 0.0, 1.0])
+    
+    assert cache.get_similar(cache.key("other", 10), [1.0, 0.0, 0.0]) is None
+    assert cache.get_similar(cache.key("other", 10), [0.0, 0.0, 1.0]) == ["third"]
+    assert len(cache.slot_keys) == 2
+
+
+def test_many_puts_keep_at_most_max_entries_rows():
+    cache = QueryResultCache(max_entries=100, semantic_distance=0.01)
+    for index in range(1000):
+        put(cache, f"query {index}", vector=one_hot(index, 1000))
+    
+    assert cache.stats()["entries"] == 100
+    assert len(cache.matrix) <= 100
+    assert cache.get_similar(cache.key("other", 10), one_hot(999, 1000)) == ["query 999"]
+    assert cache.get_similar(cache.key("other", 10), one_hot(0, 1000)) is None
+
+
+def test_invalidate_drops_every_result():
+    cache = QueryResultCache(semantic_distance=0.05)
+    key = put(cache, "query", vector=[1.0, 0.0])
+    
+    cache.invalidate()
+    
+    assert cache.get(key) is None
+    assert cache.get_similar(key, [1.0, 0.0]) is None
+
+
+def test_result_of_a_query_overlapping_a_write_is_not_cached():
+    cache = QueryResultCache()
+    key = cache.key("query", 10)
+    generation = cache.generation
+    
+    cache.invalidate()
+    cache.put(key, None, ["stale"], generation)
+    
+    assert cache.get(key) is None
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from benchmarks.ingest_query_benchmark import SyntheticCrawler
+from src.storage.ScoredResult import ScoredResult
+from src.storage.rerank.ExactCosineReranker import ExactCosineReranker, cosine_similarities
+from src.storage.rerank.RerankStage import RerankStage
+from src.storage.rerank.RerankerInterface import RerankerInterface
+
+QUERY_VECTOR = np.array([1.0, 0.0], dtype=np.float32)
+# Cosine similarities with the query: 1.0, 0.8, 0.6, 0.0 and -0.6
+VECTORS = np.array([[1.0, 0.0], [0.8, 0.6], [0.6, 0.8], [0.0, 1.0], [-0.6, 0.8]], dtype=np.float32)
+
+
+class ReversedReranker(RerankerInterface):
+    """
+    Scores on another scale than cosine, preferring the candidates the ANN search ranked last
+    """
+    
+    def __init__(self):
+        self.scored = []
+    
+    def score(self, query, query_vector, candidates, vectors):
+        self.scored.append([candidate.id for candidate in candidates])
+        return np.arange(len(candidates), dtype=np.float32) * 10
+
+
+def candidates():
+    # ANN scores are approximate, e.g. of quantized vectors
+    return [ScoredResult(str(index), 0.5, {"ref": f"ref-{index}"}) for index in range(len(VECTORS))]
+
+
+def test_rerank_orders_by_the_reranker_and_keeps_exact_scores():
+    reranker = ReversedReranker()
+    
+    results = RerankStage(reranker, candidates=5, budget=3).rerank("query", QUERY_VECTOR, candidates(), VECTORS)
+    
+    # Candidates beyond the budget are dropped instead of being appended on another scale
+    assert reranker.scored == [["0", "1", "2"]]
+    assert [result.id for result in results] == ["2", "1", "0"]
+    assert [result.score for result in results] == pytest.approx([0.6, 0.8, 1.0])
+    assert [result.rerank_score for result in results] == [20.0, 10.0, 0.0]
+
+
+def test_score_threshold_applies_to_the_exact_score():
+    reranker = ReversedReranker()
+    
+    results = RerankStage(reranker, candidates=5).rerank("query", QUERY_VECTOR, candidates(), VECTORS, score_threshold=0.7)
+    
+    assert reranker.scored == [["0", "1"]]
+    assert [(result.id, result.rerank_score) for result in results] == [("1", 10.0), ("0", 0.0)]
+    assert all(result.score >= 0.7 for result in results)
+    
+    assert RerankStage(reranker).rerank("query", QUERY_VECTOR, candidates(), VECTORS, score_threshold=1.5) == []
+    assert RerankStage(reranker).rerank("query", QUERY_VECTOR, [], VECTORS[:0]) == []
+
+
+def test_exact_cosine_reranker_scores_on_the_cosine_scale():
+    unnormalized = VECTORS * np.array([[3.0], [0.5], [2.0], [1.0], [4.0]], dtype=np.float32)
+    
+    results = RerankStage(ExactCosineReranker()).rerank("query", QUERY_VECTOR * 2, candidates()[::-1], unnormalized[::-1])
+    
+    assert [result.id for result in results] == ["0", "1", "2", "3", "4"]
+    assert [result.score for result in results] == pytest.approx([1.0, 0.8, 0.6, 0.0, -0.6], abs=1e-6)
+    assert all(result.score == result.rerank_score for result in results)
+    assert cosine_similarities(QUERY_VECTOR, np.zeros((1, 2), dtype=np.float32)) == pytest.approx([0.0])
+
+
+def test_storage_results_carry_both_scores(make_storage):
+    storage = make_storage(rerank_stage=RerankStage(ReversedReranker(), candidates=8, budget=4))
+    storage.ingest(SyntheticCrawler(30), max_in_flight=0)
+    query = "제목: benchmark document 5 질문: synthetic question body 5"
+    vector = storage.model.embed_simple_text(query)
+    
+    results = storage.query_many([query], limit=3)[0]
+    
+    assert len(results) == 3
+    assert [result.rerank_score for result in results] == sorted((result.rerank_score for result in results), reverse=True)
+    for result in results:
+        point = storage.qdrant_client.retrieve("test", [result.id], with_vectors=True)[0]
+        assert result.score == pytest.approx(float(cosine_similarities(vector, np.array([point.vector]))[0]), abs=1e-5)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("RERANK_METHOD", raising=False)
+    assert RerankStage.from_env() is None
+    
+    monkeypatch.setenv("RERANK_METHOD", "exact")
+    monkeypatch.setenv("RERANK_CANDIDATES", "20")
+    monkeypatch.setenv("RERANK_BUDGET", "10")
+    stage = RerankStage.from_env()
+    assert isinstance(stage.reranker, ExactCosineReranker)
+    assert (stage.candidates, stage.budget) == (20, 10)
+    
+    monkeypatch.setenv("RERANK_METHOD", "unknown")
+    with pytest.raises(ValueError):
+        RerankStage.from_env()
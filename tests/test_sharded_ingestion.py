@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from src.crawler.naver.LocalNaverJsonParser import LocalNaverJsonParser
+from src.ingest import ShardedIngestion as sharded_ingestion
+from src.ingest.FileShard import FileShard, plan_file_shards
+from src.ingest.ShardCheckpoint import ShardCheckpoint
+from src.ingest.ShardedIngestion import ShardedIngestion
+
+
+class RecordingStorage:
+    def __init__(self, fail_at=None):
+        self.refs = []
+        self.fail_at = fail_at
+        self.pending_aliases = []
+        self.written_aliases = []
+    
+    def ingest_batch(self, batch, embed_batch_size, upsert_batch_size, replace=False, context=None):
+        if self.fail_at in [data.ref for data in batch]:
+            raise RuntimeError("worker killed")
+        self.refs.extend(data.ref for data in batch)
+        # Every batch drops a near-duplicate of its first document
+        self.pending_aliases.append(batch[0].ref)
+        return len(batch)
+    
+    def write_aliases(self):
+        self.written_aliases.extend(self.pending_aliases)
+        self.pending_aliases = []
+        return len(self.written_aliases)
+
+
+def ref_of(index):
+    return f"https://kin.naver.com/qna/detail.nhn?dirId=4&docId={index}"
+
+
+@pytest.fixture
+def jsonl_path(tmp_path):
+    path = tmp_path / "kinspider_2023-07-01T00-00-00.jsonl"
+    with open(path, "w", encoding="utf-8") as jsonl_file:
+        for index in range(10):
+            jsonl_file.write(json.dumps({"ref": ref_of(index), "title": f"제목 {index}", "question": f"질문 {index}"}, ensure_ascii=False) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = RecordingStorage()
+    monkeypatch.setattr(sharded_ingestion, "_worker_storage", storage)
+    return storage
+
+
+def line_offsets(path):
+    offsets = []
+    with open(path, "rb") as jsonl_file:
+        for line in jsonl_file:
+            offsets.append((offsets[-1] if offsets else 0) + len(line))
+    return offsets
+
+
+def test_shards_cover_every_line_once(jsonl_path):
+    shards = plan_file_shards([jsonl_path], shard_bytes=100)
+    
+    parser = LocalNaverJsonParser([jsonl_path])
+    refs = [data.ref for shard in shards for _, data in parser.iter_file_range(jsonl_path, shard.start, shard.end)]
+    assert len(shards) > 1
+    assert refs == [ref_of(index) for index in range(10)]
+
+
+def test_checkpoint_is_saved_and_loaded(tmp_path, jsonl_path):
+    shard = FileShard(jsonl_path, 0, 500)
+    ShardCheckpoint(str(tmp_path / "checkpoints"), shard).save(offset=120, saved=3)
+    
+    checkpoint = ShardCheckpoint.load(str(tmp_path / "checkpoints"), shard)
+    
+    assert (checkpoint.offset, checkpoint.saved, checkpoint.done) == (120, 3, False)
+
+
+def test_checkpoint_of_another_range_starts_over(tmp_path, jsonl_path):
+    ShardCheckpoint(str(tmp_path), FileShard(jsonl_path, 0, 500)).save(offset=120, saved=3, done=True)
+    
+    checkpoint = ShardCheckpoint.load(str(tmp_path), FileShard(jsonl_path, 0, 400))
+    
+    assert (checkpoint.offset, checkpoint.saved, checkpoint.done) == (0, 0, False)
+
+
+def test_interrupted_shard_resumes_after_its_last_saved_batch(tmp_path, jsonl_path, storage):
+    offsets = line_offsets(jsonl_path)
+    shard = FileShard(jsonl_path, 0, offsets[-1])
+    # The worker was killed after saving the first 4 lines
+    ShardCheckpoint(str(tmp_path), shard).save(offset=offsets[3], saved=4)
+    
+    saved = sharded_ingestion._ingest_shard(shard, "naver_kin", str(tmp_path), embed_batch_size=8, upsert_batch_size=3)
+    
+    assert saved == 6
+    assert storage.refs == [ref_of(index) for index in range(4, 10)]
+    checkpoint = ShardCheckpoint.load(str(tmp_path), shard)
+    assert (checkpoint.offset, checkpoint.saved, checkpoint.done) == (offsets[-1], 10, True)
+
+
+def test_run_skips_shards_checkpointed_as_done(tmp_path, jsonl_path):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    for shard in plan_file_shards([jsonl_path], shard_bytes=100):
+        ShardCheckpoint(checkpoint_dir, shard).save(offset=shard.end, saved=1, done=True)
+    
+    def storage_factory():
+        raise AssertionError("the collection must not be touched")
+    
+    ingestion = ShardedIngestion(LocalNaverJsonParser([jsonl_path]), storage_factory, checkpoint_dir, shard_bytes=100)
+    counts = ingestion.run()
+    
+    assert counts["failed"] == counts["saved"] == 0
+    assert counts["done_before"] == counts["shards"] > 1
+
+
+def test_aliases_are_written_before_the_checkpoint_moves(tmp_path, jsonl_path, monkeypatch):
+    offsets = line_offsets(jsonl_path)
+    shard = FileShard(jsonl_path, 0, offsets[-1])
+    storage = RecordingStorage(fail_at=ref_of(7))
+    monkeypatch.setattr(sharded_ingestion, "_worker_storage", storage)
+    
+    with pytest.raises(RuntimeError):
+        sharded_ingestion._ingest_shard(shard, "naver_kin", str(tmp_path), embed_batch_size=8, upsert_batch_size=3)
+    
+    checkpoint = ShardCheckpoint.load(str(tmp_path), shard)
+    assert (checkpoint.offset, checkpoint.done) == (offsets[5], False)
+    # Both batches behind the checkpoint have their aliases stored, a resumed run will not see them again
+    assert storage.written_aliases == [ref_of(0), ref_of(3)]
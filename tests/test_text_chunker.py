@@ -0,0 +1,97 @@
+import pytest
+
+from src.chunking.TextChunker import TextChunker
+from src.crawler.SourceData import SourceData
+from src.storage.qdrant.PointIdentity import content_hash
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def words(count, prefix="w"):
+    return " ".join(f"{prefix}{index}" for index in range(count))
+
+
+def test_split_overlaps_consecutive_chunks():
+    chunker = TextChunker(max_tokens=4, overlap_tokens=1, count_tokens=count_words)
+    
+    assert chunker.split(words(10)) == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [(4, 0), (5, 2), (7, 3), (3, 2)])
+def test_split_keeps_every_word_within_the_limit(max_tokens, overlap_tokens):
+    chunker = TextChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens, count_tokens=count_words)
+    
+    chunks = [chunk.split() for chunk in chunker.split(words(23))]
+    
+    assert all(len(chunk) <= max_tokens for chunk in chunks)
+    assert chunks[0][0] == "w0" and chunks[-1][-1] == "w22"
+    for previous, current in zip(chunks, chunks[1:]):
+        # Each chunk starts with the last words of the previous one and moves forward
+        assert current[:overlap_tokens] == previous[len(previous) - overlap_tokens:]
+        assert int(current[0][1:]) > int(previous[0][1:])
+    covered = [word for chunk in chunks for word in chunk]
+    assert sorted(set(covered), key=lambda word: int(word[1:])) == words(23).split()
+
+
+def test_split_short_and_blank_texts():
+    chunker = TextChunker(max_tokens=4, overlap_tokens=1, count_tokens=count_words)
+    
+    assert chunker.split("  one  two ") == ["one  two"]
+    assert chunker.split(words(4)) == [words(4)]
+    assert chunker.split(" \n ") == []
+
+
+def test_split_cuts_words_longer_than_the_limit():
+    chunker = TextChunker(max_tokens=4, overlap_tokens=0, count_tokens=len)
+    
+    chunks = chunker.split("abcdefghij")
+    
+    assert chunks == ["abcd", "efgh", "ij"]
+
+
+def test_chunk_labels_sections_and_keeps_document_identity():
+    chunker = TextChunker(max_tokens=3, overlap_tokens=1, count_tokens=count_words)
+    data = SourceData(
+        text="full text",
+        ref="https://kin.naver.com/1",
+        metadata={"category": "반려동물"},
+        sections={"question": words(4, "q"), "answer": words(2, "a")},
+    )
+    
+    chunks = chunker.chunk(data)
+    
+    assert [chunk.text for chunk in chunks] == ["질문: q0 q1 q2", "질문: q2 q3", "답변: a0 a1"]
+    assert [(chunk.metadata["section"], chunk.metadata["chunk_index"]) for chunk in chunks] == [
+        ("question", 0), ("question", 1), ("answer", 0),
+    ]
+    assert {chunk.ref for chunk in chunks} == {data.ref}
+    assert {chunk.metadata["category"] for chunk in chunks} == {"반려동물"}
+    # Chunks carry the hash of the whole document, so synchronization compares documents
+    assert {chunk.metadata["content_hash"] for chunk in chunks} == {content_hash("full text")}
+
+
+def test_chunk_without_sections_is_one_text_section():
+    chunker = TextChunker(max_tokens=3, overlap_tokens=0, count_tokens=count_words)
+    
+    chunks = chunker.chunk(SourceData(text=words(5), ref="ref"))
+    
+    assert [chunk.text for chunk in chunks] == ["w0 w1 w2", "w3 w4"]
+    assert {chunk.metadata["section"] for chunk in chunks} == {"text"}
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [(0, 0), (4, 4), (4, -1)])
+def test_rejects_invalid_sizes(max_tokens, overlap_tokens):
+    with pytest.raises(ValueError):
+        TextChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("CHUNK_MAX_TOKENS", raising=False)
+    assert TextChunker.from_env() is None
+    
+    monkeypatch.setenv("CHUNK_MAX_TOKENS", "128")
+    monkeypatch.setenv("CHUNK_OVERLAP_TOKENS", "16")
+    chunker = TextChunker.from_env()
+    assert (chunker.max_tokens, chunker.overlap_tokens) == (128, 16)
@@ -0,0 +1,83 @@
+from src.embedd.TokenBatchPacker import estimate_tokens, fit_texts, pack_batches, truncate_to_tokens
+from src.embedd.openai.OpenAIClient import OpenAIClient
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_batches_respect_the_input_limit():
+    texts = [f"text {index}" for index in range(10)]
+    
+    batches = list(pack_batches(texts, max_inputs=4, max_tokens=1000, count_tokens=count_words))
+    
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_batches_respect_the_token_limit():
+    texts = ["a b c", "d e", "f g h i", "j"]
+    
+    batches = list(pack_batches(texts, max_inputs=100, max_tokens=5, count_tokens=count_words))
+    
+    assert batches == [[0, 1], [2, 3]]
+    for batch in batches:
+        assert sum(count_words(texts[index]) for index in batch) <= 5
+
+
+def test_given_token_counts_are_not_counted_again():
+    def fail(text):
+        raise AssertionError("tokens must not be counted")
+    
+    batches = list(pack_batches(["a", "b", "c"], max_inputs=100, max_tokens=2, count_tokens=fail, token_counts=[1, 1, 1]))
+    
+    assert batches == [[0, 1], [2]]
+
+
+def test_text_within_the_limit_is_kept():
+    assert truncate_to_tokens("a b c", 3, count_words) == ("a b c", 3)
+
+
+def test_oversized_text_is_truncated_to_the_limit():
+    text = " ".join(f"w{index}" for index in range(100))
+    
+    truncated, tokens = truncate_to_tokens(text, 10, count_words)
+    
+    assert text.startswith(truncated)
+    assert tokens == count_words(truncated) == 10
+
+
+def test_oversized_korean_text_is_truncated_with_the_estimate():
+    text = "창업 정보를 어디서 얻을 수 있나요? " * 1000
+    
+    truncated, tokens = truncate_to_tokens(text, 8191)
+    
+    assert tokens == estimate_tokens(truncated) <= 8191
+    assert estimate_tokens(text[:len(truncated) + 1]) > 8191
+
+
+def test_fitted_texts_are_packed_within_the_token_limit():
+    texts = ["short", " ".join("w" for _ in range(50)), "short"]
+    
+    fitted, token_counts = fit_texts(texts, 20, count_words)
+    batches = list(pack_batches(fitted, max_inputs=100, max_tokens=20, token_counts=token_counts))
+    
+    assert fitted[0] == fitted[2] == "short"
+    assert token_counts == [1, 20, 1]
+    for batch in batches:
+        assert sum(token_counts[index] for index in batch) <= 20
+
+
+def test_oversized_query_is_truncated_before_the_request(monkeypatch):
+    monkeypatch.setenv("OPENAI_EMBEDDING_MAX_INPUT_TOKENS", "10")
+    client = OpenAIClient()
+    client.count_tokens = count_words
+    requests = []
+    
+    def create_embeddings(inputs):
+        requests.append(inputs)
+        return {"data": [{"index": 0, "embedding": [0.0, 1.0]}]}
+    
+    monkeypatch.setattr(client, "_create_embeddings", create_embeddings)
+    client.embed_simple_text(" ".join(f"w{index}" for index in range(100)))
+    
+    assert count_words(requests[0]) == 10